@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`async_client`
+==================
+
+.. module:: async_client
+   :platform: Unix
+   :synopsis: An asyncio interface to the BerryIMUClient. Requires Python 3.6+.
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+import time
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.client import BerryIMUClient
+
+
+class AsyncBerryIMUClient(object):
+    """Asyncio client for the BerryIMU.
+
+    All bus I/O of the wrapped :py:class:`~pyberryimu.client.BerryIMUClient`
+    is run on a dedicated executor thread, one operation at a time, so other
+    coroutines keep running while the BerryIMU is being read. BMP180
+    conversions are waited for with :py:func:`asyncio.sleep` instead of
+    blocking the thread.
+
+    .. code:: python
+
+        async with AsyncBerryIMUClient() as client:
+            pressure = await client.read_pressure()
+            async for sample in client.stream(rate=100):
+                print(sample)
+
+    :param bus: The I2C bus number.
+    :type bus: int
+    :param settings: Settings for the :py:class:`~pyberryimu.client.BerryIMUClient`.
+    :type settings: dict
+    :param client: An already created client to use instead of creating one.
+    :type client: :py:class:`~pyberryimu.client.BerryIMUClient`
+    :param kwargs: Other keyword arguments for the
+        :py:class:`~pyberryimu.client.BerryIMUClient`, e.g. ``transport``.
+
+    """
+
+    def __init__(self, bus=1, settings=None, client=None, **kwargs):
+        """Constructor for AsyncBerryIMUClient"""
+        self._client = client if client is not None else BerryIMUClient(bus=bus, settings=settings, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._bmp180_lock = None
+
+    @property
+    def client(self):
+        """The wrapped, blocking client. Do not use it while coroutines of this client are running."""
+        return self._client
+
+    @property
+    def calibration_object(self):
+        return self._client.calibration_object
+
+    @calibration_object.setter
+    def calibration_object(self, new_calibration):
+        self._client.calibration_object = new_calibration
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking call on the bus executor thread."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def open(self):
+        await self._run(self._client.open)
+
+    async def close(self):
+        await self._run(self._client.close)
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def get_settings(self):
+        return await self._run(self._client.get_settings)
+
+    async def read_accelerometer(self):
+        return await self._run(self._client.read_accelerometer)
+
+    async def read_gyroscope(self):
+        return await self._run(self._client.read_gyroscope)
+
+    async def read_magnetometer(self):
+        return await self._run(self._client.read_magnetometer)
+
+    async def read_imu_raw(self, out=None):
+        return await self._run(self._client.read_imu_raw, out)
+
+    async def read_imu(self, out=None):
+        """Read timestamp and calibrated values of all IMU sensors.
+
+        :param out: Array of shape (10, ) to write the values to.
+        :type out: :py:class:`numpy.ndarray`
+        :return: Timestamp, accelerometer, gyroscope and magnetometer values.
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        return await self._run(self._client.read_imu, out)
+
+    async def read_temperature_LSM9DS0(self):
+        return await self._run(self._client.read_temperature_LSM9DS0)
+
+    # BMP180 methods, using the non-blocking polls of the client.
+
+    def _get_bmp180_lock(self):
+        # Created on first use, since it has to be created in the running event loop.
+        if self._bmp180_lock is None:
+            self._bmp180_lock = asyncio.Lock()
+        return self._bmp180_lock
+
+    async def _poll_until_available(self, poll):
+        """Poll, sleeping without blocking the event loop in between, until a value is returned."""
+        async with self._get_bmp180_lock():
+            while True:
+                value, ready_time = await self._run(poll)
+                if ready_time is None:
+                    return value
+                await asyncio.sleep(max(ready_time - time.time(), 0))
+
+    async def read_temperature(self):
+        """Read the temperature from the barometric pressure sensor.
+
+        :return: The temperature in degrees Celsius.
+        :rtype: float
+
+        """
+        return await self._poll_until_available(self._client.poll_temperature)
+
+    async def read_pressure(self):
+        """Read the pressure from the barometric pressure sensor.
+
+        :return: The pressure in hPa.
+        :rtype: float
+
+        """
+        return await self._poll_until_available(self._client.poll_pressure)
+
+    async def stream(self, rate=None, n=None):
+        """Read calibrated IMU samples at a fixed rate.
+
+        Samples are scheduled at fixed intervals; if reading falls behind by
+        more than one interval, the schedule is restarted instead of
+        reading a burst of samples to catch up.
+
+        :param rate: Sampling rate in Hz. Defaults to the accelerometer data rate.
+        :type rate: float
+        :param n: Number of samples to read, or ``None`` for reading until the
+            iteration is stopped.
+        :type n: int
+        :return: Asynchronous iterator of arrays of shape (10, ), as returned
+            by :py:meth:`read_imu`.
+
+        """
+        if rate is None:
+            rate = self._client.configuration['accelerometer'].get('data_rate')
+            if not rate:
+                raise PyBerryIMUError("The accelerometer is powered down; a rate must be given.")
+        period = 1 / rate
+        loop = asyncio.get_event_loop()
+        next_time = loop.time()
+        k = 0
+        while n is None or k < n:
+            delay = next_time - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -period:
+                next_time = loop.time()
+            yield await self.read_imu()
+            next_time += period
+            k += 1
@@ -20,6 +20,9 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 import os
+
+import numpy as np
+
 from pyberryimu import version
 
 
@@ -69,6 +72,21 @@ class BerryIMUCalibration(object):
         """Perform calibration of the BerryIMU magnetometer."""
         raise NotImplementedError("Base BerryIMUCalibration is not possible to calibrate.")
 
+    def rescale_full_scale(self, sensor, old_full_scale, new_full_scale):
+        """Adapt the calibration to a changed full scale of a sensor.
+
+        Raw values are returned by this calibration, so nothing is changed.
+
+        :param sensor: One of ``'accelerometer'``, ``'gyroscope'`` and ``'magnetometer'``.
+        :type sensor: str
+        :param old_full_scale: The full scale the calibration was made for.
+        :type old_full_scale: int
+        :param new_full_scale: The new full scale.
+        :type new_full_scale: int
+
+        """
+        pass
+
     def transform_accelerometer_values(self, acc_values):
         return acc_values
 
@@ -78,3 +96,54 @@ class BerryIMUCalibration(object):
     def transform_magnetometer_values(self, mag_values):
         return mag_values
 
+    def transform_accelerometer_batch(self, acc_values, out=None):
+        """Transform an array of accelerometer values.
+
+        :param acc_values: Array of shape (N, 3) with raw values.
+        :type acc_values: :py:class:`numpy.ndarray`
+        :param out: Float array of the same shape to write the transformed
+            values to; may be ``acc_values`` itself.
+        :type out: :py:class:`numpy.ndarray`
+        :return: The transformed values.
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        return self._copy_values(acc_values, out)
+
+    def transform_gyroscope_batch(self, gyro_values, out=None):
+        """Transform an array of gyroscope values.
+
+        See :py:meth:`transform_accelerometer_batch`.
+
+        """
+        return self._copy_values(gyro_values, out)
+
+    def transform_magnetometer_batch(self, mag_values, out=None):
+        """Transform an array of magnetometer values.
+
+        See :py:meth:`transform_accelerometer_batch`.
+
+        """
+        return self._copy_values(mag_values, out)
+
+    @staticmethod
+    def _copy_values(values, out):
+        if out is None:
+            return np.array(values, 'float')
+        out[...] = values
+        return out
+
+    def transform_imu_values(self, imu_values, out=None):
+        """Transform values from all three LSM9DS0 sensors in one step.
+
+        :param imu_values: Array with the accelerometer, gyroscope and
+            magnetometer values, in that order, along its last axis.
+        :type imu_values: :py:class:`numpy.ndarray`
+        :param out: Array of the same shape to write the transformed values to.
+        :type out: :py:class:`numpy.ndarray`
+        :return: The transformed values.
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        return self._copy_values(imu_values, out)
+
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`ellipsoid`
+==================
+
+.. module:: ellipsoid
+   :platform: Unix, Windows
+   :synopsis: Incremental least squares fit of an ellipsoid, for magnetometer calibration.
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import numpy as np
+
+from pyberryimu.exc import PyBerryIMUError
+
+
+class EllipsoidFit(object):
+    """Least squares fit of an ellipsoid to points in three dimensions.
+
+    The general quadric
+
+    ``a x^2 + b y^2 + c z^2 + 2d xy + 2e xz + 2f yz + 2g x + 2h y + 2i z = 1``
+
+    is fitted to the points by linear least squares. Only the normal
+    equations of the problem are stored, and points are added to them in
+    chunks, so the memory used is the same regardless of the number of points.
+
+    Points far from the origin, e.g. raw sensor counts, make the normal
+    equations ill-conditioned; scale them to values of order one first.
+
+    """
+
+    def __init__(self):
+        """Constructor for EllipsoidFit"""
+        self._DtD = np.zeros((9, 9), 'float')
+        self._Dt1 = np.zeros((9, ), 'float')
+        self.nbr_points = 0
+
+    @staticmethod
+    def _design_matrix(points):
+        x, y, z = points[:, 0], points[:, 1], points[:, 2]
+        return np.column_stack([x * x, y * y, z * z, 2 * x * y, 2 * x * z, 2 * y * z, 2 * x, 2 * y, 2 * z])
+
+    def add_points(self, points):
+        """Add points to the fit. Points with NaN values are ignored.
+
+        :param points: Array of shape (N, 3).
+        :type points: :py:class:`numpy.ndarray`
+
+        """
+        points = np.asarray(points, 'float').reshape(-1, 3)
+        points = points[np.isfinite(points).all(axis=1)]
+        D = self._design_matrix(points)
+        self._DtD += D.T.dot(D)
+        self._Dt1 += D.sum(axis=0)
+        self.nbr_points += len(points)
+
+    def solve(self):
+        """Solve for the ellipsoid of the points added so far.
+
+        :return: The center ``c`` and the symmetric, positive definite matrix
+            ``A`` of the ellipsoid ``(p - c)^T A (p - c) = 1``.
+        :rtype: tuple
+
+        """
+        if self.nbr_points < 9:
+            raise PyBerryIMUError("At least 9 points are needed to fit an ellipsoid, got {0}.".format(
+                self.nbr_points))
+        try:
+            a, b, c, d, e, f, g, h, i = np.linalg.solve(self._DtD, self._Dt1)
+        except np.linalg.LinAlgError:
+            raise PyBerryIMUError("The points do not determine an ellipsoid; "
+                                  "they must be spread in all directions.")
+        Q = np.array([[a, d, e], [d, b, f], [e, f, c]])
+        center = -np.linalg.solve(Q, [g, h, i])
+        # Moving the origin to the center gives (p - c)^T Q (p - c) = 1 + c^T Q c.
+        A = Q / (1 + center.dot(Q).dot(center))
+        if np.any(np.linalg.eigvalsh(A) <= 0):
+            raise PyBerryIMUError("The points do not lie on an ellipsoid; "
+                                  "they must be spread in all directions.")
+        return center, A
+
+    def get_correction(self):
+        """The affine correction that maps the fitted ellipsoid onto a sphere.
+
+        The correction matrix is the symmetric square root of ``A``, scaled so
+        that the radius of the sphere is the geometric mean of the semi-axes
+        of the ellipsoid. Being symmetric, it adds no rotation of its own.
+
+        :return: The center ``c`` and the correction matrix ``W``; the points
+            ``W (p - c)`` lie on the sphere.
+        :rtype: tuple
+
+        """
+        center, A = self.solve()
+        eigenvalues, eigenvectors = np.linalg.eigh(A)
+        radius = np.prod(eigenvalues) ** (-1 / 6)
+        W = radius * (eigenvectors * np.sqrt(eigenvalues)).dot(eigenvectors.T)
+        return center, W
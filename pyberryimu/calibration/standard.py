@@ -28,11 +28,44 @@ import numpy as np
 
 from pyberryimu import version
 from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.sensors import LSM9DS0
 from pyberryimu.calibration.base import BerryIMUCalibration
+from pyberryimu.calibration.ellipsoid import EllipsoidFit
+
+
+def _calibration_parameter(name):
+    """Property for a calibration parameter, discarding the precompiled maps when it is set.
+
+    The value is stored as a read-only float array, so that it is changed
+    by assignment and never in place, which would leave the maps stale.
+
+    """
+    attr = '_' + name
+
+    def fget(self):
+        return getattr(self, attr, None)
+
+    def fset(self, value):
+        if value is not None:
+            value = np.array(value, 'float')
+            value.flags.writeable = False
+        setattr(self, attr, value)
+        self._affine_maps = {}
+
+    return property(fget, fset)
 
 
 class StandardCalibration(BerryIMUCalibration):
-    """The Standard Calibration object for the PyBerryIMU."""
+    """The Standard Calibration object for the PyBerryIMU.
+
+    :param verbose: Print the progress of calibrations.
+    :type verbose: bool
+    :param use_lut: Transform batches of int16 gyroscope and magnetometer
+        values with lookup tables of all possible raw values, instead of
+        with arithmetic. See :py:meth:`build_lookup_tables`.
+    :type use_lut: bool
+
+    """
 
     # 45 RPM
     RECORD_PLAYER_45_RPM_IN_DPS = 45. * 6
@@ -41,9 +74,21 @@ class StandardCalibration(BerryIMUCalibration):
     RECORD_PLAYER_33_3_RPM_IN_DPS = (33. + 1./3) * 6
     RECORD_PLAYER_33_3_RPM_IN_RADIANS = ((33 + (1 / 3)) / 60) * 2 * np.pi
 
-    def __init__(self, verbose=False):
+    acc_bias_vector = _calibration_parameter('acc_bias_vector')
+    acc_scale_factor_matrix = _calibration_parameter('acc_scale_factor_matrix')
+    gyro_bias_vector = _calibration_parameter('gyro_bias_vector')
+    gyro_scale_factor_vector = _calibration_parameter('gyro_scale_factor_vector')
+    mag_bias_vector = _calibration_parameter('mag_bias_vector')
+    mag_scale_factor_vector = _calibration_parameter('mag_scale_factor_vector')
+    mag_correction_matrix = _calibration_parameter('mag_correction_matrix')
+
+    # The tables of LUT mode have one entry per possible int16 raw value and axis.
+    _LUT_AXIS_OFFSETS = np.arange(3) * (2 ** 16)
+
+    def __init__(self, verbose=False, use_lut=False):
         """Constructor for StandardCalibration"""
         super(StandardCalibration, self).__init__(verbose)
+        self.use_lut = use_lut
 
         # Accelerometer calibration parameters.
         self._acc_zero_g = None
@@ -63,8 +108,12 @@ class StandardCalibration(BerryIMUCalibration):
         self.gyro_scale_factor_vector = None
 
         # Magnetometer calibration parameters.
+        # The ellipsoid fit of the latest calibration, in gauss, which can be continued.
+        self.magnetometer_fit = None
+
         self.mag_bias_vector = None
         self.mag_scale_factor_vector = None
+        self.mag_correction_matrix = None
 
         self.__mid_v = 2 ** 15
         self.__max_v = (2 ** 16) - 1
@@ -80,11 +129,11 @@ class StandardCalibration(BerryIMUCalibration):
         return str(self)
 
     @classmethod
-    def load(cls, doc_path=os.path.expanduser('~/.pyberryimu')):
+    def load(cls, doc_path=os.path.expanduser('~/.pyberryimu'), use_lut=False):
         with open(doc_path, 'rt') as f:
             doc = json.load(f)
 
-        out = cls()
+        out = cls(use_lut=use_lut)
 
         # Transfer BerryIMU settings.
         out.berryimu_settings = doc.get('pyberryimu_version', version)
@@ -105,6 +154,11 @@ class StandardCalibration(BerryIMUCalibration):
         mag_doc = doc.get('magnetometer', {})
         out.mag_bias_vector = np.array(mag_doc.get('bias', [0, 0, 0]), 'float')
         out.mag_scale_factor_vector = np.array(mag_doc.get('scale_factor', [1, 1, 1]), 'float')
+        if mag_doc.get('correction_matrix') is not None:
+            out.mag_correction_matrix = np.reshape(np.array(mag_doc.get('correction_matrix'), 'float'), (3, 3))
+
+        if use_lut:
+            out.build_lookup_tables()
 
         return out
 
@@ -132,6 +186,8 @@ class StandardCalibration(BerryIMUCalibration):
                 'bias': self.mag_bias_vector.tolist()
             }
         })
+        if self.mag_correction_matrix is not None:
+            doc['magnetometer']['correction_matrix'] = self.mag_correction_matrix.flatten().tolist()
         return doc
 
     # Help methods
@@ -321,66 +377,26 @@ class StandardCalibration(BerryIMUCalibration):
         :type points: :py:class:`numpy.ndarray`
 
         """
+        points = np.asarray(points, 'float')
         nbr_points = len(points)
         if nbr_points < 9:
             raise ValueError('Need at least 9 Measurements for the calibration procedure!')
 
-        # Optimisation error function.
-        def error_function(M_mat, b_vec, y):
-            return np.sum((M_mat.dot((y - b_vec)) ** 2)) - 1
-
-        # Method for calculating the Jacobian.
-        def _jacobian(M_mat, b_vec, point):
-            # TODO: Clean up Jacobian calculation code. Make it more concise.
-            jac = np.zeros((9, ), 'float')
-
-            jac[0] = 2 * (b_vec[0] - point[0]) * (
-                M_mat[0, 0] * (b_vec[0] - point[0]) + M_mat[0, 1] * (b_vec[1] - point[1]) + M_mat[0, 2] * (
-                    b_vec[2] - point[2]))
-            jac[1] = 2 * (b_vec[1] - point[1]) * (
-                M_mat[0, 0] * (b_vec[0] - point[0]) + M_mat[0, 1] * (b_vec[1] - point[1]) + M_mat[0, 2] * (
-                    b_vec[2] - point[2])) + 2 * (b_vec[0] - point[0]) * (
-                M_mat[0, 1] * (b_vec[0] - point[0]) + M_mat[1, 1] * (b_vec[1] - point[1]) + M_mat[1, 2] * (
-                    b_vec[2] - point[2]))
-            jac[2] = 2 * (b_vec[0] - point[0]) * (
-                M_mat[0, 2] * (b_vec[0] - point[0]) + M_mat[1, 2] * (b_vec[1] - point[1]) + M_mat[2, 2] * (
-                    b_vec[2] - point[2])) + 2 * (b_vec[2] - point[2]) * (
-                M_mat[0, 0] * (b_vec[0] - point[0]) + M_mat[0, 1] * (b_vec[1] - point[1]) + M_mat[0, 2] * (
-                    b_vec[2] - point[2]))
-            jac[3] = 2 * (b_vec[1] - point[1]) * (
-                M_mat[0, 1] * (b_vec[0] - point[0]) + M_mat[1, 1] * (b_vec[1] - point[1]) + M_mat[1, 2] * (
-                    b_vec[2] - point[2]))
-            jac[4] = 2 * (b_vec[1] - point[1]) * (
-                M_mat[0, 2] * (b_vec[0] - point[0]) + M_mat[1, 2] * (b_vec[1] - point[1]) + M_mat[2, 2] * (
-                    b_vec[2] - point[2])) + 2 * (b_vec[2] - point[2]) * (
-                M_mat[0, 1] * (b_vec[0] - point[0]) + M_mat[1, 1] * (b_vec[1] - point[1]) + M_mat[1, 2] * (
-                    b_vec[2] - point[2]))
-            jac[5] = 2 * (b_vec[2] - point[2]) * (
-                M_mat[0, 2] * (b_vec[0] - point[0]) + M_mat[1, 2] * (b_vec[1] - point[1]) + M_mat[2, 2] * (
-                    b_vec[2] - point[2]))
-            jac[6] = 2 * M_mat[0, 0] * (
-                M_mat[0, 0] * (b_vec[0] - point[0]) + M_mat[0, 1] * (b_vec[1] - point[1]) + M_mat[0, 2] * (
-                    b_vec[2] - point[2])) + 2 * M_mat[0, 1] * (
-                M_mat[0, 1] * (b_vec[0] - point[0]) + M_mat[1, 1] * (b_vec[1] - point[1]) + M_mat[1, 2] * (
-                    b_vec[2] - point[2])) + 2 * M_mat[0, 2] * (
-                M_mat[0, 2] * (b_vec[0] - point[0]) + M_mat[1, 2] * (b_vec[1] - point[1]) + M_mat[2, 2] * (
-                    b_vec[2] - point[2]))
-            jac[7] = 2 * M_mat[0, 1] * (
-                M_mat[0, 0] * (b_vec[0] - point[0]) + M_mat[0, 1] * (b_vec[1] - point[1]) + M_mat[0, 2] * (
-                    b_vec[2] - point[2])) + 2 * M_mat[1, 1] * (
-                M_mat[0, 1] * (b_vec[0] - point[0]) + M_mat[1, 1] * (b_vec[1] - point[1]) + M_mat[1, 2] * (
-                    b_vec[2] - point[2])) + 2 * M_mat[1, 2] * (
-                M_mat[0, 2] * (b_vec[0] - point[0]) + M_mat[1, 2] * (b_vec[1] - point[1]) + M_mat[2, 2] * (
-                    b_vec[2] - point[2]))
-            jac[8] = 2 * M_mat[0, 2] * (
-                M_mat[0, 0] * (b_vec[0] - point[0]) + M_mat[0, 1] * (b_vec[1] - point[1]) + M_mat[0, 2] * (
-                    b_vec[2] - point[2])) + 2 * M_mat[1, 2] * (
-                M_mat[0, 1] * (b_vec[0] - point[0]) + M_mat[1, 1] * (b_vec[1] - point[1]) + M_mat[1, 2] * (
-                    b_vec[2] - point[2])) + 2 * M_mat[2, 2] * (
-                M_mat[0, 2] * (b_vec[0] - point[0]) + M_mat[1, 2] * (b_vec[1] - point[1]) + M_mat[2, 2] * (
-                    b_vec[2] - point[2]))
-
-            return jac
+        # Residuals and Jacobian of the error function ||M(y - b)||^2 - 1 for all points,
+        # with respect to the optimisation vector [Mxx, Mxy, Mxz, Myy, Myz, Mzz, Bx, By, Bz].
+        def residuals_and_jacobian(M_mat, b_vec):
+            d = b_vec - points
+            u = d.dot(M_mat)
+            R = np.einsum('ij,ij->i', u, u) - 1
+            J = np.empty((nbr_points, 9), 'float')
+            J[:, 0] = 2 * d[:, 0] * u[:, 0]
+            J[:, 1] = 2 * (d[:, 1] * u[:, 0] + d[:, 0] * u[:, 1])
+            J[:, 2] = 2 * (d[:, 0] * u[:, 2] + d[:, 2] * u[:, 0])
+            J[:, 3] = 2 * d[:, 1] * u[:, 1]
+            J[:, 4] = 2 * (d[:, 1] * u[:, 2] + d[:, 2] * u[:, 1])
+            J[:, 5] = 2 * d[:, 2] * u[:, 2]
+            J[:, 6:] = 2 * u.dot(M_mat)
+            return R, J
 
         # Convenience method for moving between optimisation vector and correct lin.alg. formulation.
         def optvec_to_M_and_b(v):
@@ -398,22 +414,14 @@ class StandardCalibration(BerryIMUCalibration):
                       self._acc_sensitivity[1], 0.0, self._acc_sensitivity[2],
                       self._acc_zero_g[0], self._acc_zero_g[1], self._acc_zero_g[2]])
         last_x = x.copy()
-        # Residuals vector
-        R = np.zeros((nbr_points, ), 'float')
-        # Jacobian matrix
-        J = np.zeros((nbr_points, 9), 'float')
 
         for n in six.moves.range(nbr_iterations):
-            # Calculate the Jacobian at every iteration.
-            M, b = optvec_to_M_and_b(x)            
-            for i in six.moves.range(nbr_points):
-                R[i] = error_function(M, b, points[i, :])
-                J[i, :] = _jacobian(M, b, points[i, :])
-
-            # Calculate Hessian, Gain matrix and apply it to solution vector.
-            H = np.linalg.inv(J.T.dot(J))
-            D = J.T.dot(R).T
-            x -= gain * (D.dot(H)).T
+            # Calculate the residuals and the Jacobian at every iteration.
+            M, b = optvec_to_M_and_b(x)
+            R, J = residuals_and_jacobian(M, b)
+
+            # The Gauss-Newton step (J^T J)^-1 J^T R, as the least squares solution of J s = R.
+            x -= gain * np.linalg.lstsq(J, R, rcond=-1)[0]
             R_post = np.linalg.norm(R)
             if self._verbose:
                 print("{0}: {1} ({2})".format(n, R_post, ", ".join(["{0:0.9g}".format(v) for v in x])))
@@ -528,16 +536,19 @@ class StandardCalibration(BerryIMUCalibration):
                                   "must be given. See docstring.")
 
         self._gyro_zero_g = np.array(zero_point)
-        self.gyro_scale_factor_vector = np.zeros((3,), 'float')
-        self.gyro_bias_vector = np.zeros((3,), 'float')
+        gyro_scale = np.zeros((3,), 'float')
+        gyro_bias = np.zeros((3,), 'float')
 
         for index in six.moves.range(3):
             this_axis_points = []
             for side in [0, 1]:
                 this_axis_points.append(points[index * 2 + side, index])
-            self.gyro_scale_factor_vector[index], self.gyro_bias_vector[index] = self._calibrate_one_axis_of_gyroscope(
+            gyro_scale[index], gyro_bias[index] = self._calibrate_one_axis_of_gyroscope(
                 reference_rotation, min(this_axis_points), self._gyro_zero_g[index], max(this_axis_points))
 
+        self.gyro_scale_factor_vector = gyro_scale
+        self.gyro_bias_vector = gyro_bias
+
     def _calibrate_one_axis_of_gyroscope(self, dps_reference, neg_val, zero, pos_val):
         x = [neg_val, zero, pos_val]
         y = [-dps_reference, 0, dps_reference]
@@ -545,57 +556,310 @@ class StandardCalibration(BerryIMUCalibration):
 
     # Magnetometer calibration methods
 
-    def calibrate_magnetometer(self, client, **kwargs):
-        """Calibrate Magnetometer. Right now only data sheet values are used.
+    def calibrate_magnetometer(self, client, duration=60, batch_size=20, continue_fit=False):
+        """Perform hard and soft iron calibration of the magnetometer.
+
+        The user rotates the BerryIMU slowly in all directions while raw
+        magnetometer values are recorded. Without distortions these would lie
+        on a sphere; the hard iron effect of magnetised material fixed to the
+        board offsets the sphere, and the soft iron effect of nearby
+        ferromagnetic material and sensor scale differences deform it into an
+        ellipsoid. An ellipsoid is fitted to the values, converted to gauss
+        with the data sheet sensitivity, and the calibration maps it back onto
+        a sphere:
+
+        ``m_calib = W (scale * m_raw + bias)``
+
+        where ``-bias`` is the center of the ellipsoid and the correction
+        matrix ``W`` is given by its shape. The radius of the sphere is the
+        geometric mean of the semi-axes of the ellipsoid.
+
+        The fit is updated with every batch of values read, keeping only its
+        normal equations, so the recording can be arbitrarily long. It is kept
+        as :py:attr:`magnetometer_fit`, and with ``continue_fit`` the values
+        are added to it, extending the previous calibration with more data.
+        The fit is in gauss, so it may be continued at another full scale.
+
+        Reference:
+        Tim Ozyagcilar, "Calibrating an eCompass in the Presence of Hard and
+        Soft-Iron Interference", Freescale Semiconductor Application Note AN4246, 2015
 
         :param client: The BerryIMU communication client.
         :type client: :py:class:`pyberryimu.client.BerryIMUClient`
+        :param duration: Number of seconds to record values for.
+        :type duration: float
+        :param batch_size: Number of values to read between updates of the fit.
+        :type batch_size: int
+        :param continue_fit: Add the values to :py:attr:`magnetometer_fit`
+            instead of starting a new fit.
+        :type continue_fit: bool
 
         """
         self.set_datasheet_values_for_magnetometer(client.get_settings())
+        fit = self._get_magnetometer_fit(continue_fit)
+        raw_values = np.zeros((batch_size, 3), 'int16')
+
+        raw_input('Rotate the BerryIMU slowly around all its axes, pointing each axis up and down, '
+                  'during the next {0} seconds. Start by pressing Enter.'.format(duration))
+        t = time.time()
+        while (time.time() - t) < duration:
+            client.read_magnetometer_batch(batch_size, out=raw_values)
+            fit.add_points(raw_values * self.mag_scale_factor_vector)
+            if self._verbose:
+                print("{0} points recorded.".format(fit.nbr_points))
+
+        self._set_magnetometer_fit(fit)
+
+    def calibrate_magnetometer_with_container(self, container, chunk_size=1000, continue_fit=False):
+        """Perform hard and soft iron calibration of the magnetometer with recorded values.
+
+        See :py:meth:`calibrate_magnetometer`. The container must hold raw
+        magnetometer values of the BerryIMU being rotated in all directions;
+        they are added to the fit in chunks.
+
+        :param container: The recording to calibrate with.
+        :type container: :py:class:`pyberryimu.container.IMUDataContainer`
+        :param chunk_size: Number of values to add to the fit at a time.
+        :type chunk_size: int
+        :param continue_fit: Add the values to :py:attr:`magnetometer_fit`
+            instead of starting a new fit.
+        :type continue_fit: bool
+
+        """
+        if container.magnetometer is None:
+            raise PyBerryIMUError("The container has no magnetometer values.")
+        if container.calibration_parameters and 'magnetometer' in container.calibration_parameters:
+            raise PyBerryIMUError("The magnetometer values in the container are already calibrated.")
+
+        self.set_datasheet_values_for_magnetometer(container.client_settings)
+        fit = self._get_magnetometer_fit(continue_fit)
+        for start in six.moves.range(0, len(container.magnetometer), chunk_size):
+            fit.add_points(container.magnetometer[start:start + chunk_size] * self.mag_scale_factor_vector)
+
+        self._set_magnetometer_fit(fit)
+
+    def _get_magnetometer_fit(self, continue_fit):
+        if not continue_fit:
+            return EllipsoidFit()
+        if self.magnetometer_fit is None:
+            raise PyBerryIMUError("There is no magnetometer fit to continue.")
+        return self.magnetometer_fit
+
+    def _set_magnetometer_fit(self, fit):
+        center, correction_matrix = fit.get_correction()
+        self.magnetometer_fit = fit
+        self.mag_bias_vector = -center
+        self.mag_correction_matrix = correction_matrix
 
     # Data sheet values setters
 
     def set_datasheet_values_for_accelerometer(self, client_settings):
         """Sets data sheet values for transforming BerryIMU accelerometer data to SI Units."""
         self.acc_bias_vector = np.zeros((3, ), 'float')
-        self.acc_scale_factor_matrix = np.eye(3) * {
-            2: 0.061 / 1000.,
-            4: 0.122 / 1000.,
-            6: 0.183 / 1000.,
-            8: 0.244 / 1000.,
-            16: 0.732 / 1000.
-        }.get(client_settings.get('accelerometer').get('full_scale'))
+        self.acc_scale_factor_matrix = np.eye(3) * LSM9DS0.ACCELEROMETER_SENSITIVITY.get(
+            client_settings.get('accelerometer').get('full_scale'))
 
     def set_datasheet_values_for_gyroscope(self, client_settings):
         """Sets data sheet values for transforming BerryIMU gyroscope data to SI Units."""
         self.gyro_bias_vector = np.zeros((3, ), 'float')
-        self.gyro_scale_factor_vector = np.ones((3, ), 'float') * {
-            245: 8.75 / 1000.,
-            500: 17.50 / 1000.,
-            2000: 70 / 1000.,
-        }.get(client_settings.get('gyroscope').get('full_scale'))
+        self.gyro_scale_factor_vector = np.ones((3, ), 'float') * LSM9DS0.GYROSCOPE_SENSITIVITY.get(
+            client_settings.get('gyroscope').get('full_scale'))
 
     def set_datasheet_values_for_magnetometer(self, client_settings):
         """Sets data sheet values for transforming BerryIMU magnetometer data to SI Units."""
         self.mag_bias_vector = np.zeros((3, ), 'float')
-        self.mag_scale_factor_vector = np.ones((3, ), 'float') * {
-            2: 0.08 / 1000.,
-            4: 0.16 / 1000.,
-            8: 0.32 / 1000.,
-            12: 0.48 / 1000.
-        }.get(client_settings.get('magnetometer').get('full_scale'))
+        self.mag_scale_factor_vector = np.ones((3, ), 'float') * LSM9DS0.MAGNETOMETER_SENSITIVITY.get(
+            client_settings.get('magnetometer').get('full_scale'))
+        self.mag_correction_matrix = None
+
+    # Full scale changes
+
+    def rescale_full_scale(self, sensor, old_full_scale, new_full_scale):
+        """Adapt the calibration to a changed full scale of a sensor.
+
+        One raw count at the new full scale corresponds to ``r`` counts at the
+        old one, where ``r`` is the ratio of the data sheet sensitivities, so
+        the scale factors are multiplied by ``r``. The accelerometer bias is
+        applied to normalised values and is adjusted for the changed offset
+        of the normalisation as well.
+
+        :param sensor: One of ``'accelerometer'``, ``'gyroscope'`` and ``'magnetometer'``.
+        :type sensor: str
+        :param old_full_scale: The full scale the calibration was made for.
+        :type old_full_scale: int
+        :param new_full_scale: The new full scale.
+        :type new_full_scale: int
+
+        """
+        sensitivities = {
+            'accelerometer': LSM9DS0.ACCELEROMETER_SENSITIVITY,
+            'gyroscope': LSM9DS0.GYROSCOPE_SENSITIVITY,
+            'magnetometer': LSM9DS0.MAGNETOMETER_SENSITIVITY,
+        }.get(sensor)
+        r = sensitivities.get(new_full_scale) / sensitivities.get(old_full_scale)
+
+        if sensor == 'accelerometer':
+            if self.acc_scale_factor_matrix is not None:
+                self.acc_bias_vector = (self.acc_bias_vector + (r - 1) * self.__mid_v / self.__max_v) / r
+                self.acc_scale_factor_matrix = self.acc_scale_factor_matrix * r
+        elif sensor == 'gyroscope':
+            if self.gyro_scale_factor_vector is not None:
+                self.gyro_scale_factor_vector = self.gyro_scale_factor_vector * r
+        elif self.mag_scale_factor_vector is not None:
+            self.mag_scale_factor_vector = self.mag_scale_factor_vector * r
+
+        if isinstance(self.berryimu_settings, dict) and sensor in self.berryimu_settings:
+            self.berryimu_settings[sensor]['full_scale'] = new_full_scale
 
     def transform_accelerometer_values(self, acc_values):
-        # Normalize and then apply the calibration scale matrix and bias.
-        converted_g_values = self.acc_scale_factor_matrix.dot(
-            self.acc_to_ratio(np.array(acc_values)) - self.acc_bias_vector)
-        return tuple(converted_g_values.tolist())
+        # Single samples are transformed in pure Python, which is faster than NumPy for three values.
+        (a00, a01, a02, a10, a11, a12, a20, a21, a22), (c0, c1, c2) = \
+            self._get_affine_map('accelerometer')[2:]
+        x, y, z = acc_values
+        return (a00 * x + a01 * y + a02 * z + c0,
+                a10 * x + a11 * y + a12 * z + c1,
+                a20 * x + a21 * y + a22 * z + c2)
 
     def transform_gyroscope_values(self, gyro_values):
-        return tuple(((self.gyro_scale_factor_vector * gyro_values) +
-                      self.gyro_bias_vector).tolist())
+        (s0, s1, s2), (b0, b1, b2) = self._get_affine_map('gyroscope')[2:]
+        x, y, z = gyro_values
+        return s0 * x + b0, s1 * y + b1, s2 * z + b2
 
     def transform_magnetometer_values(self, mag_values):
-        return tuple(((self.mag_scale_factor_vector * mag_values) +
-                      self.mag_bias_vector).tolist())
+        matrix, (b0, b1, b2) = self._get_affine_map('magnetometer')[2:]
+        x, y, z = mag_values
+        if len(matrix) == 3:
+            s0, s1, s2 = matrix
+            return s0 * x + b0, s1 * y + b1, s2 * z + b2
+        a00, a01, a02, a10, a11, a12, a20, a21, a22 = matrix
+        return (a00 * x + a01 * y + a02 * z + b0,
+                a10 * x + a11 * y + a12 * z + b1,
+                a20 * x + a21 * y + a22 * z + b2)
+
+    def _get_affine_map(self, sensor):
+        """The calibration of a sensor as an affine map of raw values, ``matrix.dot(v) + offset``.
+
+        The map is compiled on first use and kept until a calibration
+        parameter is set. For the accelerometer, the normalisation, bias and
+        scale matrix are folded into one map, and likewise for the
+        magnetometer with a correction matrix. Diagonal maps, i.e. those of
+        the gyroscope and of the magnetometer without a correction matrix,
+        are given with scale vectors instead of matrices.
+
+        :param sensor: One of ``'accelerometer'``, ``'gyroscope'`` and ``'magnetometer'``.
+        :type sensor: str
+        :return: Matrix, offset, and the same as flat tuples of floats.
+        :rtype: tuple
+
+        """
+        affine_map = self._affine_maps.get(sensor)
+        if affine_map is None:
+            if sensor == 'accelerometer':
+                matrix = self.acc_scale_factor_matrix / self.__max_v
+                offset = self.acc_scale_factor_matrix.dot((self.__mid_v / self.__max_v) - self.acc_bias_vector)
+            elif sensor == 'gyroscope':
+                matrix, offset = self.gyro_scale_factor_vector, self.gyro_bias_vector
+            elif self.mag_correction_matrix is None:
+                matrix, offset = self.mag_scale_factor_vector, self.mag_bias_vector
+            else:
+                matrix = self.mag_correction_matrix * self.mag_scale_factor_vector
+                offset = self.mag_correction_matrix.dot(self.mag_bias_vector)
+            affine_map = (matrix, offset, tuple(matrix.flatten().tolist()), tuple(offset.tolist()))
+            self._affine_maps[sensor] = affine_map
+        return affine_map
+
+    def _get_lookup_table(self, sensor):
+        """The calibrated values of all int16 raw values of a sensor, axis after axis.
+
+        The table is built on first use and kept until a calibration parameter is set.
+        Entry ``axis * 2 ** 16 + index`` is the calibrated value of the raw value whose
+        uint16 bit pattern is ``index``.
+
+        """
+        lut = self._affine_maps.get(sensor + '_lut')
+        if lut is None:
+            scale, bias = self._get_affine_map(sensor)[:2]
+            raw_values = np.arange(2 ** 16).astype('uint16').view('int16')
+            lut = (scale[:, np.newaxis] * raw_values + bias[:, np.newaxis]).astype('float32').ravel()
+            self._affine_maps[sensor + '_lut'] = lut
+        return lut
+
+    def build_lookup_tables(self):
+        """Build the lookup tables used for batch transforms in LUT mode.
+
+        In LUT mode the gyroscope and magnetometer batch transforms of int16
+        arrays, e.g. from :py:meth:`~pyberryimu.client.BerryIMUClient.read_imu_batch`,
+        are done with one lookup in a float32 table per sensor, holding the
+        calibrated value of every possible raw value on each axis. Batches of
+        other types, and magnetometer values if there is a correction matrix,
+        are transformed with arithmetic. The tables are otherwise built at
+        the first batch transform, and are rebuilt after the calibration
+        parameters have been changed.
+
+        :return: The memory used by the lookup tables, in bytes.
+        :rtype: int
+
+        """
+        self._get_lookup_table('gyroscope')
+        if self.mag_correction_matrix is None:
+            self._get_lookup_table('magnetometer')
+        return self.lookup_tables_nbytes
+
+    @property
+    def lookup_tables_nbytes(self):
+        """The memory used by the lookup tables currently built, in bytes."""
+        return sum(self._affine_maps[key].nbytes for key in ('gyroscope_lut', 'magnetometer_lut')
+                   if key in self._affine_maps)
+
+    def _transform_with_lookup_table(self, sensor, values, out):
+        out[...] = self._get_lookup_table(sensor)[values.view('uint16') + self._LUT_AXIS_OFFSETS]
+        return out
+
+    @staticmethod
+    def _prepare_batch(values, out):
+        values = np.asarray(values)
+        if out is None:
+            out = np.empty(values.shape, 'float')
+        return values, out
+
+    @staticmethod
+    def _transform_with_matrix(matrix, offset, values, out):
+        if np.may_share_memory(values, out):
+            values = values.copy()
+        np.einsum('ij,...j->...i', matrix, values, out=out)
+        out += offset
+        return out
+
+    def transform_accelerometer_batch(self, acc_values, out=None):
+        acc_values, out = self._prepare_batch(acc_values, out)
+        acc_matrix, acc_offset = self._get_affine_map('accelerometer')[:2]
+        return self._transform_with_matrix(acc_matrix, acc_offset, acc_values, out)
+
+    def transform_gyroscope_batch(self, gyro_values, out=None):
+        gyro_values, out = self._prepare_batch(gyro_values, out)
+        if self.use_lut and gyro_values.dtype == np.int16:
+            return self._transform_with_lookup_table('gyroscope', gyro_values, out)
+        gyro_scale, gyro_bias = self._get_affine_map('gyroscope')[:2]
+        np.multiply(gyro_values, gyro_scale, out=out)
+        out += gyro_bias
+        return out
+
+    def transform_magnetometer_batch(self, mag_values, out=None):
+        mag_values, out = self._prepare_batch(mag_values, out)
+        mag_matrix, mag_bias = self._get_affine_map('magnetometer')[:2]
+        if mag_matrix.ndim == 2:
+            return self._transform_with_matrix(mag_matrix, mag_bias, mag_values, out)
+        if self.use_lut and mag_values.dtype == np.int16:
+            return self._transform_with_lookup_table('magnetometer', mag_values, out)
+        np.multiply(mag_values, mag_matrix, out=out)
+        out += mag_bias
+        return out
+
+    def transform_imu_values(self, imu_values, out=None):
+        imu_values, out = self._prepare_batch(imu_values, out)
+        if np.may_share_memory(imu_values, out):
+            imu_values = imu_values.copy()
+        self.transform_accelerometer_batch(imu_values[..., 0:3], out=out[..., 0:3])
+        self.transform_gyroscope_batch(imu_values[..., 3:6], out=out[..., 3:6])
+        self.transform_magnetometer_batch(imu_values[..., 6:9], out=out[..., 6:9])
+        return out
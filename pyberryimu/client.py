@@ -19,12 +19,19 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
+import os
 import time
+import json
+import zlib
+import struct
 
-from smbus import SMBus
+import six
+import numpy as np
 
 from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.transport import get_transport_factory, InstrumentedTransport, RetryingTransport
 from pyberryimu.sensors import LSM9DS0, BMP180
+from pyberryimu.configuration import BerryIMUConfiguration, CONTROL_REGISTERS
 from pyberryimu.calibration.base import BerryIMUCalibration
 
 
@@ -44,7 +51,7 @@ class BerryIMUClient(object):
     * 'enabled_z': [<True>, False],
     * 'anti_alias': [<773>, 194, 362, 50],
     * 'full_scale': [2, 4, 6, <8>, 16],
-    * 'self_test': [<0>, 1, -1, 'X']
+    * 'self_test': [<0>, 1, -1]
 
     Gyroscope:
 
@@ -68,49 +75,174 @@ class BerryIMUClient(object):
     * 'high_resolution': [<True>, False],
     * 'enabled_temp': [<True>, False]
 
+    The magnetometer data rate 100 Hz requires an accelerometer data rate
+    above 50 Hz, or the accelerometer powered down.
+
     Read more about these settings in the
     `LSM9DS0 data sheet <http://ozzmaker.com/wp-content/uploads/2014/12/LSM9DS0.pdf>`_.
 
-    For the barometric pressure sensor BMP180, docstring will be written.
-    `BMP180 data sheet <http://ozzmaker.com/wp-content/uploads/2015/01/BMP180-DS000-09.pdf>`_
+    Barometer:
+
+    * 'oversampling': [0, 1, 2, <3>]
+    * 'temperature_refresh_count': [None, <1>, 2, ...]
+    * 'temperature_refresh_interval': [<None>, seconds as float]
+
+    The oversampling setting of the barometric pressure sensor BMP180 selects
+    between ultra low power (0), standard (1), high resolution (2) and
+    ultra high resolution (3) mode, with pressure conversion times of
+    4.5, 7.5, 13.5 and 25.5 ms respectively.
+    A pressure value from the BMP180 requires a
+    temperature compensation value, obtained from a temperature conversion.
+    The latest one is reused by pressure and temperature reads until it has been
+    used 'temperature_refresh_count' times or is older than
+    'temperature_refresh_interval' seconds; ``None`` disables either criterion.
+    Read more in the
+    `BMP180 data sheet <http://ozzmaker.com/wp-content/uploads/2015/01/BMP180-DS000-09.pdf>`_.
+
+    The settings are validated and compiled to control register values by a
+    :py:class:`pyberryimu.configuration.BerryIMUConfiguration`, which can also
+    be given as ``settings``. Unknown settings and invalid values raise a
+    :py:class:`pyberryimu.exc.PyBerryIMUError`.
+
+    The status register and the three output registers of the accelerometer,
+    gyroscope and magnetometer are by default read in one I2C block read each,
+    using the register address auto-increment of the LSM9DS0. Set ``burst_read``
+    to ``False`` to fall back to reading the output registers one byte at a time.
+
+    The I2C bus is accessed through a transport, selected with ``transport``:
+    ``'smbus'`` (default) uses smbus-cffi, ``'i2c-dev'`` uses the I2C_RDWR ioctl
+    on ``/dev/i2c-N`` directly and can read all three LSM9DS0 sensors in one
+    ioctl call, or an instance of :py:class:`pyberryimu.transport.I2CTransport`,
+    e.g. a :py:class:`pyberryimu.transport.MemoryTransport` for testing.
+
+    The client keeps a shadow copy of every LSM9DS0 register it writes, from
+    which :py:meth:`get_settings` is served without bus traffic. Use
+    :py:meth:`verify_settings` to compare the shadow copy with the device.
+
+    Only the sensors listed in ``enabled_sensors``, of ``'accelerometer'``,
+    ``'gyroscope'``, ``'magnetometer'`` and ``'barometer'``, are initialised;
+    the other LSM9DS0 sensors are powered down at :py:meth:`open`, and reading
+    from them raises an error. With ``lazy_init``, each enabled sensor is
+    initialised at its first use instead of at :py:meth:`open`.
+
+    Reading the 22 bytes of BMP180 calibration EEPROM can be avoided by giving
+    a JSON file to store the calibration coefficients in, as ``bmp180_cache``.
+    The coefficients are stored per I2C bus and device address together with a
+    CRC-32 checksum, and validated at each start by the checksum and by reading
+    only the first coefficient from the device. A replacement BMP180 with the
+    same first coefficient is not detected, so the cache file should be
+    removed when the sensor is replaced.
+
+    With ``instrument`` set, the transport is wrapped in a
+    :py:class:`pyberryimu.transport.InstrumentedTransport`, recording the
+    number of bus transactions, bytes, errors and latencies for every register,
+    which are available from :py:meth:`stats`. Without it, nothing is recorded
+    and the transactions have no extra cost.
+
+    Transient I2C errors are retried ``retries`` times, with a delay starting
+    at ``retry_backoff`` seconds and doubled for every retry, up to
+    ``retry_max_backoff`` seconds. With ``nan_on_error``, a sample that still
+    cannot be read is returned as NaN values by the ``read_*`` methods of the
+    LSM9DS0 sensors instead of raising the error, skipped by the int16 batch
+    reads, and counted in :py:attr:`missing_samples`; a failed poll ends
+    :py:meth:`wait_for_data_ready`. After every such error,
+    :py:meth:`restore_settings` is called, rewriting the control registers of
+    only the sensors whose registers no longer hold the written values, e.g.
+    after a power glitch.
 
     """
 
-    def __init__(self, bus=1, settings=None):
+    SENSORS = ('accelerometer', 'gyroscope', 'magnetometer', 'barometer')
+
+    # Address and control registers written for each of the LSM9DS0 sensors.
+    _CONTROL_REGISTERS = {
+        'accelerometer': (LSM9DS0.ACC_ADDRESS, (LSM9DS0.CTRL_REG0_XM, LSM9DS0.CTRL_REG1_XM,
+                                                LSM9DS0.CTRL_REG2_XM, LSM9DS0.FIFO_CTRL_REG)),
+        'gyroscope': (LSM9DS0.GYR_ADDRESS, (LSM9DS0.CTRL_REG1_G, LSM9DS0.CTRL_REG4_G,
+                                            LSM9DS0.CTRL_REG5_G, LSM9DS0.FIFO_CTRL_REG_G)),
+        'magnetometer': (LSM9DS0.MAG_ADDRESS, (LSM9DS0.CTRL_REG5_XM, LSM9DS0.CTRL_REG6_XM,
+                                               LSM9DS0.CTRL_REG7_XM)),
+    }
+
+    # Register writes powering down each of the LSM9DS0 sensors.
+    _POWER_DOWN_REGISTERS = {
+        # Accelerometer data rate set to power-down.
+        'accelerometer': (LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG1_XM, 0b00000000),
+        # Gyroscope power-down mode.
+        'gyroscope': (LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG1_G, 0b00000000),
+        # Magnetometer sensor mode set to power-down.
+        'magnetometer': (LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG7_XM, 0b00000011),
+    }
+
+    # Address, status register and first output register of the LSM9DS0 sensors.
+    _OUTPUT_REGISTERS = {
+        'accelerometer': (LSM9DS0.ACC_ADDRESS, LSM9DS0.STATUS_REG_A, LSM9DS0.OUT_X_L_A),
+        'gyroscope': (LSM9DS0.GYR_ADDRESS, LSM9DS0.STATUS_REG_G, LSM9DS0.OUT_X_L_G),
+        'magnetometer': (LSM9DS0.MAG_ADDRESS, LSM9DS0.STATUS_REG_M, LSM9DS0.OUT_X_L_M),
+    }
+
+    # Burst reads of status and output registers of all three LSM9DS0 sensors.
+    _imu_batch_requests = [
+        (LSM9DS0.ACC_ADDRESS, LSM9DS0.STATUS_REG_A | LSM9DS0.AUTO_INCREMENT, 7),
+        (LSM9DS0.GYR_ADDRESS, LSM9DS0.STATUS_REG_G | LSM9DS0.AUTO_INCREMENT, 7),
+        (LSM9DS0.MAG_ADDRESS, LSM9DS0.STATUS_REG_M | LSM9DS0.AUTO_INCREMENT, 7),
+    ]
+
+    def __init__(self, bus=1, settings=None, burst_read=True, transport=None,
+                 enabled_sensors=None, lazy_init=False, bmp180_cache=None, instrument=False,
+                 retries=0, retry_backoff=0.001, retry_max_backoff=0.05, nan_on_error=False):
         """Constructor for BerryIMUClient"""
 
-        self._bus = None
+        self._transport = None
+        self._transport_factory = get_transport_factory(transport)
+        self._instrument = instrument
+        self._instrumented_transport = None
+        self._retry_policy = (retries, retry_backoff, retry_max_backoff)
+        self._nan_on_error = nan_on_error
+        self._missing_samples = 0
         self._calibration_object = BerryIMUCalibration()
 
         # Init time settings.
         self._bus_no = bus
-        self._acc_setup = self._create_accelerometer_settings_dict(
-            settings.get('accelerometer', {}) if settings is not None else {})
-        self._gyro_setup = self._create_gyroscope_settings_dict(
-            settings.get('gyroscope', {}) if settings is not None else {})
-        self._mag_setup = self._create_magnetometer_settings_dict(
-            settings.get('magnetometer', {}) if settings is not None else {})
-
-        # BMP180 calibration values.
-        self.__ac1 = None
-        self.__ac2 = None
-        self.__ac3 = None
-        self.__ac4 = None
-        self.__ac5 = None
-        self.__ac6 = None
-        self.__b1 = None
-        self.__b2 = None
-        self.__mb = None
-        self.__mc = None
-        self.__md = None
+        self._burst_read = burst_read
+        self._enabled_sensors = tuple(enabled_sensors) if enabled_sensors is not None else self.SENSORS
+        for sensor in self._enabled_sensors:
+            if sensor not in self.SENSORS:
+                raise PyBerryIMUError("Unknown sensor: {0}".format(sensor))
+        self._lazy_init = lazy_init
+        self._bmp180_cache = bmp180_cache
+        self._initialized = set()
+        self._imu_raw_buffer = np.zeros((10, ), 'float')
+        self._status = dict.fromkeys(self._OUTPUT_REGISTERS)
+        # Shadow copy of the LSM9DS0 registers written, keyed by (address, register).
+        self._register_cache = {}
+        self._overrun_counts = dict.fromkeys(self._OUTPUT_REGISTERS, 0)
+        self._set_configuration(settings if isinstance(settings, BerryIMUConfiguration)
+                                else BerryIMUConfiguration(settings))
+
+        # BMP180 calibration values and conversion state.
+        self._bmp180_calibration = None
+        self._bmp180_state = None
+        self._bmp180_ready_time = None
+        self._bmp180_continuous = False
+        self._bmp180_pressure_wanted = False
+        self._bmp180_temperature_wanted = False
+        self._bmp180_b5 = None
+        self._bmp180_b5_uses = 0
+        self._latest_temperature = (None, None)
+        self._latest_pressure = (None, None)
 
     @property
-    def bus(self):
-        if self._bus is not None:
-            return self._bus
+    def transport(self):
+        if self._transport is not None:
+            return self._transport
         else:
             self.open()
-            return self.bus
+            return self.transport
+
+    @property
+    def bus(self):
+        return self.transport.bus
 
     @property
     def calibration_object(self):
@@ -123,13 +255,19 @@ class BerryIMUClient(object):
 
     def open(self):
         try:
-            self._bus = SMBus(self._bus_no)
-        except IOError as e:
-            if str(e) == '2':
+            transport = self._transport_factory(self._bus_no)
+            if self._instrument:
+                transport = self._instrumented_transport = InstrumentedTransport(transport)
+            if self._retry_policy[0]:
+                transport = RetryingTransport(transport, *self._retry_policy)
+            self._transport = transport
+        except (IOError, OSError) as e:
+            error_code = str(e.errno if e.errno is not None else e)
+            if error_code == '2':
                 raise PyBerryIMUError("/dev/i2c-{0} not found. (IOError 2)".format(self._bus_no))
-            elif str(e) == '5':
+            elif error_code == '5':
                 raise PyBerryIMUError("I2C Input/Output error. (IOError 5)".format(self._bus_no))
-            elif str(e) == '13':
+            elif error_code == '13':
                 raise PyBerryIMUError("Permission to read and/or write to "
                                       "/dev/i2c-{0} missing. (IOError 13)".format(self._bus_no))
             else:
@@ -137,15 +275,19 @@ class BerryIMUClient(object):
         except Exception as e:
             raise PyBerryIMUError('Unhandled {0}: {1}'.format(type(e), e))
         else:
-            self._init_accelerometer()
-            self._init_gyroscope()
-            self._init_magnetometer()
-            self._init_barometric_pressure_sensor()
+            self._register_cache = {}
+            self._initialized = set()
+            for sensor, (address, register, value) in sorted(self._POWER_DOWN_REGISTERS.items()):
+                if sensor not in self._enabled_sensors:
+                    self._write(address, register, value)
+            if not self._lazy_init:
+                for sensor in self._enabled_sensors:
+                    self._init_sensor(sensor)
 
     def close(self):
-        if self._bus is not None:
+        if self._transport is not None:
             try:
-                self._bus.close()
+                self._transport.close()
             except Exception as e:
                 # TODO: Test what errors can occur and handle these better.
                 print("Exception at closing of i2c bus: {0}".format(e))
@@ -157,146 +299,341 @@ class BerryIMUClient(object):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+    def stats(self):
+        """Get the bus transaction statistics recorded since the client was opened.
+
+        See :py:meth:`pyberryimu.transport.InstrumentedTransport.stats`.
+
+        :return: The transaction statistics, in total, per device and per register.
+        :rtype: dict
+
+        """
+        if not self._instrument:
+            raise PyBerryIMUError("Instrumentation is not enabled for this client.")
+        if self._transport is None:
+            self.open()
+        return self._instrumented_transport.stats()
+
+    def reset_stats(self):
+        """Discard the bus transaction statistics recorded so far."""
+        if not self._instrument:
+            raise PyBerryIMUError("Instrumentation is not enabled for this client.")
+        if self._transport is None:
+            self.open()
+        self._instrumented_transport.reset()
+
+    @property
+    def enabled_sensors(self):
+        return self._enabled_sensors
+
     # Initialisation methods
 
-    def _create_accelerometer_settings_dict(self, setup_dict):
-        return {
-            'data_rate': setup_dict.get('data_rate', 200),
-            'continuous_update': setup_dict.get('continuous_update', False),
-            'enabled_z': setup_dict.get('enabled_z', True),
-            'enabled_y': setup_dict.get('enabled_y', True),
-            'enabled_x': setup_dict.get('enabled_x', True),
-            'anti_alias': setup_dict.get('anti_alias', 773),
-            'full_scale': setup_dict.get('full_scale', 8),
-            'self_test': setup_dict.get('self_test', 0)
-        }
+    def _init_sensor(self, sensor):
+        """Initialise one of the sensors according to the settings."""
+        {
+            'accelerometer': self._init_accelerometer,
+            'gyroscope': self._init_gyroscope,
+            'magnetometer': self._init_magnetometer,
+            'barometer': self._init_barometric_pressure_sensor,
+        }.get(sensor)()
+        self._initialized.add(sensor)
+
+    def _ensure_initialized(self, sensor):
+        """Initialise an enabled sensor at its first use, opening the client if required."""
+        if self._transport is None:
+            self.open()
+        if sensor not in self._initialized:
+            if sensor not in self._enabled_sensors:
+                raise PyBerryIMUError("The {0} is not enabled.".format(sensor))
+            self._init_sensor(sensor)
+
+    def _set_configuration(self, configuration):
+        self._configuration = configuration
+        self._acc_setup = configuration['accelerometer']
+        self._gyro_setup = configuration['gyroscope']
+        self._mag_setup = configuration['magnetometer']
+        self._baro_setup = configuration['barometer']
+
+    @property
+    def configuration(self):
+        """The validated settings of the client.
+
+        :rtype: :py:class:`pyberryimu.configuration.BerryIMUConfiguration`
+
+        """
+        return self._configuration
+
+    def _init_lsm9ds0_sensor(self, sensor):
+        """Write the control registers of one of the LSM9DS0 sensors."""
+        for address, register, value in self._configuration.get_registers(sensor):
+            self._write(address, register, value)
 
     def _init_accelerometer(self):
         """Initialize the accelerometer according to the settings document sent in."""
-        # TODO: Better init handling!
-
-        reg1_value = (
-            LSM9DS0.get_accelerometer_data_rate_bits(self._acc_setup.get('data_rate')) +
-            ('0' if self._acc_setup.get('continuous_update') else '1') +
-            ('1' if self._acc_setup.get('enabled_z') else '0') +
-            ('1' if self._acc_setup.get('enabled_y') else '0') +
-            ('1' if self._acc_setup.get('enabled_x') else '0')
-        )
-        # Write data rate, enabled axes and block data update.
-        self._write(LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG1_XM, int(reg1_value, 2))
-
-        reg2_value = (
-            LSM9DS0.get_accelerometer_anti_alias_filter_bits(self._acc_setup.get('anti_alias')) +
-            LSM9DS0.get_accelerometer_full_scale_bits(self._acc_setup.get('full_scale')) +
-            LSM9DS0.get_accelerometer_self_test_bits(self._acc_setup.get('self_test')) +
-            '0'  # SPI Serial Interface Mode selection
-        )
-        # Write anti-alias filter bandwidth, acceleration full scale and self-test mode.
-        self._write(LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG2_XM, int(reg2_value, 2))
-
-    def _create_gyroscope_settings_dict(self, setup_dict):
-        return {
-            'data_rate': setup_dict.get('data_rate', 190),
-            'bandwidth_level': setup_dict.get('bandwidth_level', 0),
-            'powerdown_mode': setup_dict.get('powerdown_mode', False),
-            'enabled_z': setup_dict.get('enabled_z', True),
-            'enabled_y': setup_dict.get('enabled_y', True),
-            'enabled_x': setup_dict.get('enabled_x', True),
-            'continuous_update': setup_dict.get('continuous_update', False),
-            'little_endian': setup_dict.get('little_endian', False),
-            'full_scale': setup_dict.get('full_scale', 500),
-            'self_test': setup_dict.get('self_test', 0)
-        }
+        self._init_lsm9ds0_sensor('accelerometer')
 
     def _init_gyroscope(self):
         """Initialize the gyroscope according to the settings document sent in."""
-        # TODO: Better init handling!
-
-        reg1_value = (
-            LSM9DS0.get_gyroscope_data_rate_bits(self._gyro_setup.get('data_rate')) +
-            LSM9DS0.get_gyroscope_bandwidth_bits(self._gyro_setup.get('bandwidth_level')) +
-            ('0' if self._gyro_setup.get('powerdown_mode') else '1') +
-            ('1' if self._gyro_setup.get('enabled_z') else '0') +
-            ('1' if self._gyro_setup.get('enabled_y') else '0') +
-            ('1' if self._gyro_setup.get('enabled_x') else '0')
-        )
-        self._write(LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG1_G, int(reg1_value, 2))
-
-        # TODO: Add setup for high-pass filter, LSM9DS0.CTRL_REG2_G and LSM9DS0.CTRL_REG5_G
-
-        reg4_value = (
-            ('0' if self._gyro_setup.get('continuous_update') else '1') +
-            ('1' if self._gyro_setup.get('little_endian') else '0') +
-            LSM9DS0.get_gyroscope_full_scale_bits(self._gyro_setup.get('full_scale')) +
-            '0' +  # Unused bit.
-            LSM9DS0.get_gyroscope_self_test_bits(self._gyro_setup.get('self_test')) +
-            '0'  # SPI Serial Interface Mode selection
-        )
-        self._write(LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG4_G, int(reg4_value, 2))
-
-    def _create_magnetometer_settings_dict(self, setup_dict):
-        return {
-            'enabled_temp': setup_dict.get('enabled_temp', True),
-            'data_rate': setup_dict.get('data_rate', 50),
-            'full_scale': setup_dict.get('full_scale', 12),
-            'sensor_mode': setup_dict.get('sensor_mode', 0),
-            'lowpower_mode': setup_dict.get('lowpower_mode', False),
-            'high_resolution': setup_dict.get('high_resolution', True)
-        }
+        self._init_lsm9ds0_sensor('gyroscope')
 
     def _init_magnetometer(self):
         """Initialize the magnetometer according to the settings document sent in."""
-        reg5_value = (
-            ('1' if self._mag_setup.get('enabled_temp') else '0') +
-            ('11' if self._mag_setup.get('high_resolution') else '00') +
-            LSM9DS0.get_magnetometer_data_rate_bits(self._mag_setup.get('data_rate')) +
-            '00'  # Latch interrupts disabled right.
-        )
-        self._write(LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG5_XM, int(reg5_value, 2))
-
-        reg6_value = (
-            '0' +  # Unused bits
-            LSM9DS0.get_magnetometer_full_scale_bits(self._mag_setup.get('full_scale')) +
-            '00000'  # Unused bits
-        )
-        self._write(LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG6_XM, int(reg6_value, 2))
-
-        reg7_value = (
-            '00' +  # Accelerometer high-pass filter disabled.
-            '0' +  # Filtered acceleration data selection bypassed.
-            '00' +  # Unused bits
-            ('1' if self._mag_setup.get('lowpower_mode') else '0') +
-            LSM9DS0.get_magnetometer_sensor_mode_bits(self._mag_setup.get('sensor_mode'))
-        )
-        self._write(LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG7_XM, int(reg7_value, 2))
+        self._init_lsm9ds0_sensor('magnetometer')
+
+    def _get_setup(self, sensor):
+        return {
+            'accelerometer': self._acc_setup,
+            'gyroscope': self._gyro_setup,
+            'magnetometer': self._mag_setup,
+        }.get(sensor)
 
     def _init_barometric_pressure_sensor(self):
         """Initialize the Barometric Pressure Sensor."""
         self._set_bmp180_calibration_values()
-        # TODO: Better init handling!
-        self.__OVERSAMPLING = 3  # 0..3
+        self._bmp180_state = None
+        self._bmp180_b5 = None
+
+    def _read_control_register(self, address, register):
+        """Get a register value from the shadow copy, or from the device if never written."""
+        value = self._register_cache.get((address, register))
+        if value is None:
+            value = self.transport.read_byte_data(address, register)
+        return value
 
     def get_settings(self):
-        settings = {
-            'accelerometer': {
-                'reg1': "{0:08b}".format(self.bus.read_byte_data(LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG1_XM)),
-                'reg2': "{0:08b}".format(self.bus.read_byte_data(LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG2_XM)),
-            },
-            'gyroscope': {
-                'reg1': "{0:08b}".format(self.bus.read_byte_data(LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG1_G)),
-                'reg4': "{0:08b}".format(self.bus.read_byte_data(LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG4_G)),
-            },
-            'magnetometer': {
-                'reg5': "{0:08b}".format(self.bus.read_byte_data(LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG5_XM)),
-                'reg6': "{0:08b}".format(self.bus.read_byte_data(LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG6_XM)),
-                'reg7': "{0:08b}".format(self.bus.read_byte_data(LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG7_XM)),
-            }
-        }
-        settings['accelerometer'].update(self._acc_setup)
-        settings['gyroscope'].update(self._gyro_setup)
-        settings['magnetometer'].update(self._mag_setup)
+        """Get the settings of the client and the control register values.
+
+        The register values are taken from the shadow copy of written registers.
+        Sensors not in ``enabled_sensors``, which are powered down, are marked
+        with ``'enabled': False``.
+
+        :return: Settings for each sensor.
+        :rtype: dict
+
+        """
+        settings = self._configuration.to_settings(include_registers=False)
+        for sensor, registers in CONTROL_REGISTERS.items():
+            for name, address, register in registers:
+                settings[sensor][name] = "{0:08b}".format(self._read_control_register(address, register))
+        for sensor in self.SENSORS:
+            if sensor not in self._enabled_sensors:
+                settings[sensor]['enabled'] = False
         return settings
 
+    def verify_settings(self):
+        """Read back all written LSM9DS0 registers and compare them with the shadow copy.
+
+        :return: List of ``(address, register, written, read)`` tuples for the
+            registers whose value on the device differs. Empty if all match.
+        :rtype: list
+
+        """
+        differences = []
+        for (address, register), value in sorted(self._register_cache.items()):
+            device_value = self.transport.read_byte_data(address, register)
+            if device_value != value:
+                differences.append((address, register, value, device_value))
+        return differences
+
+    def restore_settings(self):
+        """Rewrite the control registers of the sensors whose registers differ from the shadow copy.
+
+        The registers are compared with :py:meth:`verify_settings`, and only the
+        sensors with a differing register are written to, from the shadow copy,
+        leaving the other sensors running undisturbed.
+
+        :return: The sensors whose control registers were rewritten.
+        :rtype: list
+
+        """
+        differences = set((address, register) for address, register, _, _ in self.verify_settings())
+        restored = []
+        for sensor, (address, registers) in sorted(self._CONTROL_REGISTERS.items()):
+            if any((address, register) in differences for register in registers):
+                for register in registers:
+                    value = self._register_cache.get((address, register))
+                    if value is not None:
+                        self._write(address, register, value)
+                restored.append(sensor)
+        return restored
+
+    def reconfigure(self, accelerometer=None, gyroscope=None, magnetometer=None, barometer=None):
+        """Change settings of an open client, writing only the control registers that change.
+
+        The settings given are merged into the current ones, and validated
+        together, see :py:class:`pyberryimu.configuration.BerryIMUConfiguration`.
+        When a full scale
+        changes, the calibration object is rescaled to the new full scale. An
+        ongoing BMP180 pressure conversion is discarded if the oversampling changes.
+
+        :param accelerometer: Accelerometer settings to change.
+        :type accelerometer: dict
+        :param gyroscope: Gyroscope settings to change.
+        :type gyroscope: dict
+        :param magnetometer: Magnetometer settings to change.
+        :type magnetometer: dict
+        :param barometer: Barometer settings to change.
+        :type barometer: dict
+        :return: The number of registers written.
+        :rtype: int
+
+        """
+        old_full_scales = dict((sensor, self._get_setup(sensor).get('full_scale'))
+                               for sensor in ('accelerometer', 'gyroscope', 'magnetometer'))
+        configuration = self._configuration.merge(accelerometer, gyroscope, magnetometer, barometer)
+        if configuration['barometer'].get('oversampling') != self._baro_setup.get('oversampling') and \
+                self._bmp180_state == 'pressure':
+            self._bmp180_state = None
+        self._set_configuration(configuration)
+
+        nbr_writes = 0
+        if self._transport is not None:
+            # Sensors not yet initialised get the new settings at initialisation.
+            for address, register, value in [r for sensor in sorted(CONTROL_REGISTERS) if sensor in self._initialized
+                                             for r in configuration.get_registers(sensor)]:
+                if self._register_cache.get((address, register)) != value:
+                    self._write(address, register, value)
+                    nbr_writes += 1
+
+        for sensor, old_full_scale in old_full_scales.items():
+            new_full_scale = self._get_setup(sensor).get('full_scale')
+            if new_full_scale != old_full_scale:
+                self.calibration_object.rescale_full_scale(sensor, old_full_scale, new_full_scale)
+        return nbr_writes
+
+    # FIFO methods.
+
+    # Number of samples that fit in one 32 byte SMBus block read.
+    FIFO_SAMPLES_PER_READ = 5
+
+    def _get_fifo_registers(self, sensor):
+        """Get address and registers used for the FIFO of a sensor.
+
+        :param sensor: Either ``'accelerometer'`` or ``'gyroscope'``.
+        :type sensor: str
+        :return: Address, FIFO enable register, FIFO control register,
+            FIFO source register and first output register.
+        :rtype: tuple
+
+        """
+        if sensor == 'accelerometer':
+            return (LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG0_XM, LSM9DS0.FIFO_CTRL_REG,
+                    LSM9DS0.FIFO_SRC_REG, LSM9DS0.OUT_X_L_A)
+        elif sensor == 'gyroscope':
+            return (LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG5_G, LSM9DS0.FIFO_CTRL_REG_G,
+                    LSM9DS0.FIFO_SRC_REG_G, LSM9DS0.OUT_X_L_G)
+        else:
+            raise PyBerryIMUError("FIFO is only available for accelerometer and gyroscope.")
+
+    def enable_fifo(self, accelerometer=True, gyroscope=True, mode='stream', watermark=LSM9DS0.FIFO_SIZE - 1):
+        """Enable the 32 sample hardware FIFOs of the accelerometer and/or gyroscope.
+
+        In the default ``'stream'`` mode the oldest samples are overwritten when the
+        FIFO is full, so it has to be drained by :py:meth:`read_fifo` at least
+        every 32 samples to avoid losing data.
+
+        :param accelerometer: Enable the accelerometer FIFO.
+        :type accelerometer: bool
+        :param gyroscope: Enable the gyroscope FIFO.
+        :type gyroscope: bool
+        :param mode: FIFO mode, one of ``'bypass'``, ``'fifo'``, ``'stream'``,
+            ``'stream_to_fifo'`` and ``'bypass_to_stream'``.
+        :type mode: str
+        :param watermark: FIFO watermark level, 0 to 31.
+        :type watermark: int
+
+        """
+        if mode not in LSM9DS0._TABLE_FIFO_MODE:
+            raise PyBerryIMUError("Invalid FIFO mode: {0}".format(mode))
+        if not 0 <= watermark < LSM9DS0.FIFO_SIZE:
+            raise PyBerryIMUError("Invalid FIFO watermark: {0}".format(watermark))
+        fifo_ctrl_value = (int(LSM9DS0.get_fifo_mode_bits(mode), 2) << 5) | watermark
+        for sensor, enable in (('accelerometer', accelerometer), ('gyroscope', gyroscope)):
+            if enable:
+                self._ensure_initialized(sensor)
+                address, enable_reg, ctrl_reg, _, _ = self._get_fifo_registers(sensor)
+                # Set only the FIFO enable bit, keeping the other bits of the register.
+                self._write(address, enable_reg,
+                            self._read_control_register(address, enable_reg) | LSM9DS0.FIFO_ENABLE_BIT)
+                self._write(address, ctrl_reg, fifo_ctrl_value)
+
+    def disable_fifo(self, accelerometer=True, gyroscope=True):
+        """Disable the hardware FIFOs and return to bypass mode.
+
+        :param accelerometer: Disable the accelerometer FIFO.
+        :type accelerometer: bool
+        :param gyroscope: Disable the gyroscope FIFO.
+        :type gyroscope: bool
+
+        """
+        for sensor, disable in (('accelerometer', accelerometer), ('gyroscope', gyroscope)):
+            if disable:
+                self._ensure_initialized(sensor)
+                address, enable_reg, ctrl_reg, _, _ = self._get_fifo_registers(sensor)
+                self._write(address, ctrl_reg, int(LSM9DS0.get_fifo_mode_bits('bypass'), 2) << 5)
+                self._write(address, enable_reg,
+                            self._read_control_register(address, enable_reg) & ~LSM9DS0.FIFO_ENABLE_BIT)
+
+    def get_fifo_status(self, sensor):
+        """Read the FIFO source register of a sensor.
+
+        :param sensor: Either ``'accelerometer'`` or ``'gyroscope'``.
+        :type sensor: str
+        :return: Dictionary with the number of unread samples (``'level'``) and
+            the ``'watermark'``, ``'overrun'`` and ``'empty'`` flags.
+        :rtype: dict
+
+        """
+        address, _, _, src_reg, _ = self._get_fifo_registers(sensor)
+        value = self.transport.read_byte_data(address, src_reg)
+        status = {
+            'watermark': bool(value & LSM9DS0.FIFO_WATERMARK_BIT),
+            'overrun': bool(value & LSM9DS0.FIFO_OVERRUN_BIT),
+            'empty': bool(value & LSM9DS0.FIFO_EMPTY_BIT),
+        }
+        if status['empty']:
+            status['level'] = 0
+        elif status['overrun']:
+            status['level'] = LSM9DS0.FIFO_SIZE
+        else:
+            status['level'] = value & LSM9DS0.FIFO_LEVEL_MASK
+        return status
+
+    def read_fifo(self, sensor):
+        """Drain all unread samples from the FIFO of a sensor.
+
+        The samples are read in block reads of :py:attr:`FIFO_SAMPLES_PER_READ`
+        samples each; with the FIFO enabled, the LSM9DS0 wraps the register
+        address back to the X low byte after the Z high byte. The timestamps
+        are reconstructed from the time of reading and the data rate of the
+        sensor, assuming that the last sample was just produced.
+
+        :param sensor: Either ``'accelerometer'`` or ``'gyroscope'``.
+        :type sensor: str
+        :return: Array of timestamps with shape (N, ) and array of raw
+            values with shape (N, 3).
+        :rtype: tuple
+
+        """
+        address, _, _, _, out_reg = self._get_fifo_registers(sensor)
+        self._ensure_initialized(sensor)
+        nbr_samples = self.get_fifo_status(sensor).get('level')
+        t = self.timestamp
+        data_rate = self._get_setup(sensor).get('data_rate')
+
+        values = np.zeros((nbr_samples, 3), 'int16')
+        n = 0
+        while n < nbr_samples:
+            m = min(nbr_samples - n, self.FIFO_SAMPLES_PER_READ)
+            block = self.transport.read_i2c_block_data(address, out_reg | LSM9DS0.AUTO_INCREMENT, 6 * m)
+            values[n:n + m, :] = np.frombuffer(bytes(bytearray(block)), '<i2').reshape((m, 3))
+            n += m
+
+        timestamps = np.ones((nbr_samples, ), 'float') * t
+        if data_rate:
+            timestamps -= np.arange(nbr_samples)[::-1] / data_rate
+        return timestamps, values
+
     # BMP180 specific methods.
 
     def get_bmp180_chip_id_and_version(self):
@@ -306,44 +643,358 @@ class BerryIMUClient(object):
         :rtype: tuple
 
         """
-        return self.bus.read_i2c_block_data(BMP180.ADDRESS, BMP180.CHIP_ID_REG, 2)
+        return self.transport.read_i2c_block_data(BMP180.ADDRESS, BMP180.CHIP_ID_REG, 2)
 
     def _set_bmp180_calibration_values(self):
-        """Read, parse and store calibration EEPROM data to attributes."""
-
-        bmp180_calibration = self.bus.read_i2c_block_data(BMP180.ADDRESS, BMP180.CALIB_DATA_REG, 22)
-        vals = [msb + lsb for msb, lsb in zip(map(lambda x: x << 8, bmp180_calibration[::2]),
-                                              bmp180_calibration[1::2])]
-        for i in [0, 1, 2, 6, 7, 8, 9, 10]:
-            if vals[i] > 2 ** 15 - 1:
-                vals[i] -= 2 ** 16
-
-        self.__ac1 = vals[0]
-        self.__ac2 = vals[1]
-        self.__ac3 = vals[2]
-        self.__ac4 = vals[3]
-        self.__ac5 = vals[4]
-        self.__ac6 = vals[5]
-        self.__b1 = vals[6]
-        self.__b2 = vals[7]
-        self.__mb = vals[8]
-        self.__mc = vals[9]
-        self.__md = vals[10]
+        """Read, parse and store calibration EEPROM data.
+
+        If a BMP180 calibration cache file is used, the stored EEPROM data for
+        this bus and device address is used when its checksum is intact and
+        its first coefficient matches the device, and the cache is updated
+        otherwise.
+
+        """
+        cache = self._load_bmp180_cache()
+        key = "{0}:{1:#04x}".format(self._bus_no, BMP180.ADDRESS)
+        data = self._get_cached_bmp180_data(cache.get(key))
+        if data is None or list(self.transport.read_i2c_block_data(
+                BMP180.ADDRESS, BMP180.CALIB_DATA_REG, 2)) != data[:2]:
+            data = list(self.transport.read_i2c_block_data(BMP180.ADDRESS, BMP180.CALIB_DATA_REG, 22))
+            if self._bmp180_cache is not None:
+                cache[key] = {'data': data, 'crc32': self._bmp180_checksum(data)}
+                self._save_bmp180_cache(cache)
+        self._bmp180_calibration = BMP180.parse_calibration_data(data)
+
+    @staticmethod
+    def _bmp180_checksum(data):
+        return zlib.crc32(bytes(bytearray(data))) & 0xFFFFFFFF
+
+    def _get_cached_bmp180_data(self, entry):
+        """Get the EEPROM data of a cache entry, or ``None`` if the entry is missing or broken."""
+        try:
+            data = entry['data']
+            if len(data) == 22 and entry['crc32'] == self._bmp180_checksum(data):
+                return data
+        except (TypeError, KeyError, ValueError):
+            pass
+        return None
+
+    def _load_bmp180_cache(self):
+        if self._bmp180_cache is None or not os.path.exists(self._bmp180_cache):
+            return {}
+        try:
+            with open(self._bmp180_cache, 'rt') as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            # A broken cache is replaced by data read from the device.
+            return {}
+
+    def _save_bmp180_cache(self, cache):
+        try:
+            with open(self._bmp180_cache, 'wt') as f:
+                json.dump(cache, f)
+        except (IOError, OSError):
+            # The cache is only an optimisation.
+            pass
+
+    def _start_bmp180_temperature_conversion(self):
+        self._write(BMP180.ADDRESS, BMP180.WRITE_REG, BMP180.TEMPERATURE_COMMAND)
+        self._bmp180_state = 'temperature'
+        self._bmp180_ready_time = time.time() + BMP180.TEMPERATURE_CONVERSION_TIME
+
+    def _start_bmp180_pressure_conversion(self):
+        oversampling = self._baro_setup.get('oversampling')
+        self._write(BMP180.ADDRESS, BMP180.WRITE_REG, BMP180.PRESSURE_COMMAND + (oversampling << 6))
+        self._bmp180_state = 'pressure'
+        self._bmp180_ready_time = time.time() + BMP180.get_pressure_conversion_time(oversampling)
+
+    def _bmp180_temperature_is_fresh(self):
+        """Check if the stored temperature compensation value may still be used."""
+        if self._bmp180_b5 is None:
+            return False
+        refresh_count = self._baro_setup.get('temperature_refresh_count')
+        refresh_interval = self._baro_setup.get('temperature_refresh_interval')
+        if refresh_count is not None and self._bmp180_b5_uses >= refresh_count:
+            return False
+        if refresh_interval is not None and (time.time() - self._latest_temperature[1]) >= refresh_interval:
+            return False
+        return True
+
+    def _start_bmp180_cycle(self):
+        """Start a pressure conversion, preceded by a temperature conversion if required."""
+        self._ensure_initialized('barometer')
+        if self._bmp180_temperature_is_fresh() and not self._bmp180_temperature_wanted:
+            self._start_bmp180_pressure_conversion()
+        else:
+            self._start_bmp180_temperature_conversion()
+
+    def _advance_bmp180(self):
+        """Collect the result of a finished BMP180 conversion and start the next one.
+
+        :return: ``'temperature'`` or ``'pressure'`` if a new value was
+            collected, ``None`` otherwise.
+        :rtype: str
+
+        """
+        if self._bmp180_state is None or time.time() < self._bmp180_ready_time:
+            return None
+
+        if self._bmp180_state == 'temperature':
+            msb, lsb = self.transport.read_i2c_block_data(BMP180.ADDRESS, BMP180.READ_REG, 2)
+            self._bmp180_b5 = BMP180.compute_b5((msb << 8) + lsb, self._bmp180_calibration)
+            self._bmp180_b5_uses = 0
+            self._bmp180_temperature_wanted = False
+            self._latest_temperature = (BMP180.compute_temperature(self._bmp180_b5), self._bmp180_ready_time)
+            if self._bmp180_pressure_wanted or self._bmp180_continuous:
+                self._start_bmp180_pressure_conversion()
+            else:
+                self._bmp180_state = None
+            return 'temperature'
+        else:
+            oversampling = self._baro_setup.get('oversampling')
+            msb, lsb, xsb = self.transport.read_i2c_block_data(BMP180.ADDRESS, BMP180.READ_REG, 3)
+            up = ((msb << 16) + (lsb << 8) + xsb) >> (8 - oversampling)
+            self._latest_pressure = (BMP180.compute_pressure(
+                up, self._bmp180_b5, oversampling, self._bmp180_calibration),
+                self._bmp180_ready_time)
+            self._bmp180_b5_uses += 1
+            self._bmp180_pressure_wanted = False
+            if self._bmp180_continuous:
+                self._start_bmp180_cycle()
+            else:
+                self._bmp180_state = None
+            return 'pressure'
+
+    def _poll_bmp180_for(self, measurement):
+        """Advance the conversions towards a new temperature or pressure value.
+
+        :return: ``None`` if a new value was collected, otherwise the time to poll again at.
+        :rtype: float
+
+        """
+        if self._bmp180_state is None:
+            self._start_bmp180_cycle()
+        if self._advance_bmp180() == measurement:
+            return None
+        # A conversion of the other measurement may have finished the cycle; poll again at once.
+        return self._bmp180_ready_time if self._bmp180_state is not None else time.time()
+
+    def poll_temperature(self):
+        """Non-blocking step of :py:meth:`read_temperature`.
+
+        Starts or advances the conversions required for a temperature value.
+        Call it again at the returned time, until the value is returned.
+
+        :return: The temperature value and ``None`` if it is available,
+            otherwise ``None`` and the Epoch time to poll again at.
+        :rtype: tuple
+
+        """
+        if not self._bmp180_temperature_wanted and self._bmp180_temperature_is_fresh():
+            self._bmp180_b5_uses += 1
+            return self._latest_temperature[0], None
+        self._bmp180_temperature_wanted = True
+        ready_time = self._poll_bmp180_for('temperature')
+        if ready_time is not None:
+            return None, ready_time
+        self._bmp180_b5_uses += 1
+        return self._latest_temperature[0], None
+
+    def poll_pressure(self):
+        """Non-blocking step of :py:meth:`read_pressure`.
+
+        Starts or advances the conversions required for a pressure value.
+        Call it again at the returned time, until the value is returned.
+
+        :return: The pressure value and ``None`` if it is available,
+            otherwise ``None`` and the Epoch time to poll again at.
+        :rtype: tuple
+
+        """
+        self._bmp180_pressure_wanted = True
+        ready_time = self._poll_bmp180_for('pressure')
+        if ready_time is not None:
+            return None, ready_time
+        return self._latest_pressure[0], None
+
+    def start_bmp180_conversions(self, continuous=True):
+        """Start temperature and pressure conversions without waiting for them.
+
+        The conversions are then advanced by calling :py:meth:`poll_bmp180`,
+        e.g. between IMU reads, and the results are available in
+        :py:attr:`latest_temperature` and :py:attr:`latest_pressure`.
+
+        :param continuous: Start a new temperature and pressure conversion
+            cycle as soon as one has finished.
+        :type continuous: bool
+
+        """
+        self._bmp180_continuous = continuous
+        self._bmp180_pressure_wanted = True
+        if self._bmp180_state is None:
+            self._start_bmp180_cycle()
+
+    def stop_bmp180_conversions(self):
+        """Stop starting new conversion cycles. An ongoing cycle is still finished by polling."""
+        self._bmp180_continuous = False
+
+    def poll_bmp180(self):
+        """Advance ongoing BMP180 conversions without blocking.
+
+        :return: ``'temperature'`` or ``'pressure'`` if a new value was
+            collected, ``None`` otherwise.
+        :rtype: str
+
+        """
+        return self._advance_bmp180()
+
+    @property
+    def latest_temperature(self):
+        """The latest temperature value collected and the timestamp of its conversion.
+
+        :return: Temperature in degrees Celsius and Epoch timestamp.
+        :rtype: tuple
+
+        """
+        return self._latest_temperature
+
+    @property
+    def latest_pressure(self):
+        """The latest pressure value collected and the timestamp of its conversion.
+
+        :return: Pressure in hPa and Epoch timestamp.
+        :rtype: tuple
+
+        """
+        return self._latest_pressure
 
     # Methods for writing to BerryIMU.
 
     def _write(self, address, register, value):
-        self.bus.write_byte_data(address, register, value)
+        self.transport.write_byte_data(address, register, value)
+        if address != BMP180.ADDRESS:
+            # The BMP180 control register is a command register and is not shadowed.
+            self._register_cache[(address, register)] = value
         return -1
 
     # Methods for reading from BerryIMU.
 
     def _read(self, address, register_low_bit, register_high_bit):
-        value = (self.bus.read_byte_data(address, register_low_bit) |
-                 (self.bus.read_byte_data(address, register_high_bit) << 8))
+        value = (self.transport.read_byte_data(address, register_low_bit) |
+                 (self.transport.read_byte_data(address, register_high_bit) << 8))
 
         return value if value < 32768 else value - 65536
 
+    def _read_vector(self, sensor):
+        """Read the X, Y and Z values of one of the LSM9DS0 sensors.
+
+        In burst read mode, the status register preceding the output
+        registers is read in the same block read and stored.
+
+        :param sensor: One of ``'accelerometer'``, ``'gyroscope'`` and ``'magnetometer'``.
+        :type sensor: str
+        :return: The X, Y and Z values as signed integers.
+        :rtype: tuple
+
+        """
+        self._ensure_initialized(sensor)
+        address, status_register, register_low_bit = self._OUTPUT_REGISTERS[sensor]
+        if self._burst_read:
+            return self._decode_burst(sensor, self.transport.read_i2c_block_data(
+                address, status_register | LSM9DS0.AUTO_INCREMENT, 7))
+        else:
+            return (self._read(address, register_low_bit, register_low_bit + 1),
+                    self._read(address, register_low_bit + 2, register_low_bit + 3),
+                    self._read(address, register_low_bit + 4, register_low_bit + 5))
+
+    def _decode_burst(self, sensor, block):
+        """Store the status byte and decode the values of a burst read."""
+        self._set_status(sensor, block[0])
+        return struct.unpack(str('<3h'), bytes(bytearray(block[1:])))
+
+    def _set_status(self, sensor, status, count_overrun=True):
+        self._status[sensor] = status
+        if count_overrun and status & LSM9DS0.STATUS_OVERRUN_BIT:
+            self._overrun_counts[sensor] += 1
+
+    def get_data_status(self, sensor):
+        """Get the data status flags from the latest read of a sensor.
+
+        The status is only updated by reads in burst read mode and
+        by :py:meth:`wait_for_data_ready`.
+
+        :param sensor: One of ``'accelerometer'``, ``'gyroscope'`` and ``'magnetometer'``.
+        :type sensor: str
+        :return: Dictionary with the ``'new_data'`` and ``'overrun'`` flags of
+            the latest read (``None`` if no status has been read) and
+            ``'overrun_count'``, the number of samples read with the overrun flag set.
+        :rtype: dict
+
+        """
+        status = self._status[sensor]
+        return {
+            'new_data': bool(status & LSM9DS0.STATUS_DATA_READY_BIT) if status is not None else None,
+            'overrun': bool(status & LSM9DS0.STATUS_OVERRUN_BIT) if status is not None else None,
+            'overrun_count': self._overrun_counts[sensor],
+        }
+
+    def wait_for_data_ready(self, sensor='accelerometer', timeout=1.0):
+        """Poll the status register of a sensor until a new sample is available.
+
+        The polling starts with a sleep of 1/16 of the sample period of the
+        sensor, which is doubled for every poll without new data, up to a
+        quarter of the sample period.
+
+        With ``nan_on_error``, a failed poll ends the wait, so that the
+        following read returns NaN values instead of raising the error.
+
+        :param sensor: One of ``'accelerometer'``, ``'gyroscope'`` and ``'magnetometer'``.
+        :type sensor: str
+        :param timeout: Maximal number of seconds to wait.
+        :type timeout: float
+        :return: If samples were overwritten before this new one was available.
+        :rtype: bool
+
+        """
+        data_rate = self._get_setup(sensor).get('data_rate')
+        if not data_rate:
+            raise PyBerryIMUError("The {0} is powered down.".format(sensor))
+        self._ensure_initialized(sensor)
+        address, status_register, _ = self._OUTPUT_REGISTERS[sensor]
+        max_delay = 0.25 / data_rate
+        delay = max_delay / 4
+        t_end = time.time() + timeout
+        while True:
+            try:
+                status = self.transport.read_byte_data(address, status_register)
+            except (IOError, OSError):
+                if not self._nan_on_error:
+                    raise
+                self._restore_after_error()
+                return False
+            if status & LSM9DS0.STATUS_DATA_READY_BIT:
+                # In burst read mode, the overrun is counted when the data is read.
+                self._set_status(sensor, status, count_overrun=not self._burst_read)
+                return bool(status & LSM9DS0.STATUS_OVERRUN_BIT)
+            if time.time() > t_end:
+                raise PyBerryIMUError("No new {0} sample within {1} s.".format(sensor, timeout))
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+    def wait_for_new_sample(self, sensor='accelerometer', timeout=1.0):
+        """Wait until a new sample is available from a sensor and read it.
+
+        :param sensor: One of ``'accelerometer'``, ``'gyroscope'`` and ``'magnetometer'``.
+        :type sensor: str
+        :param timeout: Maximal number of seconds to wait.
+        :type timeout: float
+        :return: The X, Y, and Z values of the sensor.
+        :rtype: tuple
+
+        """
+        self.wait_for_data_ready(sensor, timeout)
+        return getattr(self, 'read_{0}'.format(sensor))()
+
     @property
     def timestamp(self):
         """Timestamp right now Epoch time.
@@ -355,41 +1006,295 @@ class BerryIMUClient(object):
         # TODO: Make timezone independent...
         return time.time()
 
+    def _restore_after_error(self):
+        """Rewrite drifted settings after a read error, ignoring further errors."""
+        try:
+            self.restore_settings()
+        except (IOError, OSError):
+            # The bus is still failing; the settings are checked again at the next error.
+            pass
+
+    def _read_sample(self, sensor, transform):
+        try:
+            values = self._read_vector(sensor)
+        except (IOError, OSError):
+            if not self._nan_on_error:
+                raise
+            self._missing_samples += 1
+            self._restore_after_error()
+            return (float('nan'), ) * 3
+        return transform(values)
+
     def read_accelerometer(self):
         """Method for reading values from the accelerometer.
 
-        :return: The X, Y, and Z values of the accelerometer.
+        :return: The X, Y, and Z values of the accelerometer, NaN if they
+            could not be read and ``nan_on_error`` is set.
         :rtype: tuple
 
         """
-        return self.calibration_object.transform_accelerometer_values(
-            (self._read(LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A, LSM9DS0.OUT_X_H_A),
-             self._read(LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_Y_L_A, LSM9DS0.OUT_Y_H_A),
-             self._read(LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_Z_L_A, LSM9DS0.OUT_Z_H_A)))
+        return self._read_sample('accelerometer', self.calibration_object.transform_accelerometer_values)
 
     def read_gyroscope(self):
         """Method for reading values from the gyroscope.
 
-        :return: The X, Y, and Z values of the gyroscope.
+        :return: The X, Y, and Z values of the gyroscope, NaN if they
+            could not be read and ``nan_on_error`` is set.
         :rtype: tuple
 
         """
-        return self.calibration_object.transform_gyroscope_values(
-            (self._read(LSM9DS0.GYR_ADDRESS, LSM9DS0.OUT_X_L_G, LSM9DS0.OUT_X_H_G),
-             self._read(LSM9DS0.GYR_ADDRESS, LSM9DS0.OUT_Y_L_G, LSM9DS0.OUT_Y_H_G),
-             self._read(LSM9DS0.GYR_ADDRESS, LSM9DS0.OUT_Z_L_G, LSM9DS0.OUT_Z_H_G)))
+        return self._read_sample('gyroscope', self.calibration_object.transform_gyroscope_values)
 
     def read_magnetometer(self):
         """Method for reading values from the magnetometer.
 
-        :return: The X, Y, and Z values of the magnetometer.
+        :return: The X, Y, and Z values of the magnetometer, NaN if they
+            could not be read and ``nan_on_error`` is set.
         :rtype: tuple
 
         """
-        return self.calibration_object.transform_magnetometer_values(
-            (self._read(LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_X_L_M, LSM9DS0.OUT_X_H_M),
-             self._read(LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_Y_L_M, LSM9DS0.OUT_Y_H_M),
-             self._read(LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_Z_L_M, LSM9DS0.OUT_Z_H_M)))
+        return self._read_sample('magnetometer', self.calibration_object.transform_magnetometer_values)
+
+    def read_imu_raw(self, out=None):
+        """Method for reading raw values from all three LSM9DS0 sensors.
+
+        The values are written into one row, laid out as
+        ``[timestamp, acc_x, acc_y, acc_z, gyro_x, gyro_y, gyro_z, mag_x, mag_y, mag_z]``.
+
+        :param out: Preallocated array of length 10 to write the values to.
+        :type out: :py:class:`numpy.ndarray`
+        :return: The timestamp and the nine raw sensor values, NaN if they
+            could not be read and ``nan_on_error`` is set.
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        if out is None:
+            out = np.zeros((10, ), 'float')
+        if not self._initialized.issuperset(self._OUTPUT_REGISTERS):
+            for sensor in self._OUTPUT_REGISTERS:
+                self._ensure_initialized(sensor)
+        out[0] = self.timestamp
+        try:
+            if self._burst_read:
+                # Read all three sensors in one batch, which some transports perform in one bus transfer.
+                blocks = self.transport.read_i2c_block_data_batch(self._imu_batch_requests)
+                out[1:4] = self._decode_burst('accelerometer', blocks[0])
+                out[4:7] = self._decode_burst('gyroscope', blocks[1])
+                out[7:10] = self._decode_burst('magnetometer', blocks[2])
+            else:
+                out[1:4] = self._read_vector('accelerometer')
+                out[4:7] = self._read_vector('gyroscope')
+                out[7:10] = self._read_vector('magnetometer')
+        except (IOError, OSError):
+            if not self._nan_on_error:
+                raise
+            out[1:10] = np.nan
+            self._missing_samples += 1
+            self._restore_after_error()
+        return out
+
+    @property
+    def missing_samples(self):
+        """The number of samples that could not be read, with ``nan_on_error``, and were returned as NaN or skipped."""
+        return self._missing_samples
+
+    def _read_until_ready(self, read, args, is_ready, t_end, delay, sensor, timeout):
+        """Repeat a read until its result signals new data.
+
+        With ``nan_on_error``, failed reads are counted and skipped until the timeout.
+
+        """
+        while True:
+            try:
+                result = read(*args)
+            except (IOError, OSError):
+                if not self._nan_on_error:
+                    raise
+                self._missing_samples += 1
+                self._restore_after_error()
+            else:
+                if is_ready(result):
+                    return result
+            if time.time() > t_end:
+                raise PyBerryIMUError("No new {0} sample within {1} s.".format(sensor, timeout))
+            time.sleep(delay)
+
+    def read_imu(self, out=None):
+        """Method for reading calibrated values from all three LSM9DS0 sensors.
+
+        The calibration is applied to all nine values in one step. See
+        :py:meth:`read_imu_raw` for the layout of the returned row.
+
+        :param out: Preallocated array of length 10 to write the values to.
+        :type out: :py:class:`numpy.ndarray`
+        :return: The timestamp and the nine calibrated sensor values.
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        if out is None:
+            out = np.zeros((10, ), 'float')
+        self.read_imu_raw(self._imu_raw_buffer)
+        out[0] = self._imu_raw_buffer[0]
+        self.calibration_object.transform_imu_values(self._imu_raw_buffer[1:], out=out[1:])
+        return out
+
+    # Batch read methods.
+
+    def _read_batch(self, sensor, n, out, timeout):
+        """Read n new samples of one of the LSM9DS0 sensors into an int16 array.
+
+        Each sample is burst read together with the status register, and the
+        read is repeated until the status register signals new data. The
+        output register bytes are collected and decoded in one step at the end.
+        With ``nan_on_error``, samples that cannot be read are skipped, since
+        int16 values have no NaN.
+
+        """
+        self._ensure_initialized(sensor)
+        if out is None:
+            out = np.zeros((n, 3), 'int16')
+        elif out.shape != (n, 3) or out.dtype != np.int16:
+            raise PyBerryIMUError("Output array must be int16 with shape ({0}, 3).".format(n))
+        data_rate = self._get_setup(sensor).get('data_rate')
+        if not data_rate:
+            raise PyBerryIMUError("The {0} is powered down.".format(sensor))
+        address, status_register, _ = self._OUTPUT_REGISTERS[sensor]
+        register = status_register | LSM9DS0.AUTO_INCREMENT
+        delay = 0.125 / data_rate
+        read = self.transport.read_i2c_block_data
+
+        def is_ready(block):
+            return block[0] & LSM9DS0.STATUS_DATA_READY_BIT
+
+        raw = bytearray(6 * n)
+        t_end = time.time() + timeout
+        for i in six.moves.range(n):
+            block = self._read_until_ready(read, (address, register, 7), is_ready, t_end, delay, sensor, timeout)
+            self._set_status(sensor, block[0])
+            raw[6 * i:6 * i + 6] = bytearray(block[1:])
+            t_end = time.time() + timeout
+        out[...] = np.frombuffer(bytes(raw), '<i2').reshape((n, 3))
+        return out
+
+    def read_accelerometer_batch(self, n, out=None, timeout=1.0):
+        """Read n consecutive raw accelerometer samples.
+
+        Every sample is read as soon as the accelerometer signals new data, so
+        the samples are spaced by the accelerometer data rate. Calibrate the
+        values afterwards in one step, over the whole array, with
+        :py:meth:`~pyberryimu.calibration.base.BerryIMUCalibration.transform_accelerometer_batch`
+        and its gyroscope and magnetometer equivalents.
+        With ``nan_on_error``, samples that cannot be read are skipped and
+        counted in :py:attr:`missing_samples`.
+
+        :param n: Number of samples to read.
+        :type n: int
+        :param out: Preallocated int16 array of shape (n, 3) to write the values to.
+        :type out: :py:class:`numpy.ndarray`
+        :param timeout: Maximal number of seconds to wait for each sample.
+        :type timeout: float
+        :return: The raw X, Y and Z values, with shape (n, 3).
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        return self._read_batch('accelerometer', n, out, timeout)
+
+    def read_gyroscope_batch(self, n, out=None, timeout=1.0):
+        """Read n consecutive raw gyroscope samples.
+
+        See :py:meth:`read_accelerometer_batch`.
+
+        :param n: Number of samples to read.
+        :type n: int
+        :param out: Preallocated int16 array of shape (n, 3) to write the values to.
+        :type out: :py:class:`numpy.ndarray`
+        :param timeout: Maximal number of seconds to wait for each sample.
+        :type timeout: float
+        :return: The raw X, Y and Z values, with shape (n, 3).
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        return self._read_batch('gyroscope', n, out, timeout)
+
+    def read_magnetometer_batch(self, n, out=None, timeout=1.0):
+        """Read n consecutive raw magnetometer samples.
+
+        See :py:meth:`read_accelerometer_batch`.
+
+        :param n: Number of samples to read.
+        :type n: int
+        :param out: Preallocated int16 array of shape (n, 3) to write the values to.
+        :type out: :py:class:`numpy.ndarray`
+        :param timeout: Maximal number of seconds to wait for each sample.
+        :type timeout: float
+        :return: The raw X, Y and Z values, with shape (n, 3).
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        return self._read_batch('magnetometer', n, out, timeout)
+
+    def read_imu_batch(self, n, out=None, timeout=1.0):
+        """Read n consecutive raw samples of all three LSM9DS0 sensors.
+
+        The samples are paced by the accelerometer: its status register is
+        polled until it signals new data, and then the row is read, together
+        with the latest gyroscope and magnetometer values. The rows are laid out as
+        ``[acc_x, acc_y, acc_z, gyro_x, gyro_y, gyro_z, mag_x, mag_y, mag_z]``,
+        so the whole array can be calibrated in one step with
+        :py:meth:`~pyberryimu.calibration.base.BerryIMUCalibration.transform_imu_values`.
+        As in :py:meth:`read_accelerometer_batch`, samples that cannot be read
+        are skipped with ``nan_on_error``.
+
+        :param n: Number of samples to read.
+        :type n: int
+        :param out: Preallocated int16 array of shape (n, 9) to write the values to.
+        :type out: :py:class:`numpy.ndarray`
+        :param timeout: Maximal number of seconds to wait for each sample.
+        :type timeout: float
+        :return: The raw sensor values, with shape (n, 9).
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        for sensor in self._OUTPUT_REGISTERS:
+            self._ensure_initialized(sensor)
+        if out is None:
+            out = np.zeros((n, 9), 'int16')
+        elif out.shape != (n, 9) or out.dtype != np.int16:
+            raise PyBerryIMUError("Output array must be int16 with shape ({0}, 9).".format(n))
+        data_rate = self._acc_setup.get('data_rate')
+        if not data_rate:
+            raise PyBerryIMUError("The accelerometer is powered down.")
+        delay = 0.125 / data_rate
+        read_status = self.transport.read_byte_data
+        read_batch = self.transport.read_i2c_block_data_batch
+        requests = self._imu_batch_requests
+
+        def is_ready(status):
+            return status & LSM9DS0.STATUS_DATA_READY_BIT
+
+        raw = bytearray(18 * n)
+        t_end = time.time() + timeout
+        i = 0
+        while i < n:
+            self._read_until_ready(read_status, (LSM9DS0.ACC_ADDRESS, LSM9DS0.STATUS_REG_A), is_ready,
+                                   t_end, delay, 'accelerometer', timeout)
+            try:
+                blocks = read_batch(requests)
+            except (IOError, OSError):
+                if not self._nan_on_error:
+                    raise
+                self._missing_samples += 1
+                self._restore_after_error()
+                if time.time() > t_end:
+                    raise PyBerryIMUError("No new accelerometer sample within {0} s.".format(timeout))
+                continue
+            for j, sensor in enumerate(('accelerometer', 'gyroscope', 'magnetometer')):
+                self._set_status(sensor, blocks[j][0])
+                raw[18 * i + 6 * j:18 * i + 6 * j + 6] = bytearray(blocks[j][1:])
+            i += 1
+            t_end = time.time() + timeout
+        out[...] = np.frombuffer(bytes(raw), '<i2').reshape((n, 9))
+        return out
 
     def read_temperature_LSM9DS0(self):
         """Method for reading temperature values from the LSM9DS0 chip.
@@ -401,8 +1306,9 @@ class BerryIMUClient(object):
         :rtype: int
 
         """
-        value = (self.bus.read_byte_data(LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_TEMP_L_XM) | (
-            (self.bus.read_byte_data(LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_TEMP_H_XM) & 0b00001111) << 8))
+        self._ensure_initialized('magnetometer')
+        value = (self.transport.read_byte_data(LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_TEMP_L_XM) | (
+            (self.transport.read_byte_data(LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_TEMP_H_XM) & 0b00001111) << 8))
         value = value if value < 2048 else value - 4096
 
         # Convert to degrees Celsius according to data sheet specs: 8 LSB/deg C
@@ -415,20 +1321,18 @@ class BerryIMUClient(object):
         `BMP180 reference sheet
         <http://ozzmaker.com/wp-content/uploads/2015/01/BMP180-DS000-09.pdf>`_
 
+        The latest temperature value is returned without a new conversion if
+        it is still fresh according to the barometer temperature refresh settings.
+
         :return: The temperature value.
         :rtype: int
 
         """
-        self._write(BMP180.ADDRESS, BMP180.WRITE_REG, 0x2E)
-        time.sleep(0.005)
-        msb, lsb = self.bus.read_i2c_block_data(BMP180.ADDRESS, BMP180.READ_REG, 2)
-        ut = (msb << 8) + lsb
-
-        x1 = ((ut - self.__ac6) * self.__ac5) >> 15
-        x2 = (self.__mc << 11) // (x1 + self.__md)
-        b5 = x1 + x2
-        t = (b5 + 8) >> 4
-        return t / 10.0
+        while True:
+            temperature, ready_time = self.poll_temperature()
+            if ready_time is None:
+                return temperature
+            time.sleep(max(ready_time - time.time(), 0))
 
     def read_pressure(self):
         """Method for reading pressure value from the barometric pressure sensor.
@@ -442,39 +1346,8 @@ class BerryIMUClient(object):
         :rtype: int
 
         """
-        self._write(BMP180.ADDRESS, BMP180.WRITE_REG, 0x2E)
-        time.sleep(0.005)
-        msb, lsb = self.bus.read_i2c_block_data(BMP180.ADDRESS, BMP180.READ_REG, 2)
-        ut = (msb << 8) + lsb
-
-        self._write(BMP180.ADDRESS, BMP180.WRITE_REG, 0x34 + (self.__OVERSAMPLING << 6))
-        time.sleep(0.04)
-        msb, lsb, xsb = self.bus.read_i2c_block_data(BMP180.ADDRESS, BMP180.READ_REG, 3)
-        up = ((msb << 16) + (lsb << 8) + xsb) >> (8 - self.__OVERSAMPLING)
-
-        x1 = ((ut - self.__ac6) * self.__ac5) >> 15
-        x2 = (self.__mc << 11) // (x1 + self.__md)
-        b5 = x1 + x2
-
-        b6 = b5 - 4000
-        b62 = b6 * b6 >> 12
-        x1 = (self.__b2 * b62) >> 11
-        x2 = self.__ac2 * b6 >> 11
-        x3 = x1 + x2
-        b3 = (((self.__ac1 * 4 + x3) << self.__OVERSAMPLING) + 2) >> 2
-
-        x1 = self.__ac3 * b6 >> 13
-        x2 = (self.__b1 * b62) >> 16
-        x3 = ((x1 + x2) + 2) >> 2
-        b4 = (self.__ac4 * (x3 + 32768)) >> 15
-        b7 = (up - b3) * (50000 >> self.__OVERSAMPLING)
-
-        p = (b7 * 2) // b4
-
-        x1 = (p >> 8) * (p >> 8)
-        x1 = (x1 * 3038) >> 16
-        x2 = (-7357 * p) >> 16
-        p += (x1 + x2 + 3791) >> 4
-
-        return p / 100.0
-
+        while True:
+            pressure, ready_time = self.poll_pressure()
+            if ready_time is None:
+                return pressure
+            time.sleep(max(ready_time - time.time(), 0))
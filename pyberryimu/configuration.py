@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`configuration`
+==================
+
+.. module:: configuration
+   :platform: Unix, Windows
+   :synopsis: Validated BerryIMU settings, compiled to control register values.
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import re
+import numbers
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.sensors import LSM9DS0, BMP180
+
+# Default value of every setting.
+_DEFAULTS = {
+    'accelerometer': {
+        'data_rate': 200,
+        'continuous_update': False,
+        'enabled_z': True,
+        'enabled_y': True,
+        'enabled_x': True,
+        'anti_alias': 773,
+        'full_scale': 8,
+        'self_test': 0,
+    },
+    'gyroscope': {
+        'data_rate': 190,
+        'bandwidth_level': 0,
+        'powerdown_mode': False,
+        'enabled_z': True,
+        'enabled_y': True,
+        'enabled_x': True,
+        'continuous_update': False,
+        'little_endian': False,
+        'full_scale': 500,
+        'self_test': 0,
+    },
+    'magnetometer': {
+        'enabled_temp': True,
+        'data_rate': 50,
+        'full_scale': 12,
+        'sensor_mode': 0,
+        'lowpower_mode': False,
+        'high_resolution': True,
+    },
+    'barometer': {
+        'oversampling': 3,
+        'temperature_refresh_count': 1,
+        'temperature_refresh_interval': None,
+    },
+}
+
+# Valid values of the settings taking one of a set of values, and their register bits.
+_VALUE_BITS = {
+    'accelerometer': {
+        'data_rate': LSM9DS0._TABLE_72,
+        'anti_alias': LSM9DS0._TABLE_75,
+        'full_scale': LSM9DS0._TABLE_76,
+        'self_test': LSM9DS0._TABLE_77,
+    },
+    'gyroscope': {
+        'data_rate': LSM9DS0._TABLE_21_1,
+        'bandwidth_level': {0: '00', 1: '01', 2: '10', 3: '11'},
+        'full_scale': LSM9DS0._TABLE_30,
+        'self_test': LSM9DS0._TABLE_31,
+    },
+    'magnetometer': {
+        'data_rate': LSM9DS0._TABLE_84,
+        'full_scale': LSM9DS0._TABLE_87,
+        'sensor_mode': LSM9DS0._TABLE_90,
+    },
+    'barometer': {
+        'oversampling': BMP180._TABLE_PRESSURE_CONVERSION_TIME,
+    },
+}
+
+# Name, address and register of the control registers of each sensor, as in
+# the output of :py:meth:`pyberryimu.client.BerryIMUClient.get_settings`.
+CONTROL_REGISTERS = {
+    'accelerometer': (
+        ('reg1', LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG1_XM),
+        ('reg2', LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG2_XM),
+    ),
+    'gyroscope': (
+        ('reg1', LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG1_G),
+        ('reg4', LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG4_G),
+    ),
+    'magnetometer': (
+        ('reg5', LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG5_XM),
+        ('reg6', LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG6_XM),
+        ('reg7', LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG7_XM),
+    ),
+}
+
+# Keys of the register values in the output of get_settings.
+_REGISTER_KEY = re.compile(r'^reg\d+$')
+
+
+class BerryIMUConfiguration(object):
+    """Validated settings of the BerryIMU sensors, compiled to control register values.
+
+    The settings are given as in :py:class:`pyberryimu.client.BerryIMUClient`,
+    one dict for each of ``'accelerometer'``, ``'gyroscope'``,
+    ``'magnetometer'`` and ``'barometer'``, where settings not given take their
+    default values. Unknown settings, invalid values and invalid combinations
+    of values raise a :py:class:`pyberryimu.exc.PyBerryIMUError`.
+
+    The register values are compiled once, at creation. A configuration is
+    immutable; :py:meth:`merge` creates a new one with changed settings.
+
+    :param settings: Settings for each sensor.
+    :type settings: dict
+
+    """
+
+    SENSORS = ('accelerometer', 'gyroscope', 'magnetometer', 'barometer')
+
+    def __init__(self, settings=None):
+        """Constructor for BerryIMUConfiguration"""
+        settings = settings if settings is not None else {}
+        for sensor in settings:
+            if sensor not in self.SENSORS:
+                raise PyBerryIMUError("Unknown sensor: {0}".format(sensor))
+        self._settings = dict((sensor, self._validate(sensor, settings.get(sensor) or {}))
+                              for sensor in self.SENSORS)
+        self._check_combinations()
+        self._registers = self._compile()
+
+    def __repr__(self):
+        return "BerryIMUConfiguration({0!r})".format(self.to_settings(include_registers=False))
+
+    def __eq__(self, other):
+        return isinstance(other, BerryIMUConfiguration) and self._settings == other._settings
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __getitem__(self, sensor):
+        """Get a copy of the settings of one sensor."""
+        return dict(self._settings[sensor])
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Create a configuration from the output of
+        :py:meth:`pyberryimu.client.BerryIMUClient.get_settings` or :py:meth:`to_settings`.
+
+        The register values and the ``'enabled'`` flags of the settings are ignored.
+
+        :param settings: Settings for each sensor.
+        :type settings: dict
+        :return: The configuration.
+        :rtype: :py:class:`BerryIMUConfiguration`
+
+        """
+        return cls(dict((sensor, dict((key, value) for key, value in sensor_settings.items()
+                                      if not _REGISTER_KEY.match(key) and key != 'enabled'))
+                        for sensor, sensor_settings in settings.items()))
+
+    def to_settings(self, include_registers=True):
+        """Get the settings, in the format of :py:meth:`pyberryimu.client.BerryIMUClient.get_settings`.
+
+        The settings can be stored as JSON and used to recreate the configuration
+        with :py:meth:`from_settings`.
+
+        :param include_registers: Add the register values as binary strings.
+        :type include_registers: bool
+        :return: Settings for each sensor.
+        :rtype: dict
+
+        """
+        settings = dict((sensor, dict(sensor_settings)) for sensor, sensor_settings in self._settings.items())
+        if include_registers:
+            for sensor, registers in CONTROL_REGISTERS.items():
+                for (name, _, _), (_, _, value) in zip(registers, self._registers[sensor]):
+                    settings[sensor][name] = "{0:08b}".format(value)
+        return settings
+
+    def merge(self, accelerometer=None, gyroscope=None, magnetometer=None, barometer=None):
+        """Create a new configuration, with the given settings changed.
+
+        :param accelerometer: Accelerometer settings to change.
+        :type accelerometer: dict
+        :param gyroscope: Gyroscope settings to change.
+        :type gyroscope: dict
+        :param magnetometer: Magnetometer settings to change.
+        :type magnetometer: dict
+        :param barometer: Barometer settings to change.
+        :type barometer: dict
+        :return: The new configuration.
+        :rtype: :py:class:`BerryIMUConfiguration`
+
+        """
+        changes = {'accelerometer': accelerometer, 'gyroscope': gyroscope,
+                   'magnetometer': magnetometer, 'barometer': barometer}
+        return BerryIMUConfiguration(dict((sensor, dict(self._settings[sensor], **(changes[sensor] or {})))
+                                          for sensor in self.SENSORS))
+
+    def get_registers(self, sensor=None):
+        """Get the control register values of a sensor, or of all LSM9DS0 sensors.
+
+        :param sensor: One of ``'accelerometer'``, ``'gyroscope'`` and ``'magnetometer'``,
+            or ``None`` for all of them.
+        :type sensor: str
+        :return: List of ``(address, register, value)`` tuples.
+        :rtype: list
+
+        """
+        if sensor is None:
+            return [r for s in ('accelerometer', 'gyroscope', 'magnetometer') for r in self._registers[s]]
+        return list(self._registers[sensor])
+
+    def diff(self, other):
+        """Compare the control register values with those of another configuration.
+
+        :param other: The configuration to compare with.
+        :type other: :py:class:`BerryIMUConfiguration`
+        :return: List of ``(address, register, value, other_value)`` tuples for
+            the registers whose values differ.
+        :rtype: list
+
+        """
+        return [(address, register, value, other_value)
+                for (address, register, value), (_, _, other_value) in
+                zip(self.get_registers(), other.get_registers()) if value != other_value]
+
+    # Validation and compilation.
+
+    @staticmethod
+    def _validate(sensor, setup_dict):
+        settings = dict(_DEFAULTS[sensor])
+        for key, value in setup_dict.items():
+            if key not in settings:
+                raise PyBerryIMUError("Unknown {0} setting: {1}".format(sensor, key))
+            default = _DEFAULTS[sensor][key]
+            table = _VALUE_BITS[sensor].get(key)
+            if table is not None:
+                # Booleans would pass as 0 and 1.
+                if isinstance(value, bool) or value not in table:
+                    raise PyBerryIMUError("Invalid {0} {1}: {2!r}".format(sensor, key, value))
+            elif isinstance(default, bool):
+                if value not in (True, False):
+                    raise PyBerryIMUError("Invalid {0} {1}: {2!r}".format(sensor, key, value))
+                value = bool(value)
+            elif value is not None and (isinstance(value, bool) or not isinstance(value, numbers.Real) or
+                                        value < (1 if key == 'temperature_refresh_count' else 0)):
+                raise PyBerryIMUError("Invalid {0} {1}: {2!r}".format(sensor, key, value))
+            settings[key] = value
+        return settings
+
+    def _check_combinations(self):
+        acc, mag = self._settings['accelerometer'], self._settings['magnetometer']
+        if acc['self_test'] == 'X':
+            raise PyBerryIMUError("Accelerometer self-test mode 'X' is not allowed.")
+        if mag['data_rate'] == 100 and 0 < acc['data_rate'] <= 50:
+            raise PyBerryIMUError("Magnetometer data rate 100 Hz requires an accelerometer data rate "
+                                  "above 50 Hz or the accelerometer powered down.")
+
+    def _bits(self, sensor, key):
+        return int(_VALUE_BITS[sensor][key][self._settings[sensor][key]], 2)
+
+    def _compile(self):
+        acc, gyro, mag = (self._settings[s] for s in ('accelerometer', 'gyroscope', 'magnetometer'))
+        acc_reg1 = (
+            (self._bits('accelerometer', 'data_rate') << 4) |
+            ((not acc['continuous_update']) << 3) |  # Block data update.
+            (acc['enabled_z'] << 2) | (acc['enabled_y'] << 1) | acc['enabled_x']
+        )
+        acc_reg2 = (
+            (self._bits('accelerometer', 'anti_alias') << 6) |
+            (self._bits('accelerometer', 'full_scale') << 3) |
+            (self._bits('accelerometer', 'self_test') << 1)
+            # SPI Serial Interface Mode selection left at 0.
+        )
+        gyro_reg1 = (
+            (self._bits('gyroscope', 'data_rate') << 6) |
+            (self._bits('gyroscope', 'bandwidth_level') << 4) |
+            ((not gyro['powerdown_mode']) << 3) |
+            (gyro['enabled_z'] << 2) | (gyro['enabled_y'] << 1) | gyro['enabled_x']
+        )
+        gyro_reg4 = (
+            ((not gyro['continuous_update']) << 7) |  # Block data update.
+            (gyro['little_endian'] << 6) |
+            (self._bits('gyroscope', 'full_scale') << 4) |
+            (self._bits('gyroscope', 'self_test') << 1)
+        )
+        mag_reg5 = (
+            (mag['enabled_temp'] << 7) |
+            ((0b11 if mag['high_resolution'] else 0b00) << 5) |
+            (self._bits('magnetometer', 'data_rate') << 2)
+            # Latch interrupts disabled.
+        )
+        mag_reg6 = self._bits('magnetometer', 'full_scale') << 5
+        mag_reg7 = (
+            # Accelerometer high-pass filter disabled and filtered acceleration data selection bypassed.
+            (mag['lowpower_mode'] << 2) |
+            self._bits('magnetometer', 'sensor_mode')
+        )
+        values = {
+            'accelerometer': (acc_reg1, acc_reg2),
+            'gyroscope': (gyro_reg1, gyro_reg4),
+            'magnetometer': (mag_reg5, mag_reg6, mag_reg7),
+        }
+        return dict((sensor, [(address, register, int(value)) for (_, address, register), value in
+                              zip(CONTROL_REGISTERS[sensor], values[sensor])])
+                    for sensor in CONTROL_REGISTERS)
@@ -26,6 +26,7 @@ import datetime
 import numpy as np
 
 from pyberryimu import version
+from pyberryimu.exc import PyBerryIMUError
 
 
 class IMUDataContainer(object):
@@ -107,6 +108,31 @@ class IMUDataContainer(object):
         if value is not None:
             self._data['temperature'] = np.array(value)
 
+    def apply_calibration(self, calibration_object):
+        """Calibrate stored raw accelerometer, gyroscope and magnetometer values.
+
+        The values are transformed with the batch transforms of the
+        calibration object, in place for float arrays, and the calibration
+        parameters of the container are replaced with those of the calibration.
+
+        :param calibration_object: The calibration to apply.
+        :type calibration_object: :py:class:`pyberryimu.calibration.base.BerryIMUCalibration`
+        :return: This container.
+        :rtype: :py:class:`IMUDataContainer`
+
+        """
+        if self.calibration_parameters and any(sensor in self.calibration_parameters for sensor in
+                                               ('accelerometer', 'gyroscope', 'magnetometer')):
+            raise PyBerryIMUError("The stored values are already calibrated.")
+        for sensor, transform in (('accelerometer', calibration_object.transform_accelerometer_batch),
+                                  ('gyroscope', calibration_object.transform_gyroscope_batch),
+                                  ('magnetometer', calibration_object.transform_magnetometer_batch)):
+            values = self._data.get(sensor)
+            if values is not None:
+                self._data[sensor] = transform(values, out=values if values.dtype.kind == 'f' else None)
+        self.calibration_parameters = calibration_object.to_json()
+        return self
+
     def to_json(self):
         return {
             'name': self.recording_name,
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`imuarray`
+==================
+
+.. module:: imuarray
+   :platform: Unix, Windows
+   :synopsis: Synchronized sampling of several BerryIMUs.
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import time
+import datetime
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.client import BerryIMUClient
+from pyberryimu.container import IMUDataContainer
+
+# Monotonic clock, falling back to the system clock on Python 2.
+_monotonic = getattr(time, 'monotonic', time.time)
+
+
+class BerryIMUArray(object):
+    """Samples several BerryIMUs in parallel, on a common timebase.
+
+    The clients are grouped by I2C bus and each bus is sampled by its own
+    worker thread, so that reads on different buses overlap. All workers
+    sample on the same schedule of ticks of a monotonic clock; row n of every
+    recorded device belongs to tick n. Timestamps are the midpoints of the
+    reads on the monotonic clock, offset to Epoch time at the start of the
+    recording, so they are comparable between devices.
+
+    .. code:: python
+
+        with BerryIMUArray.from_buses([1, 3]) as imus:
+            containers = imus.record(frequency=100, duration=10)
+
+    :param clients: The clients to sample with.
+    :type clients: list
+
+    """
+
+    def __init__(self, clients):
+        """Constructor for BerryIMUArray"""
+        self.clients = list(clients)
+        # Number of ticks skipped for each client during the latest recording.
+        self.skipped_ticks = [0] * len(self.clients)
+
+    @classmethod
+    def from_buses(cls, buses, settings=None, **kwargs):
+        """Create an array with one client on each of the given I2C buses.
+
+        :param buses: The I2C bus numbers.
+        :type buses: list
+        :param settings: Settings for all clients.
+        :type settings: dict
+        :param kwargs: Other keyword arguments for the clients.
+        :return: The BerryIMU array.
+        :rtype: :py:class:`BerryIMUArray`
+
+        """
+        return cls([BerryIMUClient(bus=bus, settings=settings, **kwargs) for bus in buses])
+
+    def __len__(self):
+        return len(self.clients)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def open(self):
+        for client in self.clients:
+            client.open()
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+
+    def _get_bus_groups(self):
+        """Indices of the clients on each bus, in order of first appearance."""
+        groups = OrderedDict()
+        for i, client in enumerate(self.clients):
+            groups.setdefault(client._bus_no, []).append(i)
+        return list(groups.values())
+
+    def _sample_bus(self, indices, data, start_t, period, offset, errors):
+        """Worker sampling the clients of one bus at every tick."""
+        n_ticks = data.shape[1]
+        n = 0
+        try:
+            while n < n_ticks:
+                delay = start_t + n * period - _monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -period:
+                    # Fallen behind: skip the ticks already passed, keeping rows aligned to ticks.
+                    n_skip = min(int(-delay // period), n_ticks - n)
+                    for i in indices:
+                        data[i, n:n + n_skip, :] = np.nan
+                        self.skipped_ticks[i] += n_skip
+                    n += n_skip
+                    continue
+                for i in indices:
+                    t = _monotonic()
+                    self.clients[i].read_imu(out=data[i, n, :])
+                    data[i, n, 0] = (t + _monotonic()) / 2 + offset
+                n += 1
+        except Exception as e:
+            errors.append(e)
+
+    def record(self, frequency, duration):
+        """Record all three IMU sensors of all devices.
+
+        :param frequency: Sampling frequency in Hz.
+        :type frequency: float
+        :param duration: Recording duration in seconds.
+        :type duration: float
+        :return: One data container per client, all with the same number of
+            samples. Samples of ticks skipped by a device are NaN.
+        :rtype: list
+
+        """
+        period = 1 / frequency
+        n_ticks = int(np.ceil(frequency * duration))
+        data = np.zeros((len(self.clients), n_ticks, 10), 'float')
+        self.skipped_ticks = [0] * len(self.clients)
+        errors = []
+
+        # Let all workers start at the same tick, shortly after they have been started.
+        start_dt = datetime.datetime.now()
+        offset = time.time() - _monotonic()
+        start_t = _monotonic() + 0.01
+        workers = [threading.Thread(target=self._sample_bus, args=(indices, data, start_t, period, offset, errors))
+                   for indices in self._get_bus_groups()]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise PyBerryIMUError("Recording failed: {0}".format(errors[0]))
+
+        containers = []
+        for client, device_data in zip(self.clients, data):
+            container = IMUDataContainer(start_dt, client.get_settings(), client.calibration_object.to_json())
+            container.timestamps = device_data[:, 0]
+            container.accelerometer = device_data[:, 1:4]
+            container.gyroscope = device_data[:, 4:7]
+            container.magnetometer = device_data[:, 7:10]
+            containers.append(container)
+        return containers
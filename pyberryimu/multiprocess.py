@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`multiprocess`
+==================
+
+.. module:: multiprocess
+   :platform: Unix
+   :synopsis: Acquisition in a separate process, publishing to a shared memory ring buffer.
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import sys
+import time
+import multiprocessing
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:
+    # Python < 3.8.
+    shared_memory = None
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.client import BerryIMUClient
+from pyberryimu.streamer import RingBuffer, BerryIMUStreamer
+
+# Number of int64 values preceding the samples in the shared memory block:
+# the number of samples written, the capacity, the width and one unused
+# padding value, which keeps the samples aligned to 32 bytes.
+_HEADER_SIZE = 4
+
+
+def _require_shared_memory():
+    if shared_memory is None:
+        raise PyBerryIMUError("Shared memory acquisition requires Python 3.8 or later.")
+
+
+# Python < 3.13 registers every attached block with the resource tracker, which
+# unlinks the registered blocks when the process exits.
+_ATTACH_REGISTERS = sys.version_info < (3, 13)
+
+
+def _tracker_name(shm):
+    # The POSIX name of the block, as registered with the resource tracker.
+    return '/' + shm.name
+
+
+def _attach_shared_memory(name):
+    """Attach to an existing shared memory block without taking ownership of it.
+
+    Only the creator of a block unlinks it, so attached blocks are not left
+    registered with the resource tracker.
+
+    """
+    if not _ATTACH_REGISTERS:
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(_tracker_name(shm), 'shared_memory')
+    return shm
+
+
+def _unlink_shared_memory(shm):
+    """Unlink a shared memory block created by this process."""
+    if _ATTACH_REGISTERS:
+        # A process sharing the resource tracker of the creator may have withdrawn its registration.
+        resource_tracker.register(_tracker_name(shm), 'shared_memory')
+    shm.unlink()
+
+
+class SharedRingBuffer(RingBuffer):
+    """Ring buffer of float samples in a named shared memory block.
+
+    The block holds the sequence counter of written samples followed by the
+    mirrored sample storage of :py:class:`~pyberryimu.streamer.RingBuffer`.
+    There is one writer, and any number of readers in other processes can
+    attach by name; each reader keeps its own drain position and gets
+    samples as views of the shared memory, without copying.
+
+    Since the writer may be in another process, only the ``'overwrite'``
+    policy is supported and :py:meth:`wait` polls. Readers can use
+    :py:meth:`~pyberryimu.streamer.RingBuffer.is_overwritten` to check that
+    a view was not overwritten while it was being processed.
+
+    :param name: Name of the shared memory block. A unique name is
+        generated when creating a block without one.
+    :type name: str
+    :param capacity: Number of slots, when creating.
+    :type capacity: int
+    :param width: Number of values in each sample, when creating.
+    :type width: int
+    :param create: Create a new block, instead of attaching to an existing one.
+    :type create: bool
+
+    """
+
+    def __init__(self, name=None, capacity=1024, width=10, create=False):
+        """Constructor for SharedRingBuffer"""
+        _require_shared_memory()
+        if create:
+            shm = shared_memory.SharedMemory(
+                name=name, create=True, size=8 * (_HEADER_SIZE + 2 * capacity * width))
+            header = np.ndarray((_HEADER_SIZE, ), 'int64', shm.buf)
+            header[:] = (0, capacity, width, 0)
+        else:
+            shm = _attach_shared_memory(name)
+            header = np.ndarray((_HEADER_SIZE, ), 'int64', shm.buf)
+            capacity, width = int(header[1]), int(header[2])
+        data = np.ndarray((2 * capacity, width), 'float64', shm.buf, offset=8 * _HEADER_SIZE)
+        super(SharedRingBuffer, self).__init__(capacity, width, 'float64', 'overwrite',
+                                               data=data, written=header[0:1])
+        self._shm = shm
+        self._owner = create
+        # New readers start at the current position of the writer.
+        self._drained[0] = self._written[0]
+
+    @property
+    def name(self):
+        """The name to attach to the shared memory block with."""
+        return self._shm.name
+
+    def wait(self, n=1, timeout=None, poll_interval=0.001):
+        """Wait until at least n undrained samples are available.
+
+        :param n: Number of samples to wait for.
+        :type n: int
+        :param timeout: Maximum time to wait, in seconds.
+        :type timeout: float
+        :param poll_interval: Time between checks of the sequence counter, in seconds.
+        :type poll_interval: float
+        :return: If the samples are available.
+        :rtype: bool
+
+        """
+        wakeups = self._wakeups
+        deadline = None if timeout is None else time.time() + timeout
+        while self._written[0] - self._drained[0] < n:
+            if self._wakeups != wakeups or (deadline is not None and time.time() >= deadline):
+                return False
+            time.sleep(poll_interval)
+        return True
+
+    def close(self):
+        """Detach from the shared memory block, and remove it if this buffer created it.
+
+        Views returned by :py:meth:`latest` and :py:meth:`drain` must have been deleted.
+
+        """
+        if self._shm is None:
+            return
+        if self._owner:
+            _unlink_shared_memory(self._shm)
+        self._data = self._written = None
+        self._shm.close()
+        self._shm = None
+
+
+def _acquire(name, frequency, calibrated, client_kwargs, calibration_object, stop_event, connection):
+    """Target of the acquisition process."""
+    buffer = SharedRingBuffer(name)
+    error = None
+    try:
+        client = BerryIMUClient(**client_kwargs)
+        if calibration_object is not None:
+            client.calibration_object = calibration_object
+        streamer = BerryIMUStreamer(client, frequency, calibrated=calibrated, buffer=buffer)
+        streamer.run(stop_event)
+        client.close()
+    except Exception as e:
+        error = e
+    if error is not None:
+        connection.send("{0}: {1}".format(type(error).__name__, error))
+    connection.close()
+    buffer.close()
+
+
+class BerryIMUAcquisitionProcess(object):
+    """Samples the BerryIMU in a separate process into a shared memory ring buffer.
+
+    The acquisition process creates its own client, which owns the I2C bus,
+    and writes :py:meth:`~pyberryimu.client.BerryIMUClient.read_imu` rows at a
+    fixed rate to a :py:class:`SharedRingBuffer`. The buffer is created by,
+    and removed with, this object; reader processes attach to it with
+    ``SharedRingBuffer(name)``.
+
+    .. code:: python
+
+        with BerryIMUAcquisitionProcess(frequency=100, bus=1) as acquisition:
+            # In this or any other process:
+            buffer = SharedRingBuffer(acquisition.name)
+            buffer.wait(10)
+            process(buffer.drain())
+
+    Requires Python 3.8 or later. With the ``'spawn'`` start method the client
+    arguments and calibration object must be picklable.
+
+    :param frequency: Sampling frequency in Hz. Defaults to the accelerometer data rate.
+    :type frequency: float
+    :param capacity: Number of slots of the ring buffer, holding up to ``capacity - 1`` samples.
+    :type capacity: int
+    :param calibrated: Store calibrated values instead of raw values.
+    :type calibrated: bool
+    :param name: Name of the shared memory block, generated if not given.
+    :type name: str
+    :param calibration_object: Calibration to use in the acquisition process.
+    :type calibration_object: :py:class:`pyberryimu.calibration.base.BerryIMUCalibration`
+    :param client_kwargs: Keyword arguments for the
+        :py:class:`~pyberryimu.client.BerryIMUClient` of the acquisition
+        process, e.g. ``bus``, ``settings`` and ``transport``.
+
+    """
+
+    def __init__(self, frequency=None, capacity=4096, calibrated=True, name=None,
+                 calibration_object=None, **client_kwargs):
+        """Constructor for BerryIMUAcquisitionProcess"""
+        self.frequency = frequency
+        self.calibrated = calibrated
+        self.buffer = SharedRingBuffer(name, capacity, 10, create=True)
+        self._calibration_object = calibration_object
+        self._client_kwargs = client_kwargs
+
+        self._process = None
+        self._connection = None
+        self._stop_event = multiprocessing.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.stop()
+        finally:
+            self.close()
+
+    @property
+    def name(self):
+        """The name of the shared memory block."""
+        return self.buffer.name
+
+    @property
+    def is_running(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Start the acquisition process."""
+        if self.is_running:
+            raise PyBerryIMUError("Acquisition process is already running.")
+        self._stop_event.clear()
+        self._connection, child_connection = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=_acquire, name='BerryIMUAcquisition',
+            args=(self.name, self.frequency, self.calibrated, self._client_kwargs,
+                  self._calibration_object, self._stop_event, child_connection))
+        self._process.daemon = True
+        self._process.start()
+        child_connection.close()
+
+    def stop(self):
+        """Stop the acquisition process and wait for it to finish.
+
+        An exception raised in the acquisition process is raised here.
+
+        """
+        self._stop_event.set()
+        if self._process is None:
+            return
+        self._process.join()
+        self._process = None
+        error = None
+        if self._connection.poll():
+            try:
+                error = self._connection.recv()
+            except EOFError:
+                pass
+        self._connection.close()
+        if error is not None:
+            raise PyBerryIMUError("Acquisition failed: {0}".format(error))
+
+    def close(self):
+        """Remove the shared memory block."""
+        self.buffer.close()
@@ -25,7 +25,7 @@ import itertools
 
 import numpy as np
 
-from pyberryimu.container import BerryIMUDataContainer
+from pyberryimu.container import IMUDataContainer
 
 
 class BerryIMURecorder(object):
@@ -46,6 +46,11 @@ class BerryIMURecorder(object):
         self.frequency = frequency
         self.duration = duration
 
+        # Number of reads of the reference sensor during the latest recording that
+        # found the overrun flag set, i.e. that at least one sample had been
+        # overwritten before being read. The number of lost samples is unknown.
+        self.overruns = 0
+
     def _record(self, callback_function):
         timestamps = []
         data = []
@@ -62,7 +67,7 @@ class BerryIMURecorder(object):
         start_dt = datetime.datetime.now()
         start_t = time.time()
         while True:
-            time.sleep(g.next())
+            time.sleep(next(g))
             t = time.time()
             timestamps.append(t)
             data.append(callback_function())
@@ -70,9 +75,49 @@ class BerryIMURecorder(object):
                 break
         return start_dt, timestamps, data
 
+    def _record_imu(self):
+        """Record all three LSM9DS0 sensors into a preallocated array.
+
+        :return: The start time and an array with one
+            :py:meth:`pyberryimu.client.BerryIMUClient.read_imu` row per sample.
+        :rtype: tuple
+
+        """
+        period = 1 / self.frequency
+        data = np.zeros((int(np.ceil(self.frequency * self.duration)) + 2, 10), 'float')
+        n = 0
+
+        start_dt = datetime.datetime.now()
+        start_t = time.time()
+        while True:
+            time.sleep(max(start_t + (n + 1) * period - time.time(), 0))
+            if n == len(data):
+                data = np.concatenate([data, np.zeros_like(data)])
+            self.client.wait_for_data_ready('accelerometer')
+            self.client.read_imu(out=data[n, :])
+            n += 1
+            if (data[n - 1, 0] - start_t) > self.duration:
+                break
+        return start_dt, data[:n, :]
+
+    def _check_recording_frequency(self, timestamps):
+        """Simple check for deviant recording frequency and data overruns."""
+        if self.overruns:
+            print("Data overruns: {0} reads found that samples had been overwritten "
+                  "before being read.".format(self.overruns))
+        mean_recording_freq = np.mean(1 / np.diff(timestamps))
+        if np.abs((mean_recording_freq - self.frequency) / self.frequency) > 0.05:
+            print("Recording deviation detected: Desired freq "
+                  "was {0} Hz, achieved was {1:.2f} Hz.".format(self.frequency, mean_recording_freq))
+
     def record(self, acc=True, gyro=True, mag=True, pres=False, temp=False):
         """Main recording method.
 
+        The first of the recorded IMU sensors is used as reference sensor: each
+        sample waits until the reference sensor has new data available, so that
+        no sample is stored twice, and reads finding that samples had been
+        overwritten before being read are counted in :py:attr:`overruns`.
+
         :param acc: Record accelerometer values.
         :type acc: bool
         :param gyro: Record gyroscope values.
@@ -84,17 +129,40 @@ class BerryIMURecorder(object):
         :param temp: Record temperature values.
         :type temp: bool
         :return: The recorded data container.
-        :rtype: :py:class:`pyberryimu.container.BerryIMUDataContainer`
+        :rtype: :py:class:`pyberryimu.container.IMUDataContainer`
 
         """
+        reference_sensor = 'accelerometer' if acc else ('gyroscope' if gyro else ('magnetometer' if mag else None))
+        if reference_sensor is not None:
+            overruns_at_start = self.client.get_data_status(reference_sensor).get('overrun_count')
+
+        if acc and gyro and mag and not (pres or temp):
+            # Read and calibrate all IMU sensors at once, straight into a preallocated array.
+            start_dt, data = self._record_imu()
+            self.overruns = self.client.get_data_status(
+                reference_sensor).get('overrun_count') - overruns_at_start
+            data_obj = IMUDataContainer(
+                start_dt, self.client.get_settings(), self.client.calibration_object.to_json())
+            data_obj.timestamps = data[:, 0]
+            data_obj.accelerometer = data[:, 1:4]
+            data_obj.gyroscope = data[:, 4:7]
+            data_obj.magnetometer = data[:, 7:10]
+            self._check_recording_frequency(data_obj.timestamps)
+            return data_obj
+
+        def new_sample_reader():
+            return self.client.wait_for_new_sample(reference_sensor)
 
         sensor_methods_to_call = []
         if acc:
-            sensor_methods_to_call.append(self.client.read_accelerometer)
+            sensor_methods_to_call.append(
+                new_sample_reader if reference_sensor == 'accelerometer' else self.client.read_accelerometer)
         if gyro:
-            sensor_methods_to_call.append(self.client.read_gyroscope)
+            sensor_methods_to_call.append(
+                new_sample_reader if reference_sensor == 'gyroscope' else self.client.read_gyroscope)
         if mag:
-            sensor_methods_to_call.append(self.client.read_magnetometer)
+            sensor_methods_to_call.append(
+                new_sample_reader if reference_sensor == 'magnetometer' else self.client.read_magnetometer)
         if pres:
             # Define a simple wrapping function to output array instead of scalar.
             def pressure_reader():
@@ -119,11 +187,11 @@ class BerryIMURecorder(object):
             """A method for parsing recorded data to proper container positions.
 
             :param container: The container to store the recorded data in.
-            :type container: :py:class:`pyberryimu.container.BerryIMUDataContainer`
+            :type container: :py:class:`pyberryimu.container.IMUDataContainer`
             :param data: The recorded data.
             :type data: array or tuple
             :return: The data container.
-            :rtype: :py:class:`pyberryimu.container.BerryIMUDataContainer`
+            :rtype: :py:class:`pyberryimu.container.IMUDataContainer`
 
             """
             container.timestamps = data[1]
@@ -145,16 +213,15 @@ class BerryIMURecorder(object):
                 container.temperature = data[:, n]
                 n += 3
 
-            # Simple check for deviant recording frequency.
-            mean_recording_freq = np.mean(1/np.diff(container.timestamps))
-            if np.abs((mean_recording_freq - self.frequency) / self.frequency) > 0.05:
-                print("Recording deviation detected: Desired freq "
-                      "was {0} Hz, achieved was {1:.2f} Hz.".format(self.frequency, mean_recording_freq))
+            self._check_recording_frequency(container.timestamps)
 
             return data_obj
 
         out = self._record(recording_function)
-        data_obj = BerryIMUDataContainer(out[0], self.client.get_settings(), self.client.calibration_object.to_json())
+        if reference_sensor is not None:
+            self.overruns = self.client.get_data_status(
+                reference_sensor).get('overrun_count') - overruns_at_start
+        data_obj = IMUDataContainer(out[0], self.client.get_settings(), self.client.calibration_object.to_json())
         return finalizing_function(data_obj, out)
 
     def record_generic_callback(self, callback_function, finalizing_function):
@@ -163,12 +230,12 @@ class BerryIMURecorder(object):
         :param callback_function:
         :type callback_function: :py:class:`function`
         :param finalizing_function: A method for restructuring the obtained
-            data into a :py:class:`pyberryimu.container.BerryIMUDataContainer` and returning it.
+            data into a :py:class:`pyberryimu.container.IMUDataContainer` and returning it.
         :type finalizing_function: :py:class:`function`
         :return: The recorded data object.
-        :rtype: :py:class:`pyberryimu.container.BerryIMUDataContainer`
+        :rtype: :py:class:`pyberryimu.container.IMUDataContainer`
 
         """
         out = self._record(callback_function)
-        data_obj = BerryIMUDataContainer(out[0], self.client.get_settings(), self.client.calibration_object.to_json())
+        data_obj = IMUDataContainer(out[0], self.client.get_settings(), self.client.calibration_object.to_json())
         return finalizing_function(data_obj, out)
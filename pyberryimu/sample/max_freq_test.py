@@ -19,9 +19,11 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
+import sys
 import time
 import six
 from pyberryimu.client import BerryIMUClient
+from pyberryimu.simulator import SimulatedBerryIMU
 
 
 def max_freq_test(client, n=1000):
@@ -82,9 +84,22 @@ def max_freq_test(client, n=1000):
     elapsed = time.time() - t
     print("Max all-sensor read frequency: {0:.2f} Hz".format((n // 10) / elapsed))
 
+    t = time.time()
+    data = []
+    client.start_bmp180_conversions()
+    for k in six.moves.range(n):
+        client.poll_bmp180()
+        data.append((client.read_accelerometer(), client.read_gyroscope(), client.read_magnetometer(),
+                     client.latest_pressure, client.latest_temperature))
+    client.stop_bmp180_conversions()
+    elapsed = time.time() - t
+    print("Max all-sensor read frequency with pipelined pressure: {0:.2f} Hz".format(n / elapsed))
+
 
 def main():
-    with BerryIMUClient() as client:
+    # Run against a simulated BerryIMU on a 400 kHz bus with `--simulate`.
+    transport = SimulatedBerryIMU(latency=0.0001, bus_frequency=400000) if '--simulate' in sys.argv else None
+    with BerryIMUClient(transport=transport) as client:
         max_freq_test(client)
 
 if __name__ == "__main__":
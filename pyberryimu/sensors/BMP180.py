@@ -10,6 +10,8 @@
 
 """
 
+from __future__ import division
+
 # General address
 ADDRESS = 0x77
 
@@ -18,3 +20,81 @@ CALIB_DATA_REG = 0xAA
 CHIP_ID_REG = 0xD0
 WRITE_REG = 0xF4
 READ_REG = 0xF6
+
+# Commands for the control register.
+TEMPERATURE_COMMAND = 0x2E
+PRESSURE_COMMAND = 0x34
+
+# Maximum conversion times in seconds.
+TEMPERATURE_CONVERSION_TIME = 0.0045
+
+# Maximum pressure conversion time in seconds for each oversampling setting.
+_TABLE_PRESSURE_CONVERSION_TIME = {
+    0: 0.0045,  # Ultra low power mode
+    1: 0.0075,  # Standard mode
+    2: 0.0135,  # High resolution mode
+    3: 0.0255,  # Ultra high resolution mode
+}
+
+
+def get_pressure_conversion_time(oversampling):
+    return _TABLE_PRESSURE_CONVERSION_TIME.get(oversampling, 0.0255)
+
+
+# Names of the calibration coefficients, in EEPROM order.
+CALIBRATION_COEFFICIENTS = ('ac1', 'ac2', 'ac3', 'ac4', 'ac5', 'ac6', 'b1', 'b2', 'mb', 'mc', 'md')
+
+
+def parse_calibration_data(block):
+    """Parse the 22 bytes of calibration EEPROM data.
+
+    All coefficients except AC4, AC5 and AC6 are signed.
+
+    :param block: The bytes read from the EEPROM.
+    :type block: list
+    :return: The calibration coefficients.
+    :rtype: dict
+
+    """
+    vals = [msb + lsb for msb, lsb in zip(map(lambda x: x << 8, block[::2]), block[1::2])]
+    for i in [0, 1, 2, 6, 7, 8, 9, 10]:
+        if vals[i] > 2 ** 15 - 1:
+            vals[i] -= 2 ** 16
+    return dict(zip(CALIBRATION_COEFFICIENTS, vals))
+
+
+def compute_b5(ut, calibration):
+    """Compute the temperature compensation value B5 from uncompensated temperature."""
+    x1 = ((ut - calibration['ac6']) * calibration['ac5']) >> 15
+    x2 = (calibration['mc'] << 11) // (x1 + calibration['md'])
+    return x1 + x2
+
+
+def compute_temperature(b5):
+    """Compute the temperature in degrees Celsius from B5."""
+    return ((b5 + 8) >> 4) / 10.0
+
+
+def compute_pressure(up, b5, oversampling, calibration):
+    """Compute the pressure in hPa from uncompensated pressure and B5."""
+    b6 = b5 - 4000
+    b62 = b6 * b6 >> 12
+    x1 = (calibration['b2'] * b62) >> 11
+    x2 = calibration['ac2'] * b6 >> 11
+    x3 = x1 + x2
+    b3 = (((calibration['ac1'] * 4 + x3) << oversampling) + 2) >> 2
+
+    x1 = calibration['ac3'] * b6 >> 13
+    x2 = (calibration['b1'] * b62) >> 16
+    x3 = ((x1 + x2) + 2) >> 2
+    b4 = (calibration['ac4'] * (x3 + 32768)) >> 15
+    b7 = (up - b3) * (50000 >> oversampling)
+
+    p = (b7 * 2) // b4
+
+    x1 = (p >> 8) * (p >> 8)
+    x1 = (x1 * 3038) >> 16
+    x2 = (-7357 * p) >> 16
+    p += (x1 + x2 + 3791) >> 4
+
+    return p / 100.0
@@ -13,10 +13,16 @@
 
 """
 
+from __future__ import division
+
 MAG_ADDRESS = 0x1E
 ACC_ADDRESS = 0x1E
 GYR_ADDRESS = 0x6A
 
+# Setting the most significant bit of the sub-address enables automatic
+# increment of the register address during multiple byte reads/writes.
+AUTO_INCREMENT = 0x80
+
 # LSM9DS0 Gyro Registers
 WHO_AM_I_G = 0x0F
 CTRL_REG1_G = 0x20
@@ -100,6 +106,37 @@ TIME_LIMIT = 0x3B
 TIME_LATENCY = 0x3C
 TIME_WINDOW = 0x3D
 
+# Bits of the STATUS_REG_A, STATUS_REG_G and STATUS_REG_M registers.
+STATUS_OVERRUN_BIT = 0b10000000    # ZYXOR: X, Y and Z data overrun.
+STATUS_DATA_READY_BIT = 0b00001000  # ZYXDA: X, Y and Z new data available.
+
+# FIFO settings, common for the accelerometer and the gyroscope.
+
+# FIFO enable bit in CTRL_REG0_XM and CTRL_REG5_G.
+FIFO_ENABLE_BIT = 0b01000000
+
+# Bits of the FIFO_SRC_REG and FIFO_SRC_REG_G registers.
+FIFO_WATERMARK_BIT = 0b10000000
+FIFO_OVERRUN_BIT = 0b01000000
+FIFO_EMPTY_BIT = 0b00100000
+FIFO_LEVEL_MASK = 0b00011111
+
+# Number of samples the FIFO can store.
+FIFO_SIZE = 32
+
+# FIFO mode selection.
+_TABLE_FIFO_MODE = {
+    'bypass': '000',
+    'fifo': '001',
+    'stream': '010',
+    'stream_to_fifo': '011',
+    'bypass_to_stream': '100',
+}
+
+
+def get_fifo_mode_bits(mode):
+    return _TABLE_FIFO_MODE.get(mode, '000')
+
 # Accelerometer settings
 
 # Accelerometer data refresh rates
@@ -109,7 +146,7 @@ _TABLE_72 = {
     6.25: '0010',
     12.5: '0011',
     25: '0100',
-    50: '0100',
+    50: '0101',
     100: '0110',
     200: '0111',
     400: '1000',
@@ -143,6 +180,16 @@ _TABLE_77 = {
 }
 
 
+# Accelerometer linear acceleration sensitivity, in g/LSB, for each full scale.
+ACCELEROMETER_SENSITIVITY = {
+    2: 0.061 / 1000.,
+    4: 0.122 / 1000.,
+    6: 0.183 / 1000.,
+    8: 0.244 / 1000.,
+    16: 0.732 / 1000.,
+}
+
+
 def get_accelerometer_data_rate_bits(data_rate):
     return _TABLE_72.get(data_rate, '0000')
 
@@ -184,6 +231,14 @@ _TABLE_31 = {
 }
 
 
+# Gyroscope angular rate sensitivity, in dps/LSB, for each full scale.
+GYROSCOPE_SENSITIVITY = {
+    245: 8.75 / 1000.,
+    500: 17.50 / 1000.,
+    2000: 70 / 1000.,
+}
+
+
 def get_gyroscope_data_rate_bits(data_rate):
     return _TABLE_21_1.get(data_rate, '00')
 
@@ -211,7 +266,7 @@ _TABLE_84 = {
     12.5: '010',
     25: '011',
     50: '100',
-    100: '110',
+    100: '101',
 }
 
 # Magnetometer full-scale selection.
@@ -231,6 +286,15 @@ _TABLE_90 = {
 }
 
 
+# Magnetometer magnetic sensitivity, in gauss/LSB, for each full scale.
+MAGNETOMETER_SENSITIVITY = {
+    2: 0.08 / 1000.,
+    4: 0.16 / 1000.,
+    8: 0.32 / 1000.,
+    12: 0.48 / 1000.,
+}
+
+
 def get_magnetometer_data_rate_bits(data_rate):
     return _TABLE_84.get(data_rate, '100')
 
@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`simulator`
+==================
+
+.. module:: simulator
+   :platform: Unix, Windows
+   :synopsis: Simulated BerryIMU device, for running the client without hardware.
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import time
+import struct
+import random
+import threading
+from collections import deque
+
+from pyberryimu.transport import I2CTransport
+from pyberryimu.sensors import LSM9DS0, BMP180
+
+# Output data rates for the AODR bits of CTRL_REG1_XM.
+_ACCELEROMETER_DATA_RATES = {
+    0b0000: 0, 0b0001: 3.125, 0b0010: 6.25, 0b0011: 12.5, 0b0100: 25, 0b0101: 50,
+    0b0110: 100, 0b0111: 200, 0b1000: 400, 0b1001: 800, 0b1010: 1600,
+}
+# Output data rates for the DR bits of CTRL_REG1_G.
+_GYROSCOPE_DATA_RATES = {0b00: 95, 0b01: 190, 0b10: 380, 0b11: 760}
+# Output data rates for the M_ODR bits of CTRL_REG5_XM.
+_MAGNETOMETER_DATA_RATES = {0b000: 3.125, 0b001: 6.25, 0b010: 12.5, 0b011: 25, 0b100: 50, 0b101: 100}
+
+_ACCELEROMETER_FULL_SCALES = {0b000: 2, 0b001: 4, 0b010: 6, 0b011: 8, 0b100: 16}
+_GYROSCOPE_FULL_SCALES = {0b00: 245, 0b01: 500, 0b10: 2000, 0b11: 2000}
+_MAGNETOMETER_FULL_SCALES = {0b00: 2, 0b01: 4, 0b10: 8, 0b11: 12}
+
+# Start conversion bit of the BMP180 control register.
+_BMP180_SCO_BIT = 0b00100000
+
+# The BMP180 calibration coefficients of the data sheet example.
+BMP180_DATASHEET_CALIBRATION = {
+    'ac1': 408, 'ac2': -72, 'ac3': -14383, 'ac4': 32741, 'ac5': 32757, 'ac6': 23153,
+    'b1': 6190, 'b2': 4, 'mb': -32768, 'mc': -8711, 'md': 2868}
+
+# Uncompensated temperature and pressure (oversampling 0) of the data sheet example,
+# corresponding to 15.0 degrees Celsius and 699.64 hPa.
+BMP180_DATASHEET_RAW_VALUES = (27898, 23843)
+
+# Signal of a BerryIMU lying still and level, in g, dps and gauss.
+_STATIONARY_SIGNAL = {
+    'accelerometer': (0.0, 0.0, 1.0),
+    'gyroscope': (0.0, 0.0, 0.0),
+    'magnetometer': (0.2, 0.0, -0.45),
+}
+
+
+def stationary_signal(sensor, t):
+    """The default signal of :py:class:`SimulatedBerryIMU`: a device lying still and level.
+
+    :param sensor: ``'accelerometer'``, ``'gyroscope'`` or ``'magnetometer'``.
+    :type sensor: str
+    :param t: The sample time.
+    :type t: float
+    :return: The sensor values, in g, dps and gauss respectively.
+    :rtype: tuple
+
+    """
+    return _STATIONARY_SIGNAL[sensor]
+
+
+class _SimulatedSensor(object):
+    """Output data state of one of the LSM9DS0 sensors."""
+
+    def __init__(self, name, address, status_reg, out_reg, fifo_src_reg=None):
+        self.name = name
+        self.address = address
+        self.status_reg = status_reg
+        self.out_reg = out_reg
+        self.fifo_src_reg = fifo_src_reg
+
+        self.data_rate = 0
+        self.sensitivity = None
+        self.start_time = None
+        self.nbr_produced = 0
+        self.status = 0
+        self.value = (0, 0, 0)
+
+        self.fifo_enabled = False
+        self.fifo_mode = 0
+        self.fifo_watermark = 0
+        self.fifo = deque()
+
+    @property
+    def fifo_active(self):
+        return self.fifo_enabled and self.fifo_mode != 0
+
+
+class SimulatedBerryIMU(I2CTransport):
+    """Simulated BerryIMU, usable as transport for the BerryIMUClient.
+
+    Models the register maps of the LSM9DS0 and the BMP180: the LSM9DS0 output
+    registers are refreshed at the data rates and scaled with the full scales
+    configured in the control registers, with status register data ready and
+    overrun bits, register address auto-increment and the 32 sample
+    accelerometer and gyroscope FIFOs. The BMP180 returns the calibration
+    EEPROM and uncompensated values of the data sheet example, after the
+    conversion time of the started conversion.
+
+    Every bus transaction can be delayed by a fixed latency and a transfer
+    time computed from the number of bytes and the bus frequency, to mimic
+    the timing of a real I2C bus.
+
+    .. code:: python
+
+        from pyberryimu.client import BerryIMUClient
+        from pyberryimu.simulator import SimulatedBerryIMU
+
+        with BerryIMUClient(transport=SimulatedBerryIMU(latency=0.0002)) as c:
+            print(c.read_imu())
+
+    :param signal: Callable taking a sensor name and a sample time and returning
+        the sensor values in g, dps or gauss. Defaults to :py:func:`stationary_signal`.
+    :type signal: callable
+    :param noise: Standard deviation of normally distributed noise added to
+        each sensor, as a dict of sensor name to value in g, dps or gauss.
+    :type noise: dict
+    :param latency: Fixed time in seconds added to each bus transaction.
+    :type latency: float
+    :param bus_frequency: I2C bus frequency in Hz, used for adding the transfer time
+        of each transaction. ``None`` means instant transfers.
+    :type bus_frequency: float
+    :param bmp180_raw_values: Uncompensated temperature and pressure of the BMP180,
+        the latter for oversampling setting 0.
+    :type bmp180_raw_values: tuple
+    :param clock: Callable returning the current time, ``time.time`` by default.
+    :type clock: callable
+    :param seed: Seed for the noise generator.
+    :type seed: int
+
+    """
+
+    def __init__(self, signal=None, noise=None, latency=0.0, bus_frequency=None,
+                 bmp180_raw_values=BMP180_DATASHEET_RAW_VALUES, clock=time.time, seed=None):
+        """Constructor for SimulatedBerryIMU"""
+        self.signal = signal if signal is not None else stationary_signal
+        self.noise = noise if noise is not None else {}
+        self.latency = latency
+        self.bus_frequency = bus_frequency
+        self.bmp180_raw_values = bmp180_raw_values
+        self._clock = clock
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self.nbr_transactions = 0
+        self.nbr_bytes = 0
+
+        self.registers = {
+            LSM9DS0.ACC_ADDRESS: [0] * 0x80,
+            LSM9DS0.GYR_ADDRESS: [0] * 0x80,
+            BMP180.ADDRESS: [0] * 0x100,
+        }
+        self._sensors = {
+            'accelerometer': _SimulatedSensor('accelerometer', LSM9DS0.ACC_ADDRESS, LSM9DS0.STATUS_REG_A,
+                                              LSM9DS0.OUT_X_L_A, LSM9DS0.FIFO_SRC_REG),
+            'gyroscope': _SimulatedSensor('gyroscope', LSM9DS0.GYR_ADDRESS, LSM9DS0.STATUS_REG_G,
+                                          LSM9DS0.OUT_X_L_G, LSM9DS0.FIFO_SRC_REG_G),
+            'magnetometer': _SimulatedSensor('magnetometer', LSM9DS0.MAG_ADDRESS, LSM9DS0.STATUS_REG_M,
+                                             LSM9DS0.OUT_X_L_M),
+        }
+        # Map of (address, register) to the sensor whose output or status it holds.
+        self._sensor_registers = {}
+        for sensor in self._sensors.values():
+            for register in range(sensor.status_reg, sensor.out_reg + 6):
+                self._sensor_registers[(sensor.address, register)] = sensor
+            if sensor.fifo_src_reg is not None:
+                self._sensor_registers[(sensor.address, sensor.fifo_src_reg)] = sensor
+
+        self._bmp180_command = None
+        self._bmp180_ready_time = None
+        self._reset()
+
+    def _reset(self):
+        """Set the power-on register values."""
+        now = self._clock()
+        xm = self.registers[LSM9DS0.ACC_ADDRESS]
+        g = self.registers[LSM9DS0.GYR_ADDRESS]
+        xm[LSM9DS0.WHO_AM_I_XM] = 0x49
+        xm[LSM9DS0.CTRL_REG1_XM] = 0b00000111
+        xm[LSM9DS0.CTRL_REG5_XM] = 0b00011000
+        xm[LSM9DS0.CTRL_REG6_XM] = 0b00100000
+        xm[LSM9DS0.CTRL_REG7_XM] = 0b00000010
+        g[LSM9DS0.WHO_AM_I_G] = 0xD4
+        g[LSM9DS0.CTRL_REG1_G] = 0b00000111
+
+        bmp = self.registers[BMP180.ADDRESS]
+        bmp[BMP180.CHIP_ID_REG] = 0x55
+        for i, name in enumerate(BMP180.CALIBRATION_COEFFICIENTS):
+            value = BMP180_DATASHEET_CALIBRATION[name] & 0xFFFF
+            bmp[BMP180.CALIB_DATA_REG + 2 * i] = value >> 8
+            bmp[BMP180.CALIB_DATA_REG + 2 * i + 1] = value & 0xFF
+
+        for sensor in self._sensors.values():
+            self._configure_sensor(sensor, now)
+
+    # Sensor configuration.
+
+    def _configure_sensor(self, sensor, now):
+        """Decode data rate, full scale and FIFO settings from the control registers."""
+        if sensor.name == 'accelerometer':
+            xm = self.registers[LSM9DS0.ACC_ADDRESS]
+            data_rate = _ACCELEROMETER_DATA_RATES.get(xm[LSM9DS0.CTRL_REG1_XM] >> 4, 0)
+            if not xm[LSM9DS0.CTRL_REG1_XM] & 0b111:
+                data_rate = 0
+            full_scale = _ACCELEROMETER_FULL_SCALES.get((xm[LSM9DS0.CTRL_REG2_XM] >> 3) & 0b111, 16)
+            sensitivity = LSM9DS0.ACCELEROMETER_SENSITIVITY[full_scale]
+            fifo_enable = xm[LSM9DS0.CTRL_REG0_XM]
+            fifo_ctrl = xm[LSM9DS0.FIFO_CTRL_REG]
+        elif sensor.name == 'gyroscope':
+            g = self.registers[LSM9DS0.GYR_ADDRESS]
+            data_rate = _GYROSCOPE_DATA_RATES.get(g[LSM9DS0.CTRL_REG1_G] >> 6)
+            if not (g[LSM9DS0.CTRL_REG1_G] & 0b1000 and g[LSM9DS0.CTRL_REG1_G] & 0b111):
+                data_rate = 0
+            full_scale = _GYROSCOPE_FULL_SCALES.get((g[LSM9DS0.CTRL_REG4_G] >> 4) & 0b11)
+            sensitivity = LSM9DS0.GYROSCOPE_SENSITIVITY[full_scale]
+            fifo_enable = g[LSM9DS0.CTRL_REG5_G]
+            fifo_ctrl = g[LSM9DS0.FIFO_CTRL_REG_G]
+        else:
+            xm = self.registers[LSM9DS0.MAG_ADDRESS]
+            data_rate = _MAGNETOMETER_DATA_RATES.get((xm[LSM9DS0.CTRL_REG5_XM] >> 2) & 0b111, 0)
+            if xm[LSM9DS0.CTRL_REG7_XM] & 0b11:
+                # Only continuous-conversion mode is simulated.
+                data_rate = 0
+            full_scale = _MAGNETOMETER_FULL_SCALES.get((xm[LSM9DS0.CTRL_REG6_XM] >> 5) & 0b11)
+            sensitivity = LSM9DS0.MAGNETOMETER_SENSITIVITY[full_scale]
+            fifo_enable = 0
+            fifo_ctrl = 0
+
+        if data_rate != sensor.data_rate:
+            sensor.data_rate = data_rate
+            sensor.start_time = now
+            sensor.nbr_produced = 0
+        sensor.sensitivity = sensitivity
+
+        sensor.fifo_enabled = bool(fifo_enable & LSM9DS0.FIFO_ENABLE_BIT)
+        sensor.fifo_mode = fifo_ctrl >> 5
+        sensor.fifo_watermark = fifo_ctrl & LSM9DS0.FIFO_LEVEL_MASK
+        if not sensor.fifo_active:
+            sensor.fifo.clear()
+
+    # Sample generation.
+
+    def _sample(self, sensor, t):
+        """Generate one raw sample of a sensor."""
+        values = self.signal(sensor.name, t)
+        std = self.noise.get(sensor.name, 0.0)
+        out = []
+        for v in values:
+            if std:
+                v += self._random.gauss(0.0, std)
+            out.append(max(-32768, min(32767, int(round(v / sensor.sensitivity)))))
+        return tuple(out)
+
+    def _update_sensor(self, sensor, now):
+        """Produce the samples of a sensor that are due at the given time."""
+        if not sensor.data_rate:
+            return
+        nbr_due = int((now - sensor.start_time) * sensor.data_rate)
+        nbr_new = nbr_due - sensor.nbr_produced
+        if nbr_new <= 0:
+            return
+
+        if nbr_new > 1 or sensor.status & LSM9DS0.STATUS_DATA_READY_BIT:
+            sensor.status |= LSM9DS0.STATUS_OVERRUN_BIT
+        sensor.status |= LSM9DS0.STATUS_DATA_READY_BIT
+
+        # Samples older than what fits in the FIFO would never be seen.
+        for k in range(max(sensor.nbr_produced, nbr_due - LSM9DS0.FIFO_SIZE) + 1, nbr_due + 1):
+            sensor.value = self._sample(sensor, sensor.start_time + k / sensor.data_rate)
+            if sensor.fifo_active:
+                if len(sensor.fifo) < LSM9DS0.FIFO_SIZE:
+                    sensor.fifo.append(sensor.value)
+                elif sensor.fifo_mode != 0b001:
+                    # All modes but FIFO mode discard the oldest sample when full.
+                    sensor.fifo.popleft()
+                    sensor.fifo.append(sensor.value)
+        sensor.nbr_produced = nbr_due
+
+    def _update_bmp180(self, now):
+        """Store the result of a finished BMP180 conversion."""
+        if self._bmp180_command is None or now < self._bmp180_ready_time:
+            return
+        bmp = self.registers[BMP180.ADDRESS]
+        ut, up = self.bmp180_raw_values
+        if self._bmp180_command == BMP180.TEMPERATURE_COMMAND:
+            bmp[BMP180.READ_REG:BMP180.READ_REG + 3] = [(ut >> 8) & 0xFF, ut & 0xFF, 0]
+        else:
+            oversampling = self._bmp180_command >> 6
+            value = (up << oversampling) << (8 - oversampling)
+            bmp[BMP180.READ_REG:BMP180.READ_REG + 3] = [(value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF]
+        bmp[BMP180.WRITE_REG] = self._bmp180_command & ~_BMP180_SCO_BIT
+        self._bmp180_command = None
+
+    def _update(self, now):
+        for sensor in self._sensors.values():
+            self._update_sensor(sensor, now)
+        self._update_bmp180(now)
+
+    # Register access.
+
+    def _read_register(self, address, register):
+        sensor = self._sensor_registers.get((address, register))
+        if sensor is None:
+            return self.registers[address][register]
+
+        if register == sensor.status_reg:
+            return sensor.status
+        elif register == sensor.fifo_src_reg:
+            level = len(sensor.fifo)
+            value = level & LSM9DS0.FIFO_LEVEL_MASK
+            if level == 0:
+                value |= LSM9DS0.FIFO_EMPTY_BIT
+            if level >= LSM9DS0.FIFO_SIZE:
+                value |= LSM9DS0.FIFO_OVERRUN_BIT
+            if level > sensor.fifo_watermark:
+                value |= LSM9DS0.FIFO_WATERMARK_BIT
+            return value
+
+        # Output registers; with the FIFO in use, they hold the oldest unread sample.
+        index = register - sensor.out_reg
+        if sensor.fifo_active and sensor.fifo:
+            value = sensor.fifo[0]
+            if index == 5:
+                sensor.fifo.popleft()
+        else:
+            value = sensor.value
+        sensor.status = 0
+        return bytearray(struct.pack(str('<h'), value[index // 2]))[index % 2]
+
+    def _next_register(self, address, register):
+        sensor = self._sensor_registers.get((address, register))
+        if sensor is not None and sensor.fifo_active and register == sensor.out_reg + 5:
+            # The address wraps around to the first output register when the FIFO is enabled.
+            return sensor.out_reg
+        return register + 1
+
+    def _write_register(self, address, register, value, now):
+        self.registers[address][register] = value
+        if address == BMP180.ADDRESS:
+            if register == BMP180.WRITE_REG:
+                if value == BMP180.TEMPERATURE_COMMAND:
+                    conversion_time = BMP180.TEMPERATURE_CONVERSION_TIME
+                elif value & 0b00111111 == BMP180.PRESSURE_COMMAND:
+                    conversion_time = BMP180.get_pressure_conversion_time(value >> 6)
+                else:
+                    return
+                self._bmp180_command = value
+                self._bmp180_ready_time = now + conversion_time
+                self.registers[address][register] = value | _BMP180_SCO_BIT
+        else:
+            for sensor in self._sensors.values():
+                if sensor.address == address:
+                    self._configure_sensor(sensor, now)
+
+    def _begin_transaction(self, nbr_bytes):
+        """Account for and delay a bus transaction, returning the current time."""
+        self.nbr_transactions += 1
+        self.nbr_bytes += nbr_bytes
+        delay = self.latency
+        if self.bus_frequency:
+            # Nine clock cycles per byte, including the acknowledge bit.
+            delay += 9 * nbr_bytes / self.bus_frequency
+        if delay > 0:
+            time.sleep(delay)
+        now = self._clock()
+        self._update(now)
+        return now
+
+    def _read_block(self, address, register, length):
+        step = 1
+        if address != BMP180.ADDRESS:
+            step = 1 if register & LSM9DS0.AUTO_INCREMENT else 0
+            register &= ~LSM9DS0.AUTO_INCREMENT
+        out = []
+        for i in range(length):
+            out.append(self._read_register(address, register))
+            if step:
+                register = self._next_register(address, register)
+        return out
+
+    def read_byte_data(self, address, register):
+        return self.read_i2c_block_data(address, register, 1)[0]
+
+    def write_byte_data(self, address, register, value):
+        self.write_i2c_block_data(address, register, [value])
+
+    def read_i2c_block_data(self, address, register, length):
+        with self._lock:
+            self._begin_transaction(3 + length)
+            return self._read_block(address, register, length)
+
+    def write_i2c_block_data(self, address, register, values):
+        with self._lock:
+            now = self._begin_transaction(2 + len(values))
+            step = 1
+            if address != BMP180.ADDRESS:
+                step = 1 if register & LSM9DS0.AUTO_INCREMENT else 0
+                register &= ~LSM9DS0.AUTO_INCREMENT
+            for i, value in enumerate(values):
+                self._write_register(address, register + i * step, value & 0xFF, now)
+
+    def read_i2c_block_data_batch(self, requests):
+        # A batch is simulated as one combined transaction, like the i2c-dev transport.
+        with self._lock:
+            self._begin_transaction(sum(3 + length for _, _, length in requests))
+            return [self._read_block(address, register, length) for address, register, length in requests]
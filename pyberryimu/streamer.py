@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`streamer`
+==================
+
+.. module:: streamer
+   :platform: Unix, Windows
+   :synopsis: Background acquisition of IMU data into a ring buffer.
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import time
+import threading
+
+import numpy as np
+
+from pyberryimu.exc import PyBerryIMUError
+
+
+class RingBuffer(object):
+    """Fixed-size ring buffer of samples, for one writer and one or more readers.
+
+    Every sample is stored twice, in two mirrored halves of an array of twice
+    the capacity, so that any run of consecutive samples is a contiguous slice
+    of that array and can be returned as a view without copying.
+
+    One slot is reserved for the writer: at most ``capacity - 1`` samples are
+    returned, so the row the writer fills next is never part of a view. A view
+    of n samples stays intact while the writer writes the next
+    ``capacity - n - 1`` samples; copy it if it is to be kept longer.
+
+    :param capacity: Number of slots, at least 2.
+    :type capacity: int
+    :param width: Number of values in each sample.
+    :type width: int
+    :param dtype: Data type of the values.
+    :type dtype: str
+    :param policy: ``'overwrite'`` to overwrite unread samples when full, or
+        ``'block'`` to make the writer wait until the samples have been drained.
+    :type policy: str
+
+    """
+
+    POLICIES = ('overwrite', 'block')
+
+    def __init__(self, capacity, width=10, dtype='float', policy='overwrite', data=None, written=None):
+        """Constructor for RingBuffer"""
+        if policy not in self.POLICIES:
+            raise PyBerryIMUError("Invalid ring buffer policy: {0}".format(policy))
+        if capacity < 2:
+            raise PyBerryIMUError("The ring buffer capacity must be at least 2.")
+        self.capacity = capacity
+        self.policy = policy
+        # The storage and the count of written samples can be provided, e.g. in shared memory.
+        self._data = data if data is not None else np.zeros((2 * capacity, width), dtype)
+        self._written = written if written is not None else np.zeros((1, ), 'int64')
+        self._drained = np.zeros((1, ), 'int64')
+        self._lost = 0
+        self._condition = threading.Condition()
+        # Incremented by wake(), to end the waits in progress.
+        self._wakeups = 0
+
+    def __len__(self):
+        """The number of samples available, at most ``capacity - 1``."""
+        return int(min(self._written[0], self._readable_capacity()))
+
+    @property
+    def nbr_written(self):
+        """The total number of samples written, i.e. the sequence number of the next sample."""
+        return int(self._written[0])
+
+    @property
+    def nbr_drained(self):
+        """The sequence number of the sample following the latest drained one."""
+        return int(self._drained[0])
+
+    @property
+    def nbr_unread(self):
+        """The number of samples written but not yet drained, at most ``capacity - 1``."""
+        return int(min(self._written[0] - self._drained[0], self._readable_capacity()))
+
+    @property
+    def lost_samples(self):
+        """The number of samples overwritten before being drained."""
+        return self._lost
+
+    def is_overwritten(self, sequence):
+        """Check if a sample has been, or is being, overwritten by the writer.
+
+        After processing a view returned by :py:meth:`drain`, a reader can check
+        that its first sample, ``nbr_drained - len(view)``, was still intact.
+
+        :param sequence: The sequence number of the sample.
+        :type sequence: int
+        :return: If the sample is no longer intact in the buffer.
+        :rtype: bool
+
+        """
+        return self._written[0] - sequence >= self.capacity
+
+    def _readable_capacity(self):
+        # The number of samples that can be read without racing the writer.
+        return self.capacity - 1
+
+    def _is_full(self):
+        return self._written[0] - self._drained[0] >= self._readable_capacity()
+
+    def _wait_while(self, predicate, timeout):
+        """Wait until the predicate is false. Call with the condition acquired.
+
+        :return: ``False`` if the timeout expired or :py:meth:`wake` was called first.
+        :rtype: bool
+
+        """
+        wakeups = self._wakeups
+        deadline = None if timeout is None else time.time() + timeout
+        while predicate():
+            remaining = None if deadline is None else deadline - time.time()
+            if self._wakeups != wakeups or (remaining is not None and remaining <= 0):
+                return False
+            self._condition.wait(remaining)
+        return True
+
+    def wake(self):
+        """Wake up all writers and readers waiting on this buffer; their waits fail as if timed out."""
+        with self._condition:
+            self._wakeups += 1
+            self._condition.notify_all()
+
+    def next_slot(self, timeout=None):
+        """Get the row to write the next sample into.
+
+        With the ``'block'`` policy, this waits until there is room in the buffer.
+        The sample is published by calling :py:meth:`commit`.
+
+        :param timeout: Maximum time to wait for room, in seconds.
+        :type timeout: float
+        :return: A view of the row for the next sample, or ``None`` if there
+            was no room before the timeout or a call to :py:meth:`wake`.
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        if self.policy == 'block':
+            with self._condition:
+                if not self._wait_while(self._is_full, timeout):
+                    return None
+        return self._data[self._written[0] % self.capacity]
+
+    def commit(self):
+        """Publish the sample written to the row returned by :py:meth:`next_slot`."""
+        i = self._written[0] % self.capacity
+        self._data[i + self.capacity] = self._data[i]
+        with self._condition:
+            self._written[0] += 1
+            self._condition.notify_all()
+
+    def write(self, sample):
+        """Copy one sample into the buffer.
+
+        :param sample: The sample values.
+        :type sample: :py:class:`numpy.ndarray`
+
+        """
+        self.next_slot()[:] = sample
+        self.commit()
+
+    def _view(self, end, n):
+        # Slice of the mirrored array holding the n samples before sample number end.
+        stop = end % self.capacity + self.capacity
+        return self._data[stop - n:stop]
+
+    def latest(self, n=None):
+        """Get the latest samples, without marking them as drained.
+
+        :param n: Number of samples, at most ``capacity - 1``. All available if ``None``.
+        :type n: int
+        :return: View of shape (n, width) with the oldest sample first.
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        end = self._written[0]
+        capacity = self._readable_capacity()
+        n = int(min(end, capacity) if n is None else min(n, end, capacity))
+        return self._view(end, n)
+
+    def drain(self, max_samples=None):
+        """Get the samples written since the previous drain and mark them as drained.
+
+        If more than ``capacity - 1`` samples have been written since the previous
+        drain, only the latest ``capacity - 1`` are returned and the others are
+        counted in :py:attr:`lost_samples`.
+
+        :param max_samples: Maximum number of samples to drain.
+        :type max_samples: int
+        :return: View of shape (n, width) with the oldest sample first.
+        :rtype: :py:class:`numpy.ndarray`
+
+        """
+        end = self._written[0]
+        start = self._drained[0]
+        capacity = self._readable_capacity()
+        if end - start > capacity:
+            self._lost += int(end - start - capacity)
+            start = end - capacity
+        if max_samples is not None:
+            end = min(end, start + max_samples)
+        out = self._view(end, int(end - start))
+        with self._condition:
+            self._drained[0] = end
+            self._condition.notify_all()
+        return out
+
+    def wait(self, n=1, timeout=None):
+        """Wait until at least n undrained samples are available.
+
+        :param n: Number of samples to wait for.
+        :type n: int
+        :param timeout: Maximum time to wait, in seconds.
+        :type timeout: float
+        :return: If the samples are available, ``False`` after the timeout or
+            a call to :py:meth:`wake`.
+        :rtype: bool
+
+        """
+        with self._condition:
+            return self._wait_while(lambda: self._written[0] - self._drained[0] < n, timeout)
+
+
+class BerryIMUStreamer(object):
+    """Samples the BerryIMU in a background thread into a ring buffer.
+
+    The acquisition thread owns the client while the streamer is running and
+    reads all three IMU sensors at a fixed rate, each sample being one
+    :py:meth:`~pyberryimu.client.BerryIMUClient.read_imu` row of timestamp,
+    accelerometer, gyroscope and magnetometer values. Consumers get the
+    samples from the :py:attr:`buffer` at their own pace.
+
+    .. code:: python
+
+        with BerryIMUStreamer(client, frequency=100) as streamer:
+            while True:
+                streamer.buffer.wait(10)
+                process(streamer.drain())
+
+    :param client: The client to sample with. It must not be used by other
+        threads while the streamer is running.
+    :type client: :py:class:`pyberryimu.client.BerryIMUClient`
+    :param frequency: Sampling frequency in Hz. Defaults to the accelerometer
+        data rate, and must be given if the accelerometer is powered down.
+    :type frequency: float
+    :param capacity: Number of slots of the ring buffer, holding up to ``capacity - 1`` samples.
+    :type capacity: int
+    :param policy: Ring buffer policy, ``'overwrite'`` or ``'block'``.
+    :type policy: str
+    :param calibrated: Store calibrated values instead of raw values.
+    :type calibrated: bool
+    :param buffer: Ring buffer with width 10 to write to, instead of creating one.
+        The ``capacity`` and ``policy`` arguments are then ignored.
+    :type buffer: :py:class:`RingBuffer`
+
+    """
+
+    def __init__(self, client, frequency=None, capacity=1024, policy='overwrite', calibrated=True, buffer=None):
+        """Constructor for BerryIMUStreamer"""
+        self.client = client
+        if frequency is None:
+            frequency = client.configuration['accelerometer'].get('data_rate')
+            if not frequency:
+                raise PyBerryIMUError("The accelerometer is powered down; a frequency must be given.")
+        self.frequency = frequency
+        self.calibrated = calibrated
+        self.buffer = buffer if buffer is not None else RingBuffer(capacity, 10, 'float', policy)
+
+        self.error = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the acquisition thread."""
+        if self.is_running:
+            raise PyBerryIMUError("Streamer is already running.")
+        self.error = None
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='BerryIMUStreamer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the acquisition thread and wait for it to finish.
+
+        An exception raised in the acquisition thread is raised here.
+
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            # Release a writer waiting for room in a full buffer.
+            self.buffer.wake()
+            self._thread.join()
+            self._thread = None
+        if self.error is not None:
+            raise PyBerryIMUError("Acquisition failed: {0}".format(self.error))
+
+    def run(self, stop_event=None):
+        """Sample into the buffer in the calling thread, until stopped.
+
+        This is what the acquisition thread started by :py:meth:`start` runs;
+        it can be used to acquire in another thread or process that is
+        managed elsewhere. Exceptions are raised.
+
+        :param stop_event: Event to stop on, used instead of the one set by :py:meth:`stop`.
+        :type stop_event: :py:class:`threading.Event`
+
+        """
+        stop_event = stop_event or self._stop_event
+        read = self.client.read_imu if self.calibrated else self.client.read_imu_raw
+        period = 1 / self.frequency
+        start_t = time.time()
+        n = 0
+        while not stop_event.is_set():
+            n += 1
+            delay = start_t + n * period - time.time()
+            if delay > 0:
+                if stop_event.wait(delay):
+                    break
+            elif delay < -period:
+                # Fallen behind by more than one period: restart the schedule.
+                start_t, n = time.time(), 0
+            slot = self._next_slot(stop_event)
+            if slot is None:
+                break
+            read(out=slot)
+            self.buffer.commit()
+
+    def _run(self):
+        try:
+            self.run()
+        except Exception as e:
+            self.error = e
+
+    def _next_slot(self, stop_event):
+        # Wait for room in a full buffer, unless stopped.
+        while not stop_event.is_set():
+            slot = self.buffer.next_slot(timeout=0.1)
+            if slot is not None:
+                return slot
+        return None
+
+    def latest(self, n=None):
+        """Get the latest samples as a view of the ring buffer. See :py:meth:`RingBuffer.latest`."""
+        return self.buffer.latest(n)
+
+    def drain(self, max_samples=None):
+        """Get the samples not yet drained as a view of the ring buffer. See :py:meth:`RingBuffer.drain`."""
+        return self.buffer.drain(max_samples)
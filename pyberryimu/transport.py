@@ -0,0 +1,483 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`transport`
+==================
+
+.. module:: transport
+   :platform: Unix
+   :synopsis: I2C transports used by the BerryIMUClient.
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import os
+import time
+import bisect
+import ctypes
+import functools
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.sensors import LSM9DS0
+
+
+class I2CTransport(object):
+    """Base class for the I2C transports of the BerryIMUClient.
+
+    The register access methods mirror those of :py:class:`smbus.SMBus`.
+
+    """
+
+    @property
+    def bus(self):
+        """The underlying bus object."""
+        return self
+
+    def close(self):
+        pass
+
+    def read_byte_data(self, address, register):
+        raise NotImplementedError()
+
+    def write_byte_data(self, address, register, value):
+        raise NotImplementedError()
+
+    def read_i2c_block_data(self, address, register, length):
+        raise NotImplementedError()
+
+    def write_i2c_block_data(self, address, register, values):
+        raise NotImplementedError()
+
+    def read_i2c_block_data_batch(self, requests):
+        """Read several register blocks, possibly from different devices.
+
+        Transports able to combine the reads into fewer bus transactions
+        override this method.
+
+        :param requests: Sequence of ``(address, register, length)`` tuples.
+        :type requests: list
+        :return: One list of bytes for each request.
+        :rtype: list
+
+        """
+        return [self.read_i2c_block_data(address, register, length)
+                for address, register, length in requests]
+
+
+def _import_smbus():
+    try:
+        from smbus import SMBus
+    except ImportError:
+        raise PyBerryIMUError("The smbus transport requires smbus-cffi to be installed.")
+    return SMBus
+
+
+class SMBusTransport(I2CTransport):
+    """Transport using an :py:class:`smbus.SMBus` object from smbus-cffi.
+
+    :param bus_no: The I2C bus number.
+    :type bus_no: int
+    :param smbus_class: The SMBus class to use. Imported from smbus if not given.
+    :type smbus_class: type
+
+    """
+
+    def __init__(self, bus_no, smbus_class=None):
+        """Constructor for SMBusTransport"""
+        if smbus_class is None:
+            smbus_class = _import_smbus()
+        self._bus = smbus_class(bus_no)
+
+    @property
+    def bus(self):
+        return self._bus
+
+    def close(self):
+        self._bus.close()
+
+    def read_byte_data(self, address, register):
+        return self._bus.read_byte_data(address, register)
+
+    def write_byte_data(self, address, register, value):
+        return self._bus.write_byte_data(address, register, value)
+
+    def read_i2c_block_data(self, address, register, length):
+        return self._bus.read_i2c_block_data(address, register, length)
+
+    def write_i2c_block_data(self, address, register, values):
+        return self._bus.write_i2c_block_data(address, register, values)
+
+
+class _I2CMsg(ctypes.Structure):
+    """The ``struct i2c_msg`` of ``linux/i2c.h``."""
+    _fields_ = [
+        (str('addr'), ctypes.c_uint16),
+        (str('flags'), ctypes.c_uint16),
+        (str('len'), ctypes.c_uint16),
+        (str('buf'), ctypes.POINTER(ctypes.c_uint8)),
+    ]
+
+
+class _I2CRdwrIoctlData(ctypes.Structure):
+    """The ``struct i2c_rdwr_ioctl_data`` of ``linux/i2c-dev.h``."""
+    _fields_ = [
+        (str('msgs'), ctypes.POINTER(_I2CMsg)),
+        (str('nmsgs'), ctypes.c_uint32),
+    ]
+
+
+class I2CDevTransport(I2CTransport):
+    """Transport using the I2C_RDWR ioctl on ``/dev/i2c-N`` directly.
+
+    Every register access is a combined write-register and read/write message
+    transfer in one ioctl call, and batched block reads from several devices
+    are sent as one ioctl call as well.
+
+    :param bus_no: The I2C bus number.
+    :type bus_no: int
+
+    """
+
+    I2C_RDWR = 0x0707
+    I2C_M_RD = 0x0001
+    # Maximum number of messages the kernel accepts in one I2C_RDWR call.
+    I2C_RDWR_IOCTL_MAX_MSGS = 42
+
+    def __init__(self, bus_no):
+        """Constructor for I2CDevTransport"""
+        import fcntl
+        self._ioctl = fcntl.ioctl
+        self._fd = os.open('/dev/i2c-{0}'.format(bus_no), os.O_RDWR)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _transfer(self, messages):
+        """Perform one I2C_RDWR ioctl call.
+
+        :param messages: Sequence of ``(address, flags, buffer)`` tuples,
+            where buffer is a ctypes ``c_uint8`` array.
+        :type messages: list
+
+        """
+        msgs = (_I2CMsg * len(messages))()
+        for msg, (address, flags, buf) in zip(msgs, messages):
+            msg.addr = address
+            msg.flags = flags
+            msg.len = len(buf)
+            msg.buf = ctypes.cast(buf, ctypes.POINTER(ctypes.c_uint8))
+        self._ioctl(self._fd, self.I2C_RDWR, _I2CRdwrIoctlData(msgs=msgs, nmsgs=len(messages)))
+
+    def read_byte_data(self, address, register):
+        return self.read_i2c_block_data(address, register, 1)[0]
+
+    def write_byte_data(self, address, register, value):
+        self.write_i2c_block_data(address, register, [value])
+
+    def read_i2c_block_data(self, address, register, length):
+        return self.read_i2c_block_data_batch([(address, register, length)])[0]
+
+    def write_i2c_block_data(self, address, register, values):
+        values = [register] + list(values)
+        self._transfer([(address, 0, (ctypes.c_uint8 * len(values))(*values))])
+
+    def read_i2c_block_data_batch(self, requests):
+        out = []
+        max_requests = self.I2C_RDWR_IOCTL_MAX_MSGS // 2
+        for n in range(0, len(requests), max_requests):
+            messages = []
+            read_buffers = []
+            for address, register, length in requests[n:n + max_requests]:
+                read_buffers.append((ctypes.c_uint8 * length)())
+                messages.append((address, 0, (ctypes.c_uint8 * 1)(register)))
+                messages.append((address, self.I2C_M_RD, read_buffers[-1]))
+            self._transfer(messages)
+            out.extend([list(buf) for buf in read_buffers])
+        return out
+
+
+class MemoryTransport(I2CTransport):
+    """Transport backed by an in-memory register map, for testing without hardware.
+
+    Written values are stored and returned by subsequent reads; registers never
+    written read as zero. Block reads from the LSM9DS0 addresses only increment
+    the register address if the auto-increment bit is set, like the real device.
+
+    :param registers: Initial register map, as a dict of address to dicts of
+        register to byte value.
+    :type registers: dict
+
+    """
+
+    def __init__(self, registers=None):
+        """Constructor for MemoryTransport"""
+        self.registers = registers if registers is not None else {}
+
+    def read_byte_data(self, address, register):
+        return self.registers.get(address, {}).get(register, 0)
+
+    def write_byte_data(self, address, register, value):
+        self.registers.setdefault(address, {})[register] = value & 0xFF
+
+    def read_i2c_block_data(self, address, register, length):
+        step = 1
+        if address in (LSM9DS0.ACC_ADDRESS, LSM9DS0.GYR_ADDRESS):
+            step = 1 if register & LSM9DS0.AUTO_INCREMENT else 0
+            register &= ~LSM9DS0.AUTO_INCREMENT
+        return [self.read_byte_data(address, register + i * step) for i in range(length)]
+
+    def write_i2c_block_data(self, address, register, values):
+        step = 1
+        if address in (LSM9DS0.ACC_ADDRESS, LSM9DS0.GYR_ADDRESS):
+            step = 1 if register & LSM9DS0.AUTO_INCREMENT else 0
+            register &= ~LSM9DS0.AUTO_INCREMENT
+        for i, value in enumerate(values):
+            self.write_byte_data(address, register + i * step, value)
+
+
+# Clock for latency measurements, falling back to the system clock on Python 2.
+_perf_counter = getattr(time, 'perf_counter', time.time)
+
+
+class InstrumentedTransport(I2CTransport):
+    """Transport wrapper recording statistics of the transactions of another transport.
+
+    For every register accessed, the number of transactions, bytes
+    transferred, errors and a histogram of the transaction latencies are
+    recorded. A batch of reads is one transaction, which is counted and
+    timed in the total only; the registers of the batch record the number
+    of batches that read them and the bytes read.
+
+    :param transport: The transport to instrument.
+    :type transport: :py:class:`I2CTransport`
+
+    """
+
+    # Upper edges of the latency histogram bins, in seconds.
+    LATENCY_BINS = (50e-6, 100e-6, 200e-6, 500e-6, 1e-3, 2e-3, 5e-3, 10e-3, float('inf'))
+
+    def __init__(self, transport):
+        """Constructor for InstrumentedTransport"""
+        self.transport = transport
+        self._registers = {}
+        self._batches = self._empty_entry()
+
+    @property
+    def bus(self):
+        return self.transport.bus
+
+    def close(self):
+        self.transport.close()
+
+    def reset(self):
+        """Discard all recorded statistics."""
+        self._registers = {}
+        self._batches = self._empty_entry()
+
+    def _empty_entry(self):
+        return {'transactions': 0, 'batches': 0, 'bytes': 0, 'errors': 0, 'latency': 0.0,
+                'latency_histogram': [0] * len(self.LATENCY_BINS)}
+
+    def _register_entry(self, address, register):
+        if address in (LSM9DS0.ACC_ADDRESS, LSM9DS0.GYR_ADDRESS):
+            register &= ~LSM9DS0.AUTO_INCREMENT
+        entry = self._registers.get((address, register))
+        if entry is None:
+            entry = self._registers[(address, register)] = self._empty_entry()
+        return entry
+
+    def _record(self, entry, nbr_bytes, latency, error):
+        entry['transactions'] += 1
+        if error:
+            entry['errors'] += 1
+        else:
+            entry['bytes'] += nbr_bytes
+        entry['latency'] += latency
+        entry['latency_histogram'][bisect.bisect_left(self.LATENCY_BINS, latency)] += 1
+
+    def _timed(self, address, register, nbr_bytes, method, *args):
+        """Call a method of the transport accessing one register, recording the transaction."""
+        entry = self._register_entry(address, register)
+        t = _perf_counter()
+        try:
+            result = method(*args)
+        except Exception:
+            self._record(entry, nbr_bytes, _perf_counter() - t, True)
+            raise
+        self._record(entry, nbr_bytes, _perf_counter() - t, False)
+        return result
+
+    def read_byte_data(self, address, register):
+        return self._timed(address, register, 1, self.transport.read_byte_data, address, register)
+
+    def write_byte_data(self, address, register, value):
+        return self._timed(address, register, 1, self.transport.write_byte_data, address, register, value)
+
+    def read_i2c_block_data(self, address, register, length):
+        return self._timed(address, register, length, self.transport.read_i2c_block_data,
+                           address, register, length)
+
+    def write_i2c_block_data(self, address, register, values):
+        return self._timed(address, register, len(values), self.transport.write_i2c_block_data,
+                           address, register, values)
+
+    def read_i2c_block_data_batch(self, requests):
+        t = _perf_counter()
+        try:
+            result = self.transport.read_i2c_block_data_batch(requests)
+        except Exception:
+            self._record(self._batches, 0, _perf_counter() - t, True)
+            raise
+        self._record(self._batches, sum(length for _, _, length in requests), _perf_counter() - t, False)
+        for address, register, length in requests:
+            entry = self._register_entry(address, register)
+            entry['batches'] += 1
+            entry['bytes'] += length
+        return result
+
+    def stats(self):
+        """Get the statistics recorded since creation or the latest :py:meth:`reset`.
+
+        Each entry holds the number of ``'transactions'``, the number of
+        ``'batches'``, the number of ``'bytes'`` transferred, the number of
+        ``'errors'``, the summed ``'latency'`` in seconds and the
+        ``'latency_histogram'``, the number of transactions in each bin of
+        :py:attr:`LATENCY_BINS`.
+
+        In the total, batch reads are included in the transactions, errors
+        and latencies, and ``'batches'`` is the number of them. For devices
+        and registers, these only count transactions accessing a single
+        register; ``'batches'`` is the number of reads in batches, and
+        ``'bytes'`` includes the bytes of those.
+
+        :return: Dictionary with the entry ``'total'`` for all transactions,
+            ``'devices'`` with one entry for each I2C address and
+            ``'registers'`` with one entry for each ``(address, register)``.
+        :rtype: dict
+
+        """
+        def _add(total, entry, keys=('transactions', 'batches', 'bytes', 'errors', 'latency')):
+            for key in keys:
+                total[key] += entry[key]
+            total['latency_histogram'] = [a + b for a, b in zip(total['latency_histogram'],
+                                                                entry['latency_histogram'])]
+
+        total = self._empty_entry()
+        devices = {}
+        registers = {}
+        for (address, register), entry in self._registers.items():
+            registers[(address, register)] = dict(entry, latency_histogram=list(entry['latency_histogram']))
+            _add(total, entry, ('transactions', 'bytes', 'errors', 'latency'))
+            _add(devices.setdefault(address, self._empty_entry()), entry)
+        # The bytes of batches are already counted in their registers.
+        _add(total, self._batches, ('transactions', 'errors', 'latency'))
+        total['batches'] = self._batches['transactions']
+        return {
+            'total': total,
+            'devices': devices,
+            'registers': registers,
+        }
+
+
+class RetryingTransport(I2CTransport):
+    """Transport wrapper retrying transactions of another transport that fail with I/O errors.
+
+    A failed transaction is retried after a delay, which starts at ``backoff``
+    and is doubled for every retry, up to ``max_backoff``. If the last retry
+    fails as well, its error is raised.
+
+    :param transport: The transport to retry transactions of.
+    :type transport: :py:class:`I2CTransport`
+    :param retries: Maximum number of retries of each transaction.
+    :type retries: int
+    :param backoff: Delay before the first retry, in seconds.
+    :type backoff: float
+    :param max_backoff: Maximum delay between retries, in seconds.
+    :type max_backoff: float
+
+    """
+
+    def __init__(self, transport, retries=3, backoff=0.001, max_backoff=0.05):
+        """Constructor for RetryingTransport"""
+        self.transport = transport
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # Number of transactions retried, and number given up after all retries.
+        self.nbr_retries = 0
+        self.nbr_failures = 0
+
+    @property
+    def bus(self):
+        return self.transport.bus
+
+    def close(self):
+        self.transport.close()
+
+    def _retry(self, method, *args):
+        delay = self.backoff
+        for _ in range(self.retries):
+            try:
+                return method(*args)
+            except (IOError, OSError):
+                self.nbr_retries += 1
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+        try:
+            return method(*args)
+        except (IOError, OSError):
+            self.nbr_failures += 1
+            raise
+
+    def read_byte_data(self, address, register):
+        return self._retry(self.transport.read_byte_data, address, register)
+
+    def write_byte_data(self, address, register, value):
+        return self._retry(self.transport.write_byte_data, address, register, value)
+
+    def read_i2c_block_data(self, address, register, length):
+        return self._retry(self.transport.read_i2c_block_data, address, register, length)
+
+    def write_i2c_block_data(self, address, register, values):
+        return self._retry(self.transport.write_i2c_block_data, address, register, values)
+
+    def read_i2c_block_data_batch(self, requests):
+        return self._retry(self.transport.read_i2c_block_data_batch, requests)
+
+
+# Transports that can be selected by name.
+TRANSPORTS = {
+    'smbus': SMBusTransport,
+    'i2c-dev': I2CDevTransport,
+}
+
+
+def get_transport_factory(transport):
+    """Get a callable creating a transport from a bus number.
+
+    :param transport: Name of a transport in :py:data:`TRANSPORTS`, ``None``
+        for the default smbus transport, or an already created transport.
+    :type transport: str or :py:class:`I2CTransport`
+    :return: Callable taking a bus number and returning a transport.
+    :rtype: callable
+
+    """
+    if isinstance(transport, I2CTransport):
+        return lambda bus_no: transport
+    elif transport is None or transport == 'smbus':
+        # Resolve the SMBus class here, so that it is available when the transport is opened.
+        return functools.partial(SMBusTransport, smbus_class=_import_smbus())
+    elif transport in TRANSPORTS:
+        return TRANSPORTS.get(transport)
+    else:
+        raise PyBerryIMUError("Unknown transport: {0}".format(transport))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`test_ellipsoid`
+==================
+
+.. module:: test_ellipsoid
+   :platform: Unix, Windows
+   :synopsis:
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import numpy as np
+from nose.tools import raises
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.calibration.ellipsoid import EllipsoidFit
+
+
+def create_ellipsoid_points(n=2000, seed=0):
+    """Points on a sphere of radius 0.5, deformed by a symmetric matrix and offset."""
+    rng = np.random.RandomState(seed)
+    directions = rng.randn(n, 3)
+    directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+    deformation = np.array([[1.2, 0.1, -0.05], [0.1, 0.9, 0.08], [-0.05, 0.08, 1.05]])
+    center = np.array([0.2, -0.15, 0.3])
+    return directions, 0.5 * directions.dot(deformation) + center, deformation, center
+
+
+class TestEllipsoidFit(object):
+
+    def __init__(self):
+        self.directions, self.points, self.deformation, self.center = create_ellipsoid_points()
+
+    def test_fit(self):
+        fit = EllipsoidFit()
+        fit.add_points(self.points)
+        center, A = fit.solve()
+        np.testing.assert_allclose(center, self.center, atol=1e-9)
+        residuals = np.einsum('ij,jk,ik->i', self.points - center, A, self.points - center)
+        np.testing.assert_allclose(residuals, 1.0, atol=1e-9)
+
+    def test_correction_maps_points_onto_sphere(self):
+        fit = EllipsoidFit()
+        fit.add_points(self.points)
+        center, W = fit.get_correction()
+        corrected = (self.points - center).dot(W.T)
+        radius = 0.5 * np.linalg.det(self.deformation) ** (1 / 3)
+        np.testing.assert_allclose(np.linalg.norm(corrected, axis=1), radius, rtol=1e-9)
+        # The symmetric correction undoes the symmetric deformation without rotating.
+        np.testing.assert_allclose(corrected / radius, self.directions, atol=1e-9)
+
+    def test_incremental_fit_equals_fit_of_all_points(self):
+        fit, incremental_fit = EllipsoidFit(), EllipsoidFit()
+        fit.add_points(self.points)
+        for chunk in np.array_split(self.points, 7):
+            incremental_fit.add_points(chunk)
+        incremental_fit.add_points([[np.nan, 0.0, 0.0]])
+        assert incremental_fit.nbr_points == fit.nbr_points == len(self.points)
+        for a, b in zip(fit.solve(), incremental_fit.solve()):
+            np.testing.assert_allclose(a, b, rtol=1e-9)
+
+    @raises(PyBerryIMUError)
+    def test_too_few_points(self):
+        fit = EllipsoidFit()
+        fit.add_points(self.points[:8])
+        fit.solve()
+
+    @raises(PyBerryIMUError)
+    def test_points_in_a_plane(self):
+        fit = EllipsoidFit()
+        points = self.points.copy()
+        points[:, 2] = 0.0
+        fit.add_points(points)
+        fit.solve()
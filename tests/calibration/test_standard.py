@@ -19,10 +19,20 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
+import os
+import shutil
+import datetime
+import tempfile
+
 import numpy as np
 import numpy.testing as nptest
+from nose.tools import raises
 
+from .test_ellipsoid import create_ellipsoid_points
 from ..test_client import create_device
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.container import IMUDataContainer
+from pyberryimu.calibration.base import BerryIMUCalibration
 from pyberryimu.calibration.standard import StandardCalibration
 
 
@@ -77,6 +87,111 @@ class TestAccelerationStandardCalibration(object):
         sc.set_datasheet_values_for_accelerometer(client.get_settings())
         assert np.linalg.norm(sc.acc_scale_factor_matrix - np.eye(3)) > 0.0
 
+    def test_rescale_full_scale(self):
+        """Test that values at a new full scale transform to the same acceleration."""
+        sc = StandardCalibration(verbose=False)
+        sc.calibrate_accelerometer_with_stored_points(self.test_points_1)
+        values_at_8g = sc.transform_accelerometer_values(self.test_points_1[0, :])
+        sc.rescale_full_scale('accelerometer', 8, 2)
+        np.testing.assert_allclose(sc.transform_accelerometer_values(self.test_points_1[0, :] * (0.244 / 0.061)),
+                                   values_at_8g, rtol=1e-9)
+
+    def test_calibration_with_many_points(self):
+        """Test that the parameters of a simulated accelerometer are found from thousands of points."""
+        rng = np.random.RandomState(1)
+        M = np.array([[16.2, 0.1, -0.05], [0.1, 15.9, 0.08], [-0.05, 0.08, 16.1]])
+        b = np.array([0.495, 0.502, 0.499])
+        g = np.vstack([np.repeat(np.eye(3), 2, axis=0) * np.tile([-1, 1], 3)[:, np.newaxis],
+                       rng.randn(3000, 3)])
+        g /= np.linalg.norm(g, axis=1)[:, np.newaxis]
+        # Invert A = M(V - B) and V = (a_raw + 2 ** 15) / (2 ** 16 - 1).
+        raw = (np.linalg.solve(M, g.T).T + b) * (2 ** 16 - 1) - 2 ** 15
+        sc = StandardCalibration(verbose=False)
+        sc.calibrate_accelerometer_with_stored_points(raw + rng.randn(*raw.shape) * 0.5)
+        np.testing.assert_allclose(sc.acc_scale_factor_matrix, M, atol=2e-3)
+        np.testing.assert_allclose(sc.acc_bias_vector, b, atol=2e-5)
+
+
+class TestBatchTransforms(object):
+
+    def __init__(self):
+        self.sc = StandardCalibration()
+        settings = {'accelerometer': {'full_scale': 8}, 'gyroscope': {'full_scale': 500},
+                    'magnetometer': {'full_scale': 12}}
+        self.sc.set_datasheet_values_for_accelerometer(settings)
+        self.sc.set_datasheet_values_for_gyroscope(settings)
+        self.sc.set_datasheet_values_for_magnetometer(settings)
+        acc_scale_factor_matrix = self.sc.acc_scale_factor_matrix.copy()
+        acc_scale_factor_matrix[0, 1] = acc_scale_factor_matrix[1, 0] = 1e-5
+        self.sc.acc_scale_factor_matrix = acc_scale_factor_matrix
+        self.sc.acc_bias_vector = np.array([0.49, 0.51, 0.5])
+        self.sc.gyro_bias_vector = np.array([0.1, -0.2, 0.3])
+        self.values = np.random.RandomState(0).randint(-32768, 32768, (50, 3)).astype('int16')
+
+    def _test_batch_matches_single_samples(self, sensor):
+        batch = getattr(self.sc, 'transform_{0}_batch'.format(sensor))
+        single = getattr(self.sc, 'transform_{0}_values'.format(sensor))
+        expected = np.array([single(v) for v in self.values.astype('float')])
+        np.testing.assert_allclose(batch(self.values), expected, rtol=1e-12)
+        out = self.values.astype('float')
+        assert batch(out, out=out) is out
+        np.testing.assert_allclose(out, expected, rtol=1e-12)
+
+    def test_batch_matches_single_samples(self):
+        for sensor in ('accelerometer', 'gyroscope', 'magnetometer'):
+            yield self._test_batch_matches_single_samples, sensor
+
+    def test_single_sample_matches_calibration_formula(self):
+        for v in self.values[:10].astype('float'):
+            expected = self.sc.acc_scale_factor_matrix.dot(self.sc.acc_to_ratio(v) - self.sc.acc_bias_vector)
+            np.testing.assert_allclose(self.sc.transform_accelerometer_values(v), expected, rtol=1e-12)
+            expected = self.sc.gyro_scale_factor_vector * v + self.sc.gyro_bias_vector
+            np.testing.assert_allclose(self.sc.transform_gyroscope_values(v), expected, rtol=1e-12)
+
+    def test_maps_are_recompiled_when_parameters_are_set(self):
+        v = self.values[0]
+        acc_before = self.sc.transform_accelerometer_values(v)
+        gyro_before = self.sc.transform_gyroscope_values(v)
+        self.sc.acc_bias_vector = self.sc.acc_bias_vector + 0.01
+        self.sc.gyro_scale_factor_vector = self.sc.gyro_scale_factor_vector * 2
+        assert not np.allclose(self.sc.transform_accelerometer_values(v), acc_before)
+        np.testing.assert_allclose(self.sc.transform_gyroscope_values(v),
+                                   2 * (np.array(gyro_before) - self.sc.gyro_bias_vector) + self.sc.gyro_bias_vector)
+        np.testing.assert_allclose(self.sc.transform_accelerometer_batch(self.values[:1])[0],
+                                   self.sc.transform_accelerometer_values(v))
+
+    @raises(ValueError)
+    def test_parameters_are_read_only(self):
+        self.sc.mag_bias_vector[0] = 1.0
+
+    def test_lookup_tables(self):
+        values = np.concatenate([self.values, [[-32768, 32767, 0]]]).astype('int16')
+        imu_values = np.tile(values, 3)
+        expected = self.sc.transform_imu_values(imu_values)
+        self.sc.use_lut = True
+        assert self.sc.build_lookup_tables() == 2 * 3 * (2 ** 16) * 4
+        np.testing.assert_allclose(self.sc.transform_imu_values(imu_values), expected, rtol=1e-6)
+        # Changed parameters are used in the lookup tables.
+        self.sc.mag_bias_vector = np.array([1.0, 2.0, 3.0])
+        assert self.sc.lookup_tables_nbytes == 0
+        np.testing.assert_allclose(self.sc.transform_magnetometer_batch(values),
+                                   expected[:, 6:9] + [1.0, 2.0, 3.0], rtol=1e-6)
+        assert self.sc.lookup_tables_nbytes == 3 * (2 ** 16) * 4
+
+    def test_load_with_lookup_tables(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'calibration')
+            self.sc.save(path)
+            sc = StandardCalibration.load(path, use_lut=True)
+        finally:
+            shutil.rmtree(directory)
+        assert sc.use_lut
+        assert sc.lookup_tables_nbytes == 2 * 3 * (2 ** 16) * 4
+        np.testing.assert_allclose(sc.transform_gyroscope_batch(self.values),
+                                   self.sc.transform_gyroscope_batch(self.values), rtol=1e-6)
+
+
 class TestGyroscopeStandardCalibration(object):
     """Nose Test Suite for Standard Calibration of Accelerometer."""
 
@@ -186,3 +301,75 @@ class TestGyroscopeStandardCalibration(object):
                 ref[index] = sc.RECORD_PLAYER_33_3_RPM_IN_DPS * side
                 yield _internal_test_function, self.test_points_2[k, :], 15.0
 
+
+class TestMagnetometerStandardCalibration(object):
+
+    def __init__(self):
+        self.directions, points = create_ellipsoid_points()[:2]
+        # Raw values at full scale 12 gauss.
+        raw = np.round(points / 0.00048).astype('int16')
+        self.container = IMUDataContainer(datetime.datetime.now(), {'magnetometer': {'full_scale': 12}},
+                                          BerryIMUCalibration().to_json())
+        self.container.magnetometer = raw
+
+    def test_calibration_with_container(self):
+        sc = StandardCalibration()
+        sc.calibrate_magnetometer_with_container(self.container, chunk_size=300)
+        np.testing.assert_allclose(sc.mag_bias_vector, [-0.2, 0.15, -0.3], atol=1e-3)
+        calibrated = sc.transform_magnetometer_batch(self.container.magnetometer)
+        norms = np.linalg.norm(calibrated, axis=1)
+        assert np.std(norms) / np.mean(norms) < 2e-3
+        headings = np.arctan2(calibrated[:, 1], calibrated[:, 0])
+        true_headings = np.arctan2(self.directions[:, 1], self.directions[:, 0])
+        horizontal = np.linalg.norm(self.directions[:, :2], axis=1) > 0.5
+        errors = np.angle(np.exp(1j * (headings - true_headings)))[horizontal]
+        assert np.max(np.abs(np.degrees(errors))) < 0.5
+        for raw, values in zip(self.container.magnetometer[:5], calibrated):
+            np.testing.assert_allclose(sc.transform_magnetometer_values(raw), values, rtol=1e-12)
+
+    def test_correction_matrix_is_saved(self):
+        sc = StandardCalibration(use_lut=True)
+        settings = {'accelerometer': {'full_scale': 8}, 'gyroscope': {'full_scale': 500}}
+        sc.set_datasheet_values_for_accelerometer(settings)
+        sc.set_datasheet_values_for_gyroscope(settings)
+        sc.calibrate_magnetometer_with_container(self.container)
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'calibration')
+            sc.save(path)
+            sc2 = StandardCalibration.load(path, use_lut=True)
+        finally:
+            shutil.rmtree(directory)
+        np.testing.assert_allclose(sc2.mag_correction_matrix, sc.mag_correction_matrix)
+        # No lookup table for the magnetometer with a correction matrix.
+        assert sc2.lookup_tables_nbytes == 3 * (2 ** 16) * 4
+        np.testing.assert_allclose(sc2.transform_magnetometer_batch(self.container.magnetometer),
+                                   sc.transform_magnetometer_batch(self.container.magnetometer))
+
+    def test_continue_fit(self):
+        sc = StandardCalibration()
+        sc.calibrate_magnetometer_with_container(self.container)
+        full_fit = sc.magnetometer_fit
+        first_half = IMUDataContainer(datetime.datetime.now(), self.container.client_settings,
+                                      BerryIMUCalibration().to_json())
+        first_half.magnetometer = self.container.magnetometer[:1000]
+        second_half = IMUDataContainer(datetime.datetime.now(), self.container.client_settings,
+                                       BerryIMUCalibration().to_json())
+        second_half.magnetometer = self.container.magnetometer[1000:]
+        sc.calibrate_magnetometer_with_container(first_half)
+        assert sc.magnetometer_fit is not full_fit
+        sc.calibrate_magnetometer_with_container(second_half, continue_fit=True)
+        assert sc.magnetometer_fit.nbr_points == full_fit.nbr_points
+        sc_full = StandardCalibration()
+        sc_full.calibrate_magnetometer_with_container(self.container)
+        np.testing.assert_allclose(sc.mag_bias_vector, sc_full.mag_bias_vector, rtol=1e-9)
+        np.testing.assert_allclose(sc.mag_correction_matrix, sc_full.mag_correction_matrix, rtol=1e-9)
+
+    @raises(PyBerryIMUError)
+    def test_continue_without_fit(self):
+        StandardCalibration().calibrate_magnetometer_with_container(self.container, continue_fit=True)
+
+    @raises(PyBerryIMUError)
+    def test_calibration_with_calibrated_container(self):
+        self.container.calibration_parameters = {'magnetometer': {}}
+        StandardCalibration().calibrate_magnetometer_with_container(self.container)
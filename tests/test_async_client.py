@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`test_async_client`
+==================
+
+.. module:: test_async_client
+   :platform: Unix
+   :synopsis:
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+import asyncio
+
+import numpy as np
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.async_client import AsyncBerryIMUClient
+from pyberryimu.simulator import SimulatedBerryIMU
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestAsyncBerryIMUClient(object):
+
+    def test_read_imu(self):
+        async def read():
+            async with AsyncBerryIMUClient(transport=SimulatedBerryIMU()) as client:
+                await asyncio.sleep(0.01)
+                return await client.read_imu_raw()
+        data = run(read())
+        assert data.shape == (10, )
+        assert data[3] > 4000
+
+    def test_read_pressure(self):
+        async def read():
+            async with AsyncBerryIMUClient(settings={'barometer': {'oversampling': 0}},
+                                           transport=SimulatedBerryIMU()) as client:
+                return await client.read_temperature(), await client.read_pressure()
+        temperature, pressure = run(read())
+        assert temperature == 15.0
+        assert abs(pressure - 699.64) < 1e-6
+
+    def test_pressure_does_not_block_loop(self):
+        """Test that other coroutines keep running while waiting for a pressure conversion."""
+        async def read():
+            async with AsyncBerryIMUClient(transport=SimulatedBerryIMU()) as client:
+                ticks = []
+
+                async def ticker():
+                    while True:
+                        ticks.append(await client.read_accelerometer())
+                        await asyncio.sleep(0.001)
+
+                task = asyncio.ensure_future(ticker())
+                await client.read_pressure()
+                task.cancel()
+                return ticks
+        assert len(run(read())) > 5
+
+    def test_stream(self):
+        async def read():
+            samples = []
+            async with AsyncBerryIMUClient(transport=SimulatedBerryIMU()) as client:
+                async for sample in client.stream(rate=200, n=10):
+                    samples.append(sample)
+            return np.array(samples)
+        samples = run(read())
+        assert samples.shape == (10, 10)
+        # Single intervals jitter with the executor scheduling, but the schedule is kept.
+        assert abs((samples[-1, 0] - samples[0, 0]) - 9 * 0.005) < 0.005
+
+    def test_stream_with_powered_down_accelerometer(self):
+        async def read():
+            async with AsyncBerryIMUClient(settings={'accelerometer': {'data_rate': 0}},
+                                           transport=SimulatedBerryIMU()) as client:
+                async for sample in client.stream(n=1):
+                    pass
+        try:
+            run(read())
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
@@ -19,9 +19,18 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from __future__ import absolute_import
 
+import os
+import time
+import json
+import shutil
+import tempfile
+
+import numpy as np
 from mock import Mock, patch
 
+from pyberryimu.exc import PyBerryIMUError
 from pyberryimu.sensors import BMP180, LSM9DS0
+from pyberryimu.calibration.standard import StandardCalibration
 
 
 # Bundles the SMBus mock object from https://github.com/adafruit/Adafruit_Python_GPIO.
@@ -61,10 +70,19 @@ class MockSMBus(object):
         return (high << 8) | low
 
     def read_i2c_block_data(self, address, register, length):
+        if address in (LSM9DS0.ACC_ADDRESS, LSM9DS0.GYR_ADDRESS):
+            # The LSM9DS0 only increments the register address if the MSB is set.
+            if register & LSM9DS0.AUTO_INCREMENT:
+                register &= ~LSM9DS0.AUTO_INCREMENT
+            else:
+                return [self._read_register(address, register) for i in range(length)]
+            if register in (LSM9DS0.OUT_X_L_A, LSM9DS0.OUT_X_L_G):
+                # Emulate FIFO reads, where the address wraps around after the Z high byte.
+                return [self._read_register(address, register + (i % 6)) for i in range(length)]
         return [self._read_register(address, register + i) for i in range(length)]
 
 
-def create_device(busnum=1, settings=None):
+def create_device(busnum=1, settings=None, **kwargs):
     # Mock the smbus module and inject it into the global namespace so the
     # pyberryimu module can be imported.  Also inject a mock SMBus
     # instance to be returned by smbus.SMBus function calls.
@@ -73,7 +91,7 @@ def create_device(busnum=1, settings=None):
     smbus.SMBus.return_value = mockbus
     with patch.dict('sys.modules', {'smbus': smbus}):
         from pyberryimu.client import BerryIMUClient
-        client = BerryIMUClient(busnum, settings)
+        client = BerryIMUClient(busnum, settings, **kwargs)
         # Write factory calibration data for BMP180 sensor.
         for i, value in enumerate(range(23)):
             mockbus._read.setdefault(BMP180.ADDRESS, {}).setdefault(
@@ -81,6 +99,170 @@ def create_device(busnum=1, settings=None):
         return client, smbus, mockbus
 
 
+def queue_vector(mockbus, address, register_low_bit, values, status=LSM9DS0.STATUS_DATA_READY_BIT):
+    # Queue three signed 16 bit values as little endian bytes in consecutive registers,
+    # preceded by the status register.
+    mockbus._read.setdefault(address, {}).setdefault(register_low_bit - 1, []).append(status)
+    for i, value in enumerate(values):
+        value &= 0xFFFF
+        mockbus._read.setdefault(address, {}).setdefault(register_low_bit + 2 * i, []).append(value & 0xFF)
+        mockbus._read.setdefault(address, {}).setdefault(register_low_bit + 2 * i + 1, []).append(value >> 8)
+
+
+# Example calibration coefficients from the BMP180 data sheet.
+BMP180_DATASHEET_CALIBRATION = {
+    'ac1': 408, 'ac2': -72, 'ac3': -14383, 'ac4': 32741, 'ac5': 32757, 'ac6': 23153,
+    'b1': 6190, 'b2': 4, 'mb': -32768, 'mc': -8711, 'md': 2868}
+
+
+def queue_bmp180_calibration(mockbus, calibration=BMP180_DATASHEET_CALIBRATION):
+    mockbus._read[BMP180.ADDRESS] = {}
+    for i, name in enumerate(BMP180.CALIBRATION_COEFFICIENTS):
+        value = calibration[name] & 0xFFFF
+        mockbus._read[BMP180.ADDRESS].setdefault(BMP180.CALIB_DATA_REG + 2 * i, []).append(value >> 8)
+        mockbus._read[BMP180.ADDRESS].setdefault(BMP180.CALIB_DATA_REG + 2 * i + 1, []).append(value & 0xFF)
+
+
+def queue_bmp180_conversion(mockbus, value, nbr_bytes):
+    for i in range(nbr_bytes):
+        mockbus._read[BMP180.ADDRESS].setdefault(BMP180.READ_REG + i, []).append(
+            (value >> (8 * (nbr_bytes - 1 - i))) & 0xFF)
+
+
+class TestBMP180(object):
+
+    def test_calibration_data_parsing(self):
+        c, smbus, mockbus = create_device(1, None)
+        queue_bmp180_calibration(mockbus)
+        c.open()
+        assert c._bmp180_calibration == BMP180_DATASHEET_CALIBRATION
+
+    def test_datasheet_example(self):
+        """Test compensation calculations against the data sheet example."""
+        b5 = BMP180.compute_b5(27898, BMP180_DATASHEET_CALIBRATION)
+        assert BMP180.compute_temperature(b5) == 15.0
+        assert BMP180.compute_pressure(23843, b5, 0, BMP180_DATASHEET_CALIBRATION) == 699.64
+
+    def test_blocking_reads(self):
+        c, smbus, mockbus = create_device(1, None)
+        queue_bmp180_calibration(mockbus)
+        c.open()
+        queue_bmp180_conversion(mockbus, 27898, 2)
+        assert c.read_temperature() == 15.0
+        queue_bmp180_conversion(mockbus, 27898, 2)
+        queue_bmp180_conversion(mockbus, 23843 << 5, 3)
+        b5 = BMP180.compute_b5(27898, BMP180_DATASHEET_CALIBRATION)
+        assert c.read_pressure() == BMP180.compute_pressure(23843, b5, 3, BMP180_DATASHEET_CALIBRATION)
+        assert mockbus._written[BMP180.ADDRESS][BMP180.WRITE_REG] == [0x2E, 0x2E, 0xF4]
+
+    def test_oversampling_setting(self):
+        """Test that the oversampling setting is used and reported."""
+        c, smbus, mockbus = create_device(1, {'barometer': {'oversampling': 0}})
+        queue_bmp180_calibration(mockbus)
+        c.open()
+        queue_bmp180_conversion(mockbus, 27898, 2)
+        queue_bmp180_conversion(mockbus, 23843 << 8, 3)
+        c.start_bmp180_conversions(continuous=False)
+        time.sleep(BMP180.TEMPERATURE_CONVERSION_TIME)
+        t_before = time.time()
+        assert c.poll_bmp180() == 'temperature'
+        t_after = time.time()
+        time.sleep(BMP180.get_pressure_conversion_time(0))
+        assert c.poll_bmp180() == 'pressure'
+        assert c.latest_pressure[0] == 699.64
+        # The pressure conversion started in the poll is due after the time for oversampling 0.
+        conversion_time = BMP180.get_pressure_conversion_time(0)
+        assert t_before + conversion_time <= c.latest_pressure[1] <= t_after + conversion_time
+        assert mockbus._written[BMP180.ADDRESS][BMP180.WRITE_REG] == [0x2E, 0x34]
+        assert c.get_settings()['barometer']['oversampling'] == 0
+
+    def test_invalid_oversampling_setting(self):
+        try:
+            create_device(1, {'barometer': {'oversampling': 4}})
+        except PyBerryIMUError:
+            pass
+        else:
+            raise AssertionError("Invalid oversampling setting accepted.")
+
+    def test_temperature_refresh_count(self):
+        """Test that the temperature compensation value is reused for several pressure reads."""
+        c, smbus, mockbus = create_device(1, {'barometer': {'temperature_refresh_count': 3}})
+        queue_bmp180_calibration(mockbus)
+        c.open()
+        for k in range(4):
+            if k % 3 == 0:
+                queue_bmp180_conversion(mockbus, 27898, 2)
+            queue_bmp180_conversion(mockbus, 23843 << 5, 3)
+        pressures = [c.read_pressure() for k in range(4)]
+        assert len(set(pressures)) == 1
+        assert mockbus._written[BMP180.ADDRESS][BMP180.WRITE_REG] == [0x2E, 0xF4, 0xF4, 0xF4, 0x2E, 0xF4]
+
+    def test_temperature_refresh_interval(self):
+        """Test that temperature reads are served from the cached value."""
+        c, smbus, mockbus = create_device(1, {'barometer': {'temperature_refresh_count': None,
+                                                            'temperature_refresh_interval': 60.0}})
+        queue_bmp180_calibration(mockbus)
+        c.open()
+        queue_bmp180_conversion(mockbus, 27898, 2)
+        queue_bmp180_conversion(mockbus, 23843 << 5, 3)
+        assert c.read_temperature() == 15.0
+        c.read_pressure()
+        assert c.read_temperature() == 15.0
+        assert mockbus._written[BMP180.ADDRESS][BMP180.WRITE_REG] == [0x2E, 0xF4]
+
+    def test_pipelined_conversions(self):
+        """Test that conversions are started and collected without blocking."""
+        c, smbus, mockbus = create_device(1, None)
+        queue_bmp180_calibration(mockbus)
+        c.open()
+        queue_bmp180_conversion(mockbus, 27898, 2)
+        queue_bmp180_conversion(mockbus, 23843 << 5, 3)
+        c.start_bmp180_conversions(continuous=False)
+        assert c.poll_bmp180() is None
+        assert c.latest_temperature == (None, None)
+        time.sleep(BMP180.TEMPERATURE_CONVERSION_TIME)
+        assert c.poll_bmp180() == 'temperature'
+        assert c.latest_temperature[0] == 15.0
+        assert c.poll_bmp180() is None
+        time.sleep(BMP180.get_pressure_conversion_time(3))
+        assert c.poll_bmp180() == 'pressure'
+        assert c.latest_pressure[1] <= time.time()
+        assert c.poll_bmp180() is None
+
+    def test_poll_pressure(self):
+        """Test that the non-blocking pressure poll returns the time to poll again at."""
+        c, smbus, mockbus = create_device(1, None)
+        queue_bmp180_calibration(mockbus)
+        c.open()
+        queue_bmp180_conversion(mockbus, 27898, 2)
+        queue_bmp180_conversion(mockbus, 23843 << 5, 3)
+        t = time.time()
+        pressure, ready_time = c.poll_pressure()
+        assert pressure is None
+        assert ready_time >= t + BMP180.TEMPERATURE_CONVERSION_TIME
+        n = 0
+        while ready_time is not None:
+            time.sleep(max(ready_time - time.time(), 0))
+            pressure, ready_time = c.poll_pressure()
+            n += 1
+        assert n == 2
+        assert pressure == c.latest_pressure[0]
+        assert mockbus._written[BMP180.ADDRESS][BMP180.WRITE_REG] == [0x2E, 0xF4]
+
+    def test_read_temperature_during_pressure_conversion(self):
+        """Test that a blocking read waits out a pending one-shot conversion and starts its own."""
+        c, smbus, mockbus = create_device(1, None)
+        queue_bmp180_calibration(mockbus)
+        c.open()
+        queue_bmp180_conversion(mockbus, 27898, 2)
+        queue_bmp180_conversion(mockbus, 23843 << 5, 3)
+        queue_bmp180_conversion(mockbus, 27898, 2)
+        c.start_bmp180_conversions(continuous=False)
+        time.sleep(BMP180.TEMPERATURE_CONVERSION_TIME)
+        assert c.poll_bmp180() == 'temperature'
+        assert c.read_temperature() == 15.0
+
+
 class TestClient(object):
 
     @staticmethod
@@ -95,6 +277,32 @@ class TestClient(object):
         assert c.bus == mockbus
         smbus.SMBus.assert_called_with(1)
 
+    def _test_read_vector(self, burst_read, method_name, address, register_low_bit):
+        c, smbus, mockbus = create_device(1, None, burst_read=burst_read)
+        c.open()
+        values = (-16384, 1, 32767)
+        queue_vector(mockbus, address, register_low_bit, values)
+        mockbus.read_i2c_block_data = Mock(side_effect=mockbus.read_i2c_block_data)
+        mockbus.read_byte_data = Mock(side_effect=mockbus.read_byte_data)
+        assert getattr(c, method_name)() == values
+        if burst_read:
+            mockbus.read_i2c_block_data.assert_called_once_with(
+                address, (register_low_bit - 1) | LSM9DS0.AUTO_INCREMENT, 7)
+            assert mockbus.read_byte_data.call_count == 0
+        else:
+            assert mockbus.read_i2c_block_data.call_count == 0
+            assert mockbus.read_byte_data.call_count == 6
+
+    def test_read_vectors(self):
+        """Test that output registers are read and decoded correctly in both read modes."""
+        for burst_read in (True, False):
+            yield (self._test_read_vector, burst_read, 'read_accelerometer',
+                   LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A)
+            yield (self._test_read_vector, burst_read, 'read_gyroscope',
+                   LSM9DS0.GYR_ADDRESS, LSM9DS0.OUT_X_L_G)
+            yield (self._test_read_vector, burst_read, 'read_magnetometer',
+                   LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_X_L_M)
+
     def test_correct_acc_data_rate_applied(self):
         """Test that Accelerometer data rates are written correctly."""
         for s_val, binstring in LSM9DS0._TABLE_72.items():
@@ -140,9 +348,388 @@ class TestClient(object):
     def test_correct_acc_self_test_applied(self):
         """Test that Accelerometer settings are written correctly."""
         for s_val, binstring in LSM9DS0._TABLE_77.items():
+            if s_val == 'X':
+                # Not allowed, rejected by the configuration.
+                continue
             yield (self._test_bits_written, 'accelerometer', 'self_test',
                    LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG2_XM, 0b00000110, 1, s_val, binstring)
 
+    def test_read_imu_raw(self):
+        """Test that all nine raw values are written to the supplied row."""
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        queue_vector(mockbus, LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A, (1, 2, 3))
+        queue_vector(mockbus, LSM9DS0.GYR_ADDRESS, LSM9DS0.OUT_X_L_G, (-4, -5, -6))
+        queue_vector(mockbus, LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_X_L_M, (7, -8, 9))
+        row = np.zeros((10, ), 'float')
+        assert c.read_imu_raw(out=row) is row
+        assert row[0] > 0
+        np.testing.assert_array_equal(row[1:], [1, 2, 3, -4, -5, -6, 7, -8, 9])
+
+    def test_read_imu_calibrated(self):
+        """Test that the fused calibration of read_imu matches the per sensor transforms."""
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        sc = StandardCalibration()
+        settings = {'accelerometer': {'full_scale': 8}, 'gyroscope': {'full_scale': 500},
+                    'magnetometer': {'full_scale': 12}}
+        sc.set_datasheet_values_for_accelerometer(settings)
+        sc.set_datasheet_values_for_gyroscope(settings)
+        sc.set_datasheet_values_for_magnetometer(settings)
+        sc.acc_bias_vector = np.array([0.49, 0.51, 0.5])
+        sc.gyro_bias_vector = np.array([0.1, -0.2, 0.3])
+        c.calibration_object = sc
+
+        raw = [(4096, -100, 12), (-300, 250, 7), (1000, -2000, 500)]
+        for address, register, values in zip(
+                (LSM9DS0.ACC_ADDRESS, LSM9DS0.GYR_ADDRESS, LSM9DS0.MAG_ADDRESS),
+                (LSM9DS0.OUT_X_L_A, LSM9DS0.OUT_X_L_G, LSM9DS0.OUT_X_L_M), raw):
+            queue_vector(mockbus, address, register, values)
+        row = c.read_imu()
+        np.testing.assert_allclose(row[1:4], sc.transform_accelerometer_values(raw[0]))
+        np.testing.assert_allclose(row[4:7], sc.transform_gyroscope_values(raw[1]))
+        np.testing.assert_allclose(row[7:10], sc.transform_magnetometer_values(raw[2]))
+
+    def test_read_accelerometer_batch(self):
+        """Test that samples are only taken when the status register signals new data."""
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        queue_vector(mockbus, LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A, (0, 0, 0), status=0)
+        queue_vector(mockbus, LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A, (1, -2, 3))
+        queue_vector(mockbus, LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A, (-32768, 32767, 0),
+                     status=LSM9DS0.STATUS_DATA_READY_BIT | LSM9DS0.STATUS_OVERRUN_BIT)
+        out = np.zeros((2, 3), 'int16')
+        assert c.read_accelerometer_batch(2, out=out) is out
+        np.testing.assert_array_equal(out, [[1, -2, 3], [-32768, 32767, 0]])
+        assert c.get_data_status('accelerometer')['overrun_count'] == 1
+
+    def test_read_imu_batch(self):
+        """Test that only the accelerometer status register is polled, and each row is read once."""
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        status_queue = mockbus._read.setdefault(LSM9DS0.ACC_ADDRESS, {}).setdefault(LSM9DS0.STATUS_REG_A, [])
+        for k in range(3):
+            # Status polls, the first without new data.
+            status_queue.extend([0, LSM9DS0.STATUS_DATA_READY_BIT])
+            queue_vector(mockbus, LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A, (k, 2, 3))
+            queue_vector(mockbus, LSM9DS0.GYR_ADDRESS, LSM9DS0.OUT_X_L_G, (-4, -5, -k))
+            queue_vector(mockbus, LSM9DS0.MAG_ADDRESS, LSM9DS0.OUT_X_L_M, (7, -8, 9))
+        c.transport.read_i2c_block_data_batch = Mock(side_effect=c.transport.read_i2c_block_data_batch)
+        values = c.read_imu_batch(3)
+        assert c.transport.read_i2c_block_data_batch.call_count == 3
+        assert status_queue == []
+        assert values.dtype == np.int16
+        np.testing.assert_array_equal(values[:, 0], [0, 1, 2])
+        np.testing.assert_array_equal(values[2], [2, 2, 3, -4, -5, -2, 7, -8, 9])
+
+        sc = StandardCalibration()
+        settings = c.get_settings()
+        sc.set_datasheet_values_for_accelerometer(settings)
+        sc.set_datasheet_values_for_gyroscope(settings)
+        sc.set_datasheet_values_for_magnetometer(settings)
+        calibrated = sc.transform_imu_values(values)
+        np.testing.assert_allclose(calibrated[2, 3:6], sc.transform_gyroscope_values(values[2, 3:6]))
+
+    def test_batch_output_array_checked(self):
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        try:
+            c.read_gyroscope_batch(2, out=np.zeros((2, 3), 'float'))
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
+
+    def test_data_status(self):
+        """Test that the status register read in the same burst is parsed."""
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        assert c.get_data_status('accelerometer') == {'new_data': None, 'overrun': None, 'overrun_count': 0}
+        queue_vector(mockbus, LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A, (1, 2, 3), status=0b10001000)
+        queue_vector(mockbus, LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A, (1, 2, 3), status=0b00000000)
+        c.read_accelerometer()
+        assert c.get_data_status('accelerometer') == {'new_data': True, 'overrun': True, 'overrun_count': 1}
+        c.read_accelerometer()
+        assert c.get_data_status('accelerometer') == {'new_data': False, 'overrun': False, 'overrun_count': 1}
+
+    def test_wait_for_new_sample(self):
+        """Test that status is polled until new data is available."""
+        c, smbus, mockbus = create_device(1, {'gyroscope': {'data_rate': 760}})
+        c.open()
+        mockbus._read.setdefault(LSM9DS0.GYR_ADDRESS, {})[LSM9DS0.STATUS_REG_G] = [0, 0, 0b00001000]
+        queue_vector(mockbus, LSM9DS0.GYR_ADDRESS, LSM9DS0.OUT_X_L_G, (4, 5, 6))
+        assert c.wait_for_new_sample('gyroscope') == (4, 5, 6)
+        assert mockbus._read[LSM9DS0.GYR_ADDRESS][LSM9DS0.STATUS_REG_G] == []
+
+    def test_enable_fifo(self):
+        """Test that FIFO enable and mode bits are written, keeping the other bits of the enable register."""
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        # WTM_EN and HPIS2 set on the device.
+        mockbus._read.setdefault(LSM9DS0.ACC_ADDRESS, {})[LSM9DS0.CTRL_REG0_XM] = [0b00100001]
+        c.enable_fifo(accelerometer=True, gyroscope=False, mode='stream', watermark=16)
+        assert mockbus._written[LSM9DS0.ACC_ADDRESS][LSM9DS0.CTRL_REG0_XM] == [0b01100001]
+        assert mockbus._written[LSM9DS0.ACC_ADDRESS][LSM9DS0.FIFO_CTRL_REG] == [0b01010000]
+        assert LSM9DS0.FIFO_CTRL_REG_G not in mockbus._written[LSM9DS0.GYR_ADDRESS]
+        c.enable_fifo(accelerometer=True, gyroscope=False, mode='fifo', watermark=31)
+        assert mockbus._written[LSM9DS0.ACC_ADDRESS][LSM9DS0.FIFO_CTRL_REG][-1] == 0b00111111
+        c.disable_fifo(accelerometer=True, gyroscope=False)
+        assert mockbus._written[LSM9DS0.ACC_ADDRESS][LSM9DS0.CTRL_REG0_XM][-1] == 0b00100001
+        assert mockbus._written[LSM9DS0.ACC_ADDRESS][LSM9DS0.FIFO_CTRL_REG][-1] == 0b00000000
+
+    def test_disable_fifo_initializes_sensor(self):
+        c, smbus, mockbus = create_device(1, None, lazy_init=True)
+        c.open()
+        assert LSM9DS0.CTRL_REG1_XM not in mockbus._written.get(LSM9DS0.ACC_ADDRESS, {})
+        mockbus._read.setdefault(LSM9DS0.ACC_ADDRESS, {})[LSM9DS0.CTRL_REG0_XM] = [0b01000000]
+        c.disable_fifo(accelerometer=True, gyroscope=False)
+        assert LSM9DS0.CTRL_REG1_XM in mockbus._written[LSM9DS0.ACC_ADDRESS]
+        assert mockbus._written[LSM9DS0.ACC_ADDRESS][LSM9DS0.CTRL_REG0_XM] == [0b00000000]
+
+    def test_enable_fifo_invalid_watermark(self):
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        for watermark in (-1, LSM9DS0.FIFO_SIZE):
+            try:
+                c.enable_fifo(watermark=watermark)
+            except PyBerryIMUError:
+                pass
+            else:
+                assert False
+
+    def test_read_fifo(self):
+        """Test that all FIFO samples are drained in block reads."""
+        c, smbus, mockbus = create_device(1, {'gyroscope': {'data_rate': 380}})
+        c.open()
+        samples = [(i, -i, 1000 * i) for i in range(7)]
+        mockbus._read.setdefault(LSM9DS0.GYR_ADDRESS, {})[LSM9DS0.FIFO_SRC_REG_G] = [7]
+        for sample in samples:
+            queue_vector(mockbus, LSM9DS0.GYR_ADDRESS, LSM9DS0.OUT_X_L_G, sample)
+        mockbus.read_i2c_block_data = Mock(side_effect=mockbus.read_i2c_block_data)
+        timestamps, values = c.read_fifo('gyroscope')
+        assert mockbus.read_i2c_block_data.call_count == 2
+        np.testing.assert_array_equal(values, samples)
+        np.testing.assert_allclose(np.diff(timestamps), 1 / 380, rtol=1e-3)
+
+    def test_fifo_status(self):
+        """Test parsing of the FIFO source register."""
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        mockbus._read.setdefault(LSM9DS0.ACC_ADDRESS, {})[LSM9DS0.FIFO_SRC_REG] = [0b00100000, 0b11011111]
+        assert c.get_fifo_status('accelerometer') == {
+            'watermark': False, 'overrun': False, 'empty': True, 'level': 0}
+        assert c.get_fifo_status('accelerometer') == {
+            'watermark': True, 'overrun': True, 'empty': False, 'level': 32}
+
+    def test_settings_from_shadow_registers(self):
+        """Test that settings are served without reading the bus."""
+        c, smbus, mockbus = create_device(1, {'accelerometer': {'data_rate': 400}})
+        c.open()
+        mockbus.read_byte_data = Mock(side_effect=mockbus.read_byte_data)
+        settings = c.get_settings()
+        assert mockbus.read_byte_data.call_count == 0
+        assert settings['accelerometer']['reg1'] == '10001111'
+        assert settings['accelerometer']['data_rate'] == 400
+
+    def test_verify_settings(self):
+        """Test that register values differing from the written ones are reported."""
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        mockbus._read = dict((address, dict((register, list(values[-1:])) for register, values in registers.items()))
+                             for address, registers in mockbus._written.items())
+        assert c.verify_settings() == []
+        assert BMP180.ADDRESS not in set(address for address, register in c._register_cache)
+
+        mockbus._read = dict((address, dict((register, list(values[-1:])) for register, values in registers.items()))
+                             for address, registers in mockbus._written.items())
+        mockbus._read[LSM9DS0.GYR_ADDRESS][LSM9DS0.CTRL_REG1_G] = [0b00000111]
+        expected = mockbus._written[LSM9DS0.GYR_ADDRESS][LSM9DS0.CTRL_REG1_G][-1]
+        assert c.verify_settings() == [(LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG1_G, expected, 0b00000111)]
+
+    def test_reconfigure_writes_changed_registers(self):
+        """Test that only control registers whose values change are written."""
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        mockbus.write_byte_data = Mock(side_effect=mockbus.write_byte_data)
+        assert c.reconfigure(accelerometer={'data_rate': 400}) == 1
+        mockbus.write_byte_data.assert_called_once_with(LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG1_XM, 0b10001111)
+        assert c.reconfigure(accelerometer={'data_rate': 400}, gyroscope={'data_rate': 190}) == 0
+        assert c.get_settings()['accelerometer']['data_rate'] == 400
+
+    def test_reconfigure_full_scale_rescales_calibration(self):
+        c, smbus, mockbus = create_device(1, None)
+        c.open()
+        sc = StandardCalibration()
+        sc.set_datasheet_values_for_gyroscope(c.get_settings())
+        c.calibration_object = sc
+        c.reconfigure(gyroscope={'full_scale': 2000})
+        np.testing.assert_allclose(sc.gyro_scale_factor_vector, 0.07)
+        assert mockbus._written[LSM9DS0.GYR_ADDRESS][LSM9DS0.CTRL_REG4_G][-1] == 0b10110000
+
+    def test_failed_sample_is_nan(self):
+        from pyberryimu.client import BerryIMUClient
+        from pyberryimu.transport import MemoryTransport
+        transport = MemoryTransport()
+        c = BerryIMUClient(transport=transport, retries=1, retry_backoff=0.0, nan_on_error=True)
+        c.open()
+        transport.read_i2c_block_data = Mock(side_effect=IOError(5, 'Input/output error'))
+        row = c.read_imu()
+        assert row[0] > 0
+        assert np.all(np.isnan(row[1:]))
+        assert c.missing_samples == 1
+        assert transport.read_i2c_block_data.call_count == 2
+
+    def test_failed_sensor_reads_are_nan(self):
+        from pyberryimu.client import BerryIMUClient
+        from pyberryimu.transport import MemoryTransport
+        transport = MemoryTransport()
+        c = BerryIMUClient(transport=transport, nan_on_error=True)
+        c.open()
+        transport.read_i2c_block_data = Mock(side_effect=IOError(5, 'Input/output error'))
+        assert np.all(np.isnan(c.read_accelerometer()))
+        assert np.all(np.isnan(c.read_magnetometer()))
+        transport.read_byte_data = Mock(side_effect=IOError(5, 'Input/output error'))
+        # A failed poll ends the wait, and the sample is returned as NaN values.
+        assert c.wait_for_data_ready('gyroscope') is False
+        assert np.all(np.isnan(c.wait_for_new_sample('gyroscope')))
+        assert c.missing_samples == 3
+
+    def test_batch_skips_failed_reads(self):
+        from pyberryimu.client import BerryIMUClient
+        from pyberryimu.transport import MemoryTransport
+        transport = MemoryTransport()
+        c = BerryIMUClient(transport=transport, nan_on_error=True)
+        c.open()
+        transport.registers[LSM9DS0.ACC_ADDRESS][LSM9DS0.STATUS_REG_A] = LSM9DS0.STATUS_DATA_READY_BIT
+        transport.registers[LSM9DS0.ACC_ADDRESS][LSM9DS0.OUT_X_L_A] = 7
+        block = transport.read_i2c_block_data(LSM9DS0.ACC_ADDRESS, LSM9DS0.STATUS_REG_A | LSM9DS0.AUTO_INCREMENT, 7)
+        transport.read_i2c_block_data = Mock(side_effect=[IOError(5, 'Input/output error'), block, block])
+        data = c.read_accelerometer_batch(2)
+        np.testing.assert_array_equal(data, [[7, 0, 0], [7, 0, 0]])
+        assert c.missing_samples == 1
+        c = BerryIMUClient(transport=MemoryTransport(), nan_on_error=True)
+        c.open()
+        c.transport.read_i2c_block_data = Mock(side_effect=IOError(5, 'Input/output error'))
+        try:
+            c.read_gyroscope_batch(2, timeout=0.01)
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
+
+    def test_settings_restored_after_error(self):
+        from pyberryimu.client import BerryIMUClient
+        from pyberryimu.transport import MemoryTransport
+        transport = MemoryTransport()
+        c = BerryIMUClient(transport=transport, nan_on_error=True)
+        c.open()
+        # The gyroscope has been reset by a power glitch, failing the read.
+        del transport.registers[LSM9DS0.GYR_ADDRESS]
+        transport.read_i2c_block_data_batch = Mock(side_effect=IOError(5, 'Input/output error'))
+        assert np.all(np.isnan(c.read_imu_raw()[1:]))
+        assert c.verify_settings() == []
+
+    def test_restore_settings(self):
+        """Test that only the sensor with drifted registers is rewritten."""
+        from pyberryimu.client import BerryIMUClient
+        from pyberryimu.transport import MemoryTransport
+        transport = MemoryTransport()
+        c = BerryIMUClient(transport=transport)
+        c.open()
+        assert c.restore_settings() == []
+        # The gyroscope has been reset.
+        del transport.registers[LSM9DS0.GYR_ADDRESS]
+        transport.write_byte_data = Mock(side_effect=transport.write_byte_data)
+        assert c.restore_settings() == ['gyroscope']
+        assert set(call[0][0] for call in transport.write_byte_data.call_args_list) == set([LSM9DS0.GYR_ADDRESS])
+        assert c.verify_settings() == []
+
+    def test_disabled_sensors_powered_down(self):
+        c, smbus, mockbus = create_device(1, None, enabled_sensors=('accelerometer', ))
+        c.open()
+        assert mockbus._written[LSM9DS0.GYR_ADDRESS] == {LSM9DS0.CTRL_REG1_G: [0b00000000]}
+        assert mockbus._written[LSM9DS0.MAG_ADDRESS][LSM9DS0.CTRL_REG7_XM] == [0b00000011]
+        assert LSM9DS0.CTRL_REG5_XM not in mockbus._written[LSM9DS0.MAG_ADDRESS]
+        assert BMP180.ADDRESS not in mockbus._written
+        assert len(mockbus._read[BMP180.ADDRESS][BMP180.CALIB_DATA_REG]) == 1
+        try:
+            c.read_gyroscope()
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
+
+    def test_disabled_sensors_in_settings(self):
+        from pyberryimu.client import BerryIMUClient
+        from pyberryimu.transport import MemoryTransport
+        c = BerryIMUClient(transport=MemoryTransport(), enabled_sensors=('accelerometer', ))
+        c.open()
+        settings = c.get_settings()
+        assert settings['gyroscope']['enabled'] is False
+        assert settings['gyroscope']['reg1'] == '00000000'
+        assert settings['barometer']['enabled'] is False
+        assert 'enabled' not in settings['accelerometer']
+
+    def test_unknown_sensor(self):
+        try:
+            create_device(1, None, enabled_sensors=('thermometer', ))
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
+
+    def test_lazy_init(self):
+        c, smbus, mockbus = create_device(1, None, lazy_init=True)
+        c.open()
+        assert mockbus._written == {}
+        queue_vector(mockbus, LSM9DS0.GYR_ADDRESS, LSM9DS0.OUT_X_L_G, (1, 2, 3))
+        assert c.read_gyroscope() == (1, 2, 3)
+        assert list(mockbus._written) == [LSM9DS0.GYR_ADDRESS]
+        assert c.reconfigure(accelerometer={'data_rate': 400}) == 0
+        queue_vector(mockbus, LSM9DS0.ACC_ADDRESS, LSM9DS0.OUT_X_L_A, (1, 2, 3))
+        c.read_accelerometer()
+        assert mockbus._written[LSM9DS0.ACC_ADDRESS][LSM9DS0.CTRL_REG1_XM] == [0b10001111]
+
+    def test_bmp180_calibration_cache(self):
+        from pyberryimu.client import BerryIMUClient
+        from pyberryimu.simulator import SimulatedBerryIMU
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cache_path = os.path.join(cache_dir, 'bmp180.json')
+            transport = SimulatedBerryIMU()
+            transport.read_i2c_block_data = Mock(side_effect=transport.read_i2c_block_data)
+            c = BerryIMUClient(transport=transport, enabled_sensors=('barometer', ), bmp180_cache=cache_path)
+            c.open()
+            transport.read_i2c_block_data.assert_called_once_with(BMP180.ADDRESS, BMP180.CALIB_DATA_REG, 22)
+            calibration = c._bmp180_calibration
+
+            transport.read_i2c_block_data.reset_mock()
+            c.open()
+            transport.read_i2c_block_data.assert_called_once_with(BMP180.ADDRESS, BMP180.CALIB_DATA_REG, 2)
+            assert c._bmp180_calibration == calibration
+
+            # A different device on the bus invalidates the cache.
+            transport.registers[BMP180.ADDRESS][BMP180.CALIB_DATA_REG] ^= 0xFF
+            transport.read_i2c_block_data.reset_mock()
+            c.open()
+            assert transport.read_i2c_block_data.call_count == 2
+            assert c._bmp180_calibration['ac1'] != calibration['ac1']
+
+            # A corrupted entry fails the checksum and is read from the device again.
+            with open(cache_path, 'rt') as f:
+                cache = json.load(f)
+            entry = cache['1:0x77']
+            entry['data'][10] ^= 0xFF
+            with open(cache_path, 'wt') as f:
+                json.dump(cache, f)
+            transport.read_i2c_block_data.reset_mock()
+            c.open()
+            transport.read_i2c_block_data.assert_called_once_with(BMP180.ADDRESS, BMP180.CALIB_DATA_REG, 22)
+            with open(cache_path, 'rt') as f:
+                assert json.load(f)['1:0x77']['data'][10] == entry['data'][10] ^ 0xFF
+        finally:
+            shutil.rmtree(cache_dir)
+
     # Gyroscope init tests.
     def test_correct_gyro_data_rate_applied(self):
         """Test that Gyroscope settings are written correctly #1."""
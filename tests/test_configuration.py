@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`test_configuration`
+==================
+
+.. module:: test_configuration
+   :platform: Unix, Windows
+   :synopsis:
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import json
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.sensors import LSM9DS0
+from pyberryimu.client import BerryIMUClient
+from pyberryimu.transport import MemoryTransport
+from pyberryimu.configuration import BerryIMUConfiguration
+
+
+def _assert_invalid(settings):
+    try:
+        BerryIMUConfiguration(settings)
+    except PyBerryIMUError:
+        pass
+    else:
+        assert False, settings
+
+
+class TestBerryIMUConfiguration(object):
+
+    def test_default_registers(self):
+        assert BerryIMUConfiguration().get_registers() == [
+            (LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG1_XM, 0b01111111),
+            (LSM9DS0.ACC_ADDRESS, LSM9DS0.CTRL_REG2_XM, 0b00011000),
+            (LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG1_G, 0b01001111),
+            (LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG4_G, 0b10010000),
+            (LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG5_XM, 0b11110000),
+            (LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG6_XM, 0b01100000),
+            (LSM9DS0.MAG_ADDRESS, LSM9DS0.CTRL_REG7_XM, 0b00000000),
+        ]
+
+    def test_data_sheet_data_rates(self):
+        configuration = BerryIMUConfiguration({'accelerometer': {'data_rate': 50},
+                                               'magnetometer': {'data_rate': 25}})
+        assert configuration.get_registers('accelerometer')[0][2] >> 4 == 0b0101
+        configuration = BerryIMUConfiguration({'magnetometer': {'data_rate': 100}})
+        assert (configuration.get_registers('magnetometer')[0][2] >> 2) & 0b111 == 0b101
+
+    def test_invalid_settings(self):
+        for settings in ({'accelerometer': {'data_rate': 300}},
+                         {'accelerometer': {'full_scale': True}},
+                         {'accelerometer': {'self_test': 'X'}},
+                         {'gyroscope': {'bandwidth_level': 4}},
+                         {'gyroscope': {'enabled_x': 'yes'}},
+                         {'magnetometer': {'data_rate': 100}, 'accelerometer': {'data_rate': 25}},
+                         {'magnetometer': {'full_scale': 16}},
+                         {'magnetometer': {'resolution': 'high'}},
+                         {'barometer': {'oversampling': 4}},
+                         {'barometer': {'temperature_refresh_count': 0}},
+                         {'thermometer': {}}):
+            yield _assert_invalid, settings
+
+    def test_round_trip(self):
+        configuration = BerryIMUConfiguration({'accelerometer': {'data_rate': 400, 'full_scale': 4},
+                                               'barometer': {'oversampling': 1}})
+        c = BerryIMUClient(settings=configuration, transport=MemoryTransport())
+        c.open()
+        assert c.get_settings() == configuration.to_settings()
+        assert BerryIMUConfiguration.from_settings(c.get_settings()) == configuration
+        settings = json.loads(json.dumps(configuration.to_settings()))
+        assert BerryIMUConfiguration.from_settings(settings) == configuration
+        c = BerryIMUClient(settings=configuration, transport=MemoryTransport(),
+                           enabled_sensors=('accelerometer', 'barometer'))
+        c.open()
+        assert BerryIMUConfiguration.from_settings(c.get_settings()) == configuration
+
+    def test_diff(self):
+        configuration = BerryIMUConfiguration()
+        assert configuration.diff(configuration) == []
+        other = configuration.merge(gyroscope={'full_scale': 2000}, barometer={'oversampling': 0})
+        assert other != configuration
+        assert configuration.diff(other) == [(LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG4_G, 0b10010000, 0b10110000)]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`test_container`
+==================
+
+.. module:: test_container
+   :platform: Unix, Windows
+   :synopsis:
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import datetime
+
+import numpy as np
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.container import IMUDataContainer
+from pyberryimu.calibration.base import BerryIMUCalibration
+from pyberryimu.calibration.standard import StandardCalibration
+
+
+def create_raw_container():
+    container = IMUDataContainer(datetime.datetime.now(), {}, BerryIMUCalibration().to_json())
+    container.timestamps = np.arange(4) * 0.01
+    container.accelerometer = [[4096, 0, 0]] * 4
+    container.gyroscope = np.ones((4, 3)) * 100
+    container.magnetometer = np.ones((4, 3)) * -50
+    return container
+
+
+class TestIMUDataContainer(object):
+
+    def test_apply_calibration(self):
+        sc = StandardCalibration()
+        settings = {'accelerometer': {'full_scale': 8}, 'gyroscope': {'full_scale': 500},
+                    'magnetometer': {'full_scale': 12}}
+        sc.set_datasheet_values_for_accelerometer(settings)
+        sc.set_datasheet_values_for_gyroscope(settings)
+        sc.set_datasheet_values_for_magnetometer(settings)
+        container = create_raw_container()
+        gyroscope = container.gyroscope
+        assert container.apply_calibration(sc) is container
+        np.testing.assert_allclose(container.gyroscope, 100 * 0.0175)
+        # Float arrays are calibrated in place.
+        assert container.gyroscope is gyroscope
+        np.testing.assert_allclose(container.accelerometer[0],
+                                   sc.transform_accelerometer_values([4096, 0, 0]))
+        assert container.calibration_parameters['gyroscope']['scale_factor'] == [0.0175] * 3
+
+        try:
+            container.apply_calibration(sc)
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
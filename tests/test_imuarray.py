@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`test_imuarray`
+==================
+
+.. module:: test_imuarray
+   :platform: Unix, Windows
+   :synopsis:
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import numpy as np
+
+from pyberryimu.client import BerryIMUClient
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.imuarray import BerryIMUArray
+from pyberryimu.simulator import SimulatedBerryIMU
+
+
+def create_array(buses, **kwargs):
+    return BerryIMUArray([BerryIMUClient(bus=bus, transport=SimulatedBerryIMU(**kwargs)) for bus in buses])
+
+
+class TestBerryIMUArray(object):
+
+    def test_bus_groups(self):
+        imus = create_array([1, 3, 1])
+        assert imus._get_bus_groups() == [[0, 2], [1]]
+
+    def test_aligned_recording(self):
+        with create_array([1, 2]) as imus:
+            containers = imus.record(frequency=100, duration=0.1)
+        assert [len(c) for c in containers] == [10, 10]
+        timestamps = np.array([c.timestamps for c in containers])
+        assert np.all(np.abs(timestamps[0] - timestamps[1]) < 0.005)
+        np.testing.assert_allclose(np.diff(timestamps[0]), 0.01, atol=0.005)
+
+    def test_buses_are_sampled_in_parallel(self):
+        # Each read takes 6 ms, so reading both devices in turn would not keep up with 100 Hz.
+        with create_array([1, 2], latency=0.006) as imus:
+            containers = imus.record(frequency=100, duration=0.2)
+        assert imus.skipped_ticks == [0, 0]
+        assert not np.any(np.isnan(containers[1].accelerometer))
+
+    def test_error_in_worker(self):
+        imus = create_array([1, 2])
+        imus.clients[1].read_imu = None
+        try:
+            imus.record(frequency=100, duration=0.05)
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`test_multiprocess`
+==================
+
+.. module:: test_multiprocess
+   :platform: Unix
+   :synopsis:
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import numpy as np
+from nose import SkipTest
+
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.simulator import SimulatedBerryIMU
+from pyberryimu import multiprocess
+from pyberryimu.multiprocess import SharedRingBuffer, BerryIMUAcquisitionProcess
+
+
+class TestSharedRingBuffer(object):
+
+    def __init__(self):
+        if multiprocess.shared_memory is None:
+            raise SkipTest("Shared memory requires Python 3.8+.")
+
+    def test_attach_and_read(self):
+        writer = SharedRingBuffer(capacity=4, width=2, create=True)
+        try:
+            writer.write([1, 2])
+            reader = SharedRingBuffer(writer.name)
+            assert reader.capacity == 4 and reader._data.shape == (8, 2)
+            for k in range(5):
+                writer.write([k, k])
+            data = reader.drain()
+            # One slot is reserved for the writer.
+            np.testing.assert_array_equal(data[:, 0], [2, 3, 4])
+            assert reader.lost_samples == 2
+            assert not reader.is_overwritten(reader.nbr_drained - len(data))
+            writer.write([5, 5])
+            assert reader.is_overwritten(reader.nbr_drained - len(data))
+            del data
+            reader.close()
+        finally:
+            writer.close()
+
+
+class TestBerryIMUAcquisitionProcess(object):
+
+    def __init__(self):
+        if multiprocess.shared_memory is None:
+            raise SkipTest("Shared memory requires Python 3.8+.")
+
+    def test_acquisition(self):
+        with BerryIMUAcquisitionProcess(frequency=200, capacity=256, transport=SimulatedBerryIMU()) as acquisition:
+            reader = SharedRingBuffer(acquisition.name)
+            assert reader.wait(10, timeout=5.0)
+            data = reader.drain().copy()
+            reader.close()
+        assert len(data) >= 10
+        assert np.all(np.diff(data[:, 0]) > 0)
+
+    def test_acquisition_error(self):
+        acquisition = BerryIMUAcquisitionProcess(frequency=200, transport='no-such-transport')
+        try:
+            acquisition.start()
+            acquisition.stop()
+        except PyBerryIMUError as e:
+            assert 'no-such-transport' in str(e)
+        else:
+            assert False
+        finally:
+            acquisition.close()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`test_simulator`
+==================
+
+.. module:: test_simulator
+   :platform: Unix, Windows
+   :synopsis:
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import time
+
+import numpy as np
+
+from pyberryimu.client import BerryIMUClient
+from pyberryimu.sensors import LSM9DS0, BMP180
+from pyberryimu.simulator import SimulatedBerryIMU
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+
+def create_simulated_client(settings=None, **kwargs):
+    simulator = SimulatedBerryIMU(**kwargs)
+    client = BerryIMUClient(settings=settings, transport=simulator)
+    client.open()
+    return client, simulator
+
+
+class TestSimulatedBerryIMU(object):
+
+    def test_stationary_values(self):
+        c, sim = create_simulated_client()
+        time.sleep(0.01)
+        acc = c.read_accelerometer()
+        assert acc[:2] == (0, 0)
+        assert abs(acc[2] * LSM9DS0.ACCELEROMETER_SENSITIVITY[8] - 1.0) < 1e-3
+        assert c.read_gyroscope() == (0, 0, 0)
+
+    def test_full_scale(self):
+        c, sim = create_simulated_client({'accelerometer': {'full_scale': 2}})
+        time.sleep(0.01)
+        assert c.read_accelerometer()[2] == int(round(1.0 / LSM9DS0.ACCELEROMETER_SENSITIVITY[2]))
+
+    def test_data_rate_and_status(self):
+        clock = FakeClock()
+        c, sim = create_simulated_client({'accelerometer': {'data_rate': 100}}, clock=clock)
+        c.read_accelerometer()
+        assert not c.get_data_status('accelerometer')['new_data']
+        clock.t += 0.0101
+        c.read_accelerometer()
+        assert c.get_data_status('accelerometer')['new_data']
+        c.read_accelerometer()
+        assert not c.get_data_status('accelerometer')['new_data']
+        clock.t += 0.0201
+        c.read_accelerometer()
+        status = c.get_data_status('accelerometer')
+        assert status['new_data'] and status['overrun']
+
+    def test_signal(self):
+        clock = FakeClock()
+        c, sim = create_simulated_client(clock=clock, signal=lambda sensor, t: (0.5, -0.5, 0.0))
+        clock.t += 0.1
+        assert c.read_accelerometer() == (2049, -2049, 0)
+
+    def test_fifo(self):
+        clock = FakeClock()
+        c, sim = create_simulated_client(
+            {'accelerometer': {'data_rate': 100}}, clock=clock,
+            signal=lambda sensor, t: (t - 1000.0, 0.0, 0.0))
+        c.enable_fifo(gyroscope=False)
+        clock.t += 0.1001
+        assert c.get_fifo_status('accelerometer')['level'] == 10
+        timestamps, values = c.read_fifo('accelerometer')
+        np.testing.assert_array_equal(values[:, 0], [int(round(0.01 * k / 0.000244)) for k in range(1, 11)])
+        assert c.get_fifo_status('accelerometer')['empty']
+
+    def test_fifo_stream_mode_overrun(self):
+        clock = FakeClock()
+        c, sim = create_simulated_client({'accelerometer': {'data_rate': 100}}, clock=clock)
+        c.enable_fifo(gyroscope=False)
+        clock.t += 1.0
+        status = c.get_fifo_status('accelerometer')
+        assert status['overrun'] and status['level'] == LSM9DS0.FIFO_SIZE
+
+    def test_barometer(self):
+        c, sim = create_simulated_client({'barometer': {'oversampling': 0}})
+        assert c.read_temperature() == 15.0
+        assert abs(c.read_pressure() - 699.64) < 1e-6
+
+    def test_barometer_oversampling(self):
+        c, sim = create_simulated_client({'barometer': {'oversampling': 3}})
+        assert abs(c.read_pressure() - 699.64) < 0.05
+
+    def test_barometer_conversion_time(self):
+        clock = FakeClock()
+        sim = SimulatedBerryIMU(clock=clock)
+        sim.write_byte_data(BMP180.ADDRESS, BMP180.WRITE_REG, BMP180.PRESSURE_COMMAND + (1 << 6))
+        clock.t += 0.007
+        assert sim.read_byte_data(BMP180.ADDRESS, BMP180.WRITE_REG) & 0b00100000
+        assert sim.read_i2c_block_data(BMP180.ADDRESS, BMP180.READ_REG, 3) == [0, 0, 0]
+        clock.t += 0.001
+        assert not sim.read_byte_data(BMP180.ADDRESS, BMP180.WRITE_REG) & 0b00100000
+        msb, lsb, xsb = sim.read_i2c_block_data(BMP180.ADDRESS, BMP180.READ_REG, 3)
+        assert ((msb << 16) + (lsb << 8) + xsb) >> 7 == 23843 << 1
+
+    def test_transactions(self):
+        c, sim = create_simulated_client()
+        n = sim.nbr_transactions
+        c.read_imu_raw()
+        assert sim.nbr_transactions == n + 1
+
+    def test_latency(self):
+        c, sim = create_simulated_client(latency=0.002)
+        t = time.time()
+        c.read_accelerometer()
+        assert time.time() - t >= 0.002
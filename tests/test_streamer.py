@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`test_streamer`
+==================
+
+.. module:: test_streamer
+   :platform: Unix, Windows
+   :synopsis:
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import time
+import threading
+
+import numpy as np
+
+from pyberryimu.client import BerryIMUClient
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.simulator import SimulatedBerryIMU
+from pyberryimu.streamer import RingBuffer, BerryIMUStreamer
+
+
+class TestRingBuffer(object):
+
+    def test_latest_wraps_around(self):
+        buf = RingBuffer(5, 1)
+        for k in range(6):
+            buf.write([k])
+        latest = buf.latest()
+        np.testing.assert_array_equal(latest[:, 0], [2, 3, 4, 5])
+        np.testing.assert_array_equal(buf.latest(2)[:, 0], [4, 5])
+        assert np.may_share_memory(latest, buf._data)
+
+    def test_drain(self):
+        buf = RingBuffer(5, 1)
+        for k in range(3):
+            buf.write([k])
+        np.testing.assert_array_equal(buf.drain()[:, 0], [0, 1, 2])
+        assert len(buf.drain()) == 0
+        for k in range(3, 10):
+            buf.write([k])
+        np.testing.assert_array_equal(buf.drain(max_samples=3)[:, 0], [6, 7, 8])
+        assert buf.lost_samples == 3
+        np.testing.assert_array_equal(buf.drain()[:, 0], [9])
+
+    def test_read_full_buffer_while_writing(self):
+        """Test that the row being written is not part of views of a full buffer."""
+        buf = RingBuffer(4, 1)
+        for k in range(10):
+            buf.write([k])
+        latest = buf.latest()
+        drained = buf.drain()
+        np.testing.assert_array_equal(latest[:, 0], [7, 8, 9])
+        np.testing.assert_array_equal(drained[:, 0], [7, 8, 9])
+        buf.next_slot()[:] = -1
+        np.testing.assert_array_equal(latest[:, 0], [7, 8, 9])
+        np.testing.assert_array_equal(drained[:, 0], [7, 8, 9])
+        buf.commit()
+        # The oldest drained sample is in the row the writer fills next.
+        assert buf.is_overwritten(buf.nbr_drained - len(drained))
+        assert not buf.is_overwritten(buf.nbr_drained - len(drained) + 1)
+
+    def test_block_policy(self):
+        buf = RingBuffer(3, 1, policy='block')
+        buf.write([0])
+        buf.write([1])
+        writer = threading.Thread(target=buf.write, args=([2], ))
+        writer.start()
+        time.sleep(0.02)
+        assert buf.nbr_written == 2
+        np.testing.assert_array_equal(buf.drain(1)[:, 0], [0])
+        writer.join(1.0)
+        np.testing.assert_array_equal(buf.drain()[:, 0], [1, 2])
+
+    def test_wait(self):
+        buf = RingBuffer(2, 1)
+        assert not buf.wait(1, timeout=0.01)
+        buf.write([0])
+        assert buf.wait(1, timeout=0.01)
+
+    def test_next_slot_timeout_and_wake(self):
+        buf = RingBuffer(2, 1, policy='block')
+        buf.write([0])
+        assert buf.next_slot(timeout=0.01) is None
+        waker = threading.Timer(0.02, buf.wake)
+        waker.start()
+        t = time.time()
+        assert buf.next_slot() is None
+        assert time.time() - t < 1.0
+        waker.join()
+        buf.drain()
+        assert buf.next_slot(timeout=0.01) is not None
+
+    def test_invalid_policy(self):
+        try:
+            RingBuffer(2, policy='drop')
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
+
+
+class TestBerryIMUStreamer(object):
+
+    def test_streaming(self):
+        client = BerryIMUClient(transport=SimulatedBerryIMU())
+        with BerryIMUStreamer(client, frequency=200, capacity=64) as streamer:
+            assert streamer.buffer.wait(10, timeout=1.0)
+        data = streamer.drain()
+        assert len(data) >= 10
+        np.testing.assert_allclose(np.diff(data[:, 0]), 0.005, atol=0.004)
+        # The first samples may be read before the accelerometer has produced any.
+        np.testing.assert_allclose(data[-5:, 3], 1.0 / 0.000244, atol=1)
+
+    def test_powered_down_accelerometer(self):
+        client = BerryIMUClient(settings={'accelerometer': {'data_rate': 0}}, transport=SimulatedBerryIMU())
+        try:
+            BerryIMUStreamer(client)
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
+        assert BerryIMUStreamer(client, frequency=50).frequency == 50
+
+    def test_error_in_thread(self):
+        client = BerryIMUClient(transport=SimulatedBerryIMU())
+        client.read_imu = None
+        streamer = BerryIMUStreamer(client, frequency=100)
+        streamer.start()
+        time.sleep(0.05)
+        assert not streamer.is_running
+        try:
+            streamer.stop()
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
+
+    def test_stop_with_full_blocking_buffer(self):
+        client = BerryIMUClient(transport=SimulatedBerryIMU())
+        streamer = BerryIMUStreamer(client, frequency=1000, capacity=4, policy='block')
+        streamer.start()
+        time.sleep(0.05)
+        assert streamer.buffer.nbr_written == 3
+        streamer.stop()
+        assert not streamer.is_running
+
+    def test_run_in_calling_thread(self):
+        client = BerryIMUClient(transport=SimulatedBerryIMU())
+        streamer = BerryIMUStreamer(client, frequency=200, capacity=64)
+        stop_event = threading.Event()
+        timer = threading.Timer(0.1, stop_event.set)
+        timer.start()
+        streamer.run(stop_event)
+        timer.join()
+        assert streamer.buffer.nbr_written > 5
+        assert not streamer.is_running
+
+    def test_run_raises(self):
+        client = BerryIMUClient(transport=SimulatedBerryIMU())
+        client.read_imu = None
+        streamer = BerryIMUStreamer(client, frequency=100)
+        try:
+            streamer.run(threading.Event())
+        except TypeError:
+            pass
+        else:
+            assert False
+
+    def test_run_keeps_own_stop_event(self):
+        client = BerryIMUClient(transport=SimulatedBerryIMU())
+        streamer = BerryIMUStreamer(client, frequency=200, capacity=64)
+        stop_event = threading.Event()
+        stop_event.set()
+        streamer.run(stop_event)
+        # Starting and stopping the streamer does not touch the event given to run().
+        streamer.start()
+        assert stop_event.is_set()
+        stop_event.clear()
+        streamer.stop()
+        assert not stop_event.is_set()
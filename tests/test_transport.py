@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+:mod:`test_transport`
+==================
+
+.. module:: test_transport
+   :platform: Unix, Windows
+   :synopsis:
+
+.. moduleauthor:: hbldh <henrik.blidh@nedomkull.com>
+
+Created on 2026-10-16
+
+"""
+
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import time
+
+from mock import Mock, patch
+
+from pyberryimu.sensors import LSM9DS0
+from pyberryimu.exc import PyBerryIMUError
+from pyberryimu.transport import I2CDevTransport, MemoryTransport, InstrumentedTransport, RetryingTransport, \
+    get_transport_factory
+
+
+def create_i2c_dev_transport(registers):
+    # Create an I2CDevTransport with an ioctl emulating devices with the given register maps.
+    with patch('os.open', return_value=3):
+        transport = I2CDevTransport(1)
+    transfers = []
+
+    def ioctl(fd, request, data):
+        assert fd == 3 and request == I2CDevTransport.I2C_RDWR
+        messages = [data.msgs[i] for i in range(data.nmsgs)]
+        transfers.append([(m.addr, m.flags, m.len) for m in messages])
+        register = None
+        for m in messages:
+            if m.flags & I2CDevTransport.I2C_M_RD:
+                for i in range(m.len):
+                    m.buf[i] = registers.get(m.addr, {}).get((register & 0x7F) + i, 0)
+            else:
+                register = m.buf[0]
+                for i in range(1, m.len):
+                    registers.setdefault(m.addr, {})[register + i - 1] = m.buf[i]
+
+    transport._ioctl = ioctl
+    return transport, transfers
+
+
+class TestI2CDevTransport(object):
+
+    def test_read_byte_data(self):
+        transport, transfers = create_i2c_dev_transport({0x1E: {0x20: 0x57}})
+        assert transport.read_byte_data(0x1E, 0x20) == 0x57
+        assert transfers == [[(0x1E, 0, 1), (0x1E, I2CDevTransport.I2C_M_RD, 1)]]
+
+    def test_write_byte_data(self):
+        registers = {}
+        transport, transfers = create_i2c_dev_transport(registers)
+        transport.write_byte_data(0x6A, 0x23, 0x90)
+        assert registers == {0x6A: {0x23: 0x90}}
+        assert transfers == [[(0x6A, 0, 2)]]
+
+    def test_batched_block_reads(self):
+        """Test that block reads from several devices are made in one ioctl call."""
+        registers = {0x1E: dict((r, r) for r in range(0x40)), 0x6A: dict((r, 0x80 + r) for r in range(0x40))}
+        transport, transfers = create_i2c_dev_transport(registers)
+        blocks = transport.read_i2c_block_data_batch([(0x1E, 0xA7, 7), (0x6A, 0xA7, 7), (0x1E, 0x87, 7)])
+        assert blocks == [list(range(0x27, 0x2E)), list(range(0xA7, 0xAE)), list(range(0x07, 0x0E))]
+        assert len(transfers) == 1
+        assert len(transfers[0]) == 6
+
+
+class TestMemoryTransport(object):
+
+    def test_register_map(self):
+        transport = MemoryTransport()
+        transport.write_byte_data(0x77, 0xF4, 0x2E)
+        assert transport.read_byte_data(0x77, 0xF4) == 0x2E
+        assert transport.read_byte_data(0x77, 0xF6) == 0
+
+    def test_auto_increment(self):
+        transport = MemoryTransport({LSM9DS0.GYR_ADDRESS: {0x28: 1, 0x29: 2}})
+        assert transport.read_i2c_block_data(LSM9DS0.GYR_ADDRESS, 0x28 | LSM9DS0.AUTO_INCREMENT, 2) == [1, 2]
+        assert transport.read_i2c_block_data(LSM9DS0.GYR_ADDRESS, 0x28, 2) == [1, 1]
+
+    def test_client_with_memory_transport(self):
+        from pyberryimu.client import BerryIMUClient
+        transport = MemoryTransport({LSM9DS0.ACC_ADDRESS: {LSM9DS0.OUT_X_L_A: 0x00, LSM9DS0.OUT_X_H_A: 0x40}})
+        c = BerryIMUClient(transport=transport)
+        c.open()
+        assert c.bus is transport
+        assert c.read_accelerometer() == (16384, 0, 0)
+        assert transport.registers[LSM9DS0.GYR_ADDRESS][LSM9DS0.CTRL_REG1_G] == 0b01001111
+
+
+class TestInstrumentedTransport(object):
+
+    def test_counts(self):
+        transport = InstrumentedTransport(MemoryTransport())
+        transport.write_byte_data(LSM9DS0.GYR_ADDRESS, LSM9DS0.CTRL_REG1_G, 0x0F)
+        transport.read_i2c_block_data(LSM9DS0.GYR_ADDRESS, LSM9DS0.STATUS_REG_G | LSM9DS0.AUTO_INCREMENT, 7)
+        transport.read_i2c_block_data_batch([(LSM9DS0.GYR_ADDRESS, LSM9DS0.STATUS_REG_G | LSM9DS0.AUTO_INCREMENT, 7),
+                                             (LSM9DS0.ACC_ADDRESS, LSM9DS0.STATUS_REG_A | LSM9DS0.AUTO_INCREMENT, 7)])
+        stats = transport.stats()
+        # The batch is one transaction.
+        assert stats['total']['transactions'] == 3
+        assert stats['total']['batches'] == 1
+        assert stats['total']['bytes'] == 22
+        assert sum(stats['total']['latency_histogram']) == 3
+        assert stats['devices'][LSM9DS0.GYR_ADDRESS]['transactions'] == 2
+        assert stats['devices'][LSM9DS0.GYR_ADDRESS]['batches'] == 1
+        status = stats['registers'][(LSM9DS0.GYR_ADDRESS, LSM9DS0.STATUS_REG_G)]
+        assert status['transactions'] == 1 and status['batches'] == 1
+        assert status['bytes'] == 14 and status['errors'] == 0
+        acc_status = stats['registers'][(LSM9DS0.ACC_ADDRESS, LSM9DS0.STATUS_REG_A)]
+        assert acc_status['transactions'] == 0 and acc_status['batches'] == 1 and acc_status['bytes'] == 7
+        transport.reset()
+        assert transport.stats()['total']['transactions'] == 0
+
+    def test_errors(self):
+        transport = InstrumentedTransport(MemoryTransport())
+        transport.transport.read_byte_data = Mock(side_effect=IOError(5, 'Input/output error'))
+        try:
+            transport.read_byte_data(0x77, 0xF6)
+        except IOError:
+            pass
+        else:
+            assert False
+        stats = transport.stats()
+        assert stats['registers'][(0x77, 0xF6)]['errors'] == 1
+        assert stats['total']['bytes'] == 0
+
+    def test_batch_latency(self):
+        transport = InstrumentedTransport(MemoryTransport())
+
+        def slow_batch(requests):
+            time.sleep(0.003)
+            return [[0] * length for _, _, length in requests]
+
+        transport.transport.read_i2c_block_data_batch = slow_batch
+        transport.read_i2c_block_data_batch([(LSM9DS0.GYR_ADDRESS, LSM9DS0.STATUS_REG_G, 7),
+                                             (LSM9DS0.ACC_ADDRESS, LSM9DS0.STATUS_REG_A, 7),
+                                             (LSM9DS0.MAG_ADDRESS, LSM9DS0.STATUS_REG_M, 7)])
+        total = transport.stats()['total']
+        # The latency of the whole batch is recorded once, not divided between its reads.
+        assert total['latency'] >= 0.003
+        assert sum(total['latency_histogram']) == 1
+        transport.transport.read_i2c_block_data_batch = Mock(side_effect=IOError(5, 'Input/output error'))
+        try:
+            transport.read_i2c_block_data_batch([(LSM9DS0.GYR_ADDRESS, LSM9DS0.STATUS_REG_G, 7)])
+        except IOError:
+            pass
+        else:
+            assert False
+        total = transport.stats()['total']
+        assert total['transactions'] == 2 and total['batches'] == 2 and total['errors'] == 1
+        assert total['bytes'] == 21
+
+    def test_client_stats(self):
+        from pyberryimu.client import BerryIMUClient
+        transport = MemoryTransport()
+        c = BerryIMUClient(transport=transport, instrument=True)
+        c.open()
+        assert c.bus is transport
+        c.reset_stats()
+        c.read_imu_raw()
+        stats = c.stats()
+        assert stats['total']['transactions'] == 1
+        assert stats['total']['batches'] == 1
+        assert stats['total']['bytes'] == 21
+        try:
+            BerryIMUClient(transport=transport).stats()
+        except PyBerryIMUError:
+            pass
+        else:
+            assert False
+
+
+class TestRetryingTransport(object):
+
+    def test_transient_error_is_retried(self):
+        memory = MemoryTransport({0x77: {0xF6: 0x12}})
+        memory.read_byte_data = Mock(side_effect=[IOError(5, 'Input/output error'), 0x12])
+        transport = RetryingTransport(memory, retries=2, backoff=0.0)
+        assert transport.read_byte_data(0x77, 0xF6) == 0x12
+        assert transport.nbr_retries == 1 and transport.nbr_failures == 0
+
+    def test_bounded_backoff(self):
+        memory = MemoryTransport()
+        memory.read_byte_data = Mock(side_effect=IOError(5, 'Input/output error'))
+        transport = RetryingTransport(memory, retries=3, backoff=0.001, max_backoff=0.002)
+        with patch('time.sleep') as sleep:
+            try:
+                transport.read_byte_data(0x77, 0xF6)
+            except IOError:
+                pass
+            else:
+                assert False
+        assert [c[0][0] for c in sleep.call_args_list] == [0.001, 0.002, 0.002]
+        assert memory.read_byte_data.call_count == 4
+        assert transport.nbr_failures == 1
+
+
+def test_transport_factory():
+    transport = MemoryTransport()
+    assert get_transport_factory(transport)(1) is transport
+    assert get_transport_factory('i2c-dev') is I2CDevTransport
+    smbus = Mock()
+    with patch.dict('sys.modules', {'smbus': smbus}):
+        get_transport_factory('smbus')(2)
+    smbus.SMBus.assert_called_with(2)